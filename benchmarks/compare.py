@@ -0,0 +1,49 @@
+"""
+比较两次性能测试的结果
+
+    python benchmarks/compare.py baseline.json results.json
+
+按中位数比较每一项，变慢超过阈值的项目标记为回退，存在回退时退出码为1。
+"""
+
+import argparse
+import json
+import sys
+
+
+def load_results(path):
+    """读取结果文件，返回 ({(测试项, 规模): 结果}, 元数据)"""
+    with open(path, 'r', encoding='utf-8') as f:
+        report = json.load(f)
+    results = {(item["benchmark"], item["presets"]): item
+               for item in report["results"]}
+    return results, report.get("meta", {})
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="比较两次性能测试的结果")
+    parser.add_argument("baseline", help="基准结果文件")
+    parser.add_argument("current", help="当前结果文件")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="视为回退的变慢比例，默认0.10")
+    options = parser.parse_args()
+
+    baseline, baseline_meta = load_results(options.baseline)
+    current, current_meta = load_results(options.current)
+    print(f"基准: {baseline_meta.get('commit')}  当前: {current_meta.get('commit')}")
+    print(f"{'测试项':<28}{'规模':>8}{'基准(ms)':>12}{'当前(ms)':>12}{'变化':>10}")
+
+    regressions = 0
+    for key in sorted(baseline.keys() & current.keys(),
+                      key=lambda k: (k[1], k[0])):
+        old = baseline[key]["median_ms"]
+        new = current[key]["median_ms"]
+        change = (new - old) / old if old else 0.0
+        flag = ""
+        if change > options.threshold:
+            flag = "  回退"
+            regressions += 1
+        print(f"{key[0]:<28}{key[1]:>8}{old:>12.3f}{new:>12.3f}"
+              f"{change:>+10.1%}{flag}")
+
+    sys.exit(1 if regressions else 0)
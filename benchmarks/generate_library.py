@@ -0,0 +1,109 @@
+"""
+生成用于性能测试的预设库
+
+    python benchmarks/generate_library.py --presets 10000 -o presets.json
+
+名称混合中文和英文单词；内容长度服从对数正态分布，大部分预设只有几十到几百个字符，
+少数长达几十KB；分组数量随预设数量增加，各分组大小差异很大。相同参数和种子总是生成相同的数据。
+"""
+
+import argparse
+import json
+import math
+import random
+
+ASCII_WORDS = [
+    "deploy", "ping", "report", "server", "meeting", "invoice", "docker",
+    "git", "backup", "review", "status", "query", "config", "release",
+    "hotfix", "daily", "weekly", "customer", "ticket", "log", "network",
+    "database", "reply", "template", "notice",
+]
+
+CJK_WORDS = [
+    "会议", "报告", "部署", "服务器", "客户", "发票", "周报", "日报", "备份",
+    "查询", "配置", "发布", "问题", "回复", "模板", "通知", "邮件", "合同",
+    "审批", "网络", "数据库", "日志", "工单", "状态", "检查",
+]
+
+# 内容长度的对数正态分布参数：中位数约150字符，均值约450字符
+CONTENT_MU = 5.0
+CONTENT_SIGMA = 1.5
+MAX_CONTENT_LENGTH = 200 * 1024
+
+# 命令型预设和模板预设所占的比例
+COMMAND_RATIO = 0.01
+TEMPLATE_RATIO = 0.05
+
+
+def build_corpus(rng, length=1024 * 1024):
+    """生成一段混合中英文的语料，预设内容从中截取"""
+    parts = []
+    size = 0
+    while size < length:
+        word = rng.choice(ASCII_WORDS if rng.random() < 0.5 else CJK_WORDS)
+        separator = rng.choice([" ", " ", " ", "，", "。", "\n", ": "])
+        parts.append(word + separator)
+        size += len(word) + len(separator)
+    return "".join(parts)
+
+
+def make_name(rng):
+    """生成1到3个单词组成的名称，中英文混合"""
+    words = [rng.choice(ASCII_WORDS if rng.random() < 0.4 else CJK_WORDS)
+             for _ in range(rng.randint(1, 3))]
+    return " ".join(words) if rng.random() < 0.3 else "".join(words)
+
+
+def make_content(rng, corpus):
+    """从语料中截取一段长度服从对数正态分布的内容"""
+    length = min(int(rng.lognormvariate(CONTENT_MU, CONTENT_SIGMA)) + 1,
+                 MAX_CONTENT_LENGTH)
+    start = rng.randrange(0, len(corpus) - length)
+    content = corpus[start:start + length]
+    if rng.random() < TEMPLATE_RATIO:
+        content = f"[日期] {content} [{rng.choice(CJK_WORDS)}]"
+    return content
+
+
+def generate_library(preset_count, seed=0, group_count=None):
+    """生成 {分组: {名称: 预设}} 格式的预设库"""
+    rng = random.Random(seed)
+    corpus = build_corpus(rng)
+
+    if group_count is None:
+        group_count = max(3, int(math.sqrt(preset_count) / 2))
+
+    # 分组名称唯一，带序号避免重复
+    groups = [f"{make_name(rng)}-{i}" for i in range(group_count)]
+    # 分组大小近似Zipf分布：第i个分组的权重为 1/(i+1)
+    weights = [1 / (i + 1) for i in range(group_count)]
+    assignments = rng.choices(range(group_count), weights=weights,
+                              k=preset_count)
+
+    library = {group: {} for group in groups}
+    for index, group_index in enumerate(assignments):
+        name = f"{make_name(rng)} {index}"
+        content = make_content(rng, corpus)
+        if rng.random() < COMMAND_RATIO:
+            value = {"content": f"echo {index}", "command": True, "ttl": 60}
+        else:
+            value = content
+        library[groups[group_index]][name] = value
+    return library
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="生成用于性能测试的预设库")
+    parser.add_argument("--presets", type=int, default=10000, help="预设数量")
+    parser.add_argument("--groups", type=int, default=None,
+                        help="分组数量，默认随预设数量增加")
+    parser.add_argument("--seed", type=int, default=0, help="随机种子")
+    parser.add_argument("-o", "--output", default="presets.json",
+                        help="输出文件")
+    options = parser.parse_args()
+
+    library = generate_library(options.presets, options.seed, options.groups)
+    with open(options.output, 'w', encoding='utf-8') as f:
+        json.dump(library, f, ensure_ascii=False, indent=2)
+    print(f"已生成 {options.presets} 个预设，{len(library)} 个分组: "
+          f"{options.output}")
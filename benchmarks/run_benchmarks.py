@@ -0,0 +1,297 @@
+"""
+QuickText性能测试
+
+    python benchmarks/run_benchmarks.py --sizes 1000 10000 100000 -o results.json
+    python benchmarks/compare.py baseline.json results.json
+
+对每种规模的预设库分别测量加载、保存、逐键搜索和拖动排序后保存；
+有图形环境时（没有DISPLAY时会尝试启动Xvfb）还会测量界面的启动、
+setup_group_tabs、create_buttons_for_items、快速访问页的逐键搜索和拖动排序。
+结果以JSON格式输出，包含当前提交和运行环境，便于在不同提交之间比较。
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from benchmarks.generate_library import generate_library  # noqa: E402
+from quicktext.core import PresetStore  # noqa: E402
+
+# 模拟逐键输入的搜索词
+SEARCH_QUERIES = ["deploy", "服务器", "weekly report", "审批"]
+
+# 拖动排序的次数
+REORDER_MOVES = 100
+
+# 默认只在不超过此规模的预设库上测量界面，更大的库创建全部按钮需要很长时间
+DEFAULT_GUI_MAX_SIZE = 10000
+
+
+def summarize(name, size, samples):
+    """汇总一组耗时（秒），输出毫秒"""
+    ordered = sorted(samples)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    return {
+        "benchmark": name,
+        "presets": size,
+        "samples": len(samples),
+        "min_ms": round(ordered[0] * 1000, 3),
+        "median_ms": round(statistics.median(ordered) * 1000, 3),
+        "p95_ms": round(p95 * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3),
+    }
+
+
+def timed(func, *args):
+    """执行一次并返回耗时（秒）"""
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def keystroke_prefixes(query):
+    """逐键输入时依次出现的搜索内容"""
+    return [query[:i] for i in range(1, len(query) + 1)]
+
+
+def run_core_benchmarks(data_file, size, repeat, rng):
+    """不依赖界面的测量：加载、保存、搜索、排序"""
+    results = []
+
+    store = PresetStore(data_file)
+    results.append(summarize("load_presets", size,
+                             [timed(store.load) for _ in range(repeat)]))
+    results.append(summarize("save_presets", size,
+                             [timed(store.save) for _ in range(repeat)]))
+
+    # 首次搜索需要建立索引
+    rebuilds = []
+    for _ in range(repeat):
+        store.search_index.invalidate()
+        rebuilds.append(timed(store.search, "x"))
+    results.append(summarize("search_index_rebuild", size, rebuilds))
+
+    keystrokes = []
+    for _ in range(repeat):
+        for query in SEARCH_QUERIES:
+            for prefix in keystroke_prefixes(query):
+                keystrokes.append(timed(store.search, prefix))
+    results.append(summarize("search_keystroke", size, keystrokes))
+
+    # 拖动排序：每次移动只追加一条日志，之后完整保存一次
+    groups = [g for g in store.ordered_groups() if len(store.presets[g]) > 1]
+    moves, saves = [], []
+    for _ in range(repeat):
+        for _ in range(REORDER_MOVES):
+            group = rng.choice(groups)
+            names = store.ordered_names(group)
+            moves.append(timed(store.move_preset, group, rng.choice(names),
+                               rng.randrange(len(names))))
+        saves.append(timed(store.save))
+    results.append(summarize("reorder_move", size, moves))
+    results.append(summarize("reorder_save", size, saves))
+    return results
+
+
+def start_xvfb():
+    """没有图形环境时启动Xvfb，返回进程对象，无法启动时返回None"""
+    if os.environ.get("DISPLAY") or sys.platform.startswith('win') or \
+            sys.platform == 'darwin':
+        return None
+    xvfb = shutil.which("Xvfb")
+    if xvfb is None:
+        return None
+
+    for number in range(99, 120):
+        if os.path.exists(f"/tmp/.X11-unix/X{number}"):
+            continue
+        process = subprocess.Popen(
+            [xvfb, f":{number}", "-screen", "0", "1280x1024x24",
+             "-nolisten", "tcp"],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        deadline = time.time() + 5
+        while time.time() < deadline:
+            if os.path.exists(f"/tmp/.X11-unix/X{number}"):
+                os.environ["DISPLAY"] = f":{number}"
+                return process
+            if process.poll() is not None:
+                break
+            time.sleep(0.05)
+        process.terminate()
+    return None
+
+
+def run_gui_benchmarks(size, repeat, rng):
+    """界面测量，需要在数据目录中运行"""
+    import tkinter as tk
+
+    import quick_text
+
+    class BenchmarkQuickText(quick_text.QuickText):
+        """不注册全局热键的QuickText，避免测试期间影响系统"""
+
+        def apply_hotkeys(self):
+            return []
+
+        def refresh_preset_hotkeys(self):
+            pass
+
+    results = []
+    root = tk.Tk()
+    quick_text.center_window(root)
+
+    start = time.perf_counter()
+    app = BenchmarkQuickText(root)
+    root.update()
+    results.append(summarize("gui_startup", size,
+                             [time.perf_counter() - start]))
+
+    def setup_tabs():
+        app.setup_group_tabs()
+        root.update_idletasks()
+
+    results.append(summarize("setup_group_tabs", size,
+                             [timed(setup_tabs) for _ in range(repeat)]))
+
+    # 最大的分组
+    group = max(app.presets, key=lambda g: len(app.presets[g]))
+    items = [(name, quick_text.preset_content(value))
+             for name, value in app.store.ordered_items(group)]
+
+    def create_buttons():
+        app.create_buttons_for_items(group, items)
+        root.update_idletasks()
+
+    results.append(summarize("create_buttons_for_items", size,
+                             [timed(create_buttons) for _ in range(repeat)]))
+
+    def type_prefix(prefix):
+        app.search_var.set(prefix)
+        root.update_idletasks()
+
+    keystrokes = []
+    for query in SEARCH_QUERIES:
+        for prefix in keystroke_prefixes(query):
+            keystrokes.append(timed(type_prefix, prefix))
+        app.clear_search()
+    results.append(summarize("gui_search_keystroke", size, keystrokes))
+
+    # 与拖放处理相同：移动预设、刷新该分组的按钮、保存
+    def reorder_and_save():
+        names = app.store.ordered_names(group)
+        app.move_preset(group, rng.choice(names), rng.randrange(len(names)))
+        app.refresh_group_buttons(group)
+        root.update_idletasks()
+        app.save_presets()
+
+    results.append(summarize("gui_reorder_save", size,
+                             [timed(reorder_and_save) for _ in range(repeat)]))
+
+    app.commands.shutdown()
+    app.clipboard.close()
+    root.destroy()
+    return results
+
+
+def run_size(size, repeat, seed, gui):
+    """在临时数据目录中测量一种规模"""
+    rng = random.Random(seed)
+    work_dir = tempfile.mkdtemp(prefix="quicktext-bench-")
+    data_file = os.path.join(work_dir, "presets.json")
+    old_cwd = os.getcwd()
+    try:
+        with open(data_file, 'w', encoding='utf-8') as f:
+            json.dump(generate_library(size, seed), f,
+                      ensure_ascii=False, indent=2)
+
+        results = run_core_benchmarks(data_file, size, repeat, rng)
+        if gui:
+            # 图形界面从当前目录查找presets.json
+            os.chdir(work_dir)
+            results += run_gui_benchmarks(size, repeat, rng)
+        return results
+    finally:
+        os.chdir(old_cwd)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def git_commit():
+    """当前提交，不在git仓库中时返回None"""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=ROOT_DIR, capture_output=True,
+            text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def gui_available():
+    """检查能否创建Tk窗口"""
+    try:
+        import tkinter as tk
+        tk.Tk().destroy()
+        return True
+    except Exception:
+        return False
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="QuickText性能测试")
+    parser.add_argument("--sizes", type=int, nargs="+",
+                        default=[1000, 10000, 100000], help="预设库规模")
+    parser.add_argument("--repeat", type=int, default=5, help="每项重复次数")
+    parser.add_argument("--seed", type=int, default=0, help="随机种子")
+    parser.add_argument("--no-gui", action="store_true", help="不测量界面")
+    parser.add_argument("--gui-max-size", type=int,
+                        default=DEFAULT_GUI_MAX_SIZE,
+                        help="只在不超过此规模的预设库上测量界面")
+    parser.add_argument("-o", "--output", help="结果文件，默认输出到标准输出")
+    options = parser.parse_args()
+
+    xvfb = None if options.no_gui else start_xvfb()
+    try:
+        gui = not options.no_gui and gui_available()
+        if not options.no_gui and not gui:
+            print("没有可用的图形环境，跳过界面测量", file=sys.stderr)
+
+        results = []
+        # 程序本身的日志输出到标准错误，标准输出只保留结果
+        with contextlib.redirect_stdout(sys.stderr):
+            for size in options.sizes:
+                print(f"测量 {size} 个预设...")
+                results += run_size(size, options.repeat, options.seed,
+                                    gui and size <= options.gui_max_size)
+    finally:
+        if xvfb is not None:
+            xvfb.terminate()
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "repeat": options.repeat,
+            "seed": options.seed,
+            "gui": gui,
+        },
+        "results": results,
+    }
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if options.output:
+        with open(options.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+    else:
+        print(output)
@@ -41,23 +41,24 @@ if not exist tool.ico (
 
 echo.
 echo 构建选项:
-echo 1. 构建标准版本 (更小体积)
-echo 2. 构建调试版本 (更易于排错)
+echo 1. 构建目录版本 (启动最快, 推荐)
+echo 2. 构建单文件版本 (只有一个exe, 每次启动需要解压)
+echo 3. 构建调试版本 (更易于排错)
 echo.
 
-choice /c 12 /m "请选择构建版本"
+choice /c 123 /m "请选择构建版本"
 if %ERRORLEVEL% EQU 1 (
     echo.
-    echo 开始构建标准版本...
+    echo 开始构建目录版本...
     
-    REM 调用PyInstaller进行打包 - 标准版本
-    pyinstaller --name=QuickText ^
-                --onefile ^
-                --windowed ^
-                --icon=%ICON_FILE% ^
-                --add-data="presets.json;." ^
-                --add-data="tool.png;." ^
-                quick_text.py
+    REM 调用setup.py打包 - 目录版本, 排除用不到的模块并精简Tcl/Tk数据
+    python setup.py --mode onedir
+) else if %ERRORLEVEL% EQU 2 (
+    echo.
+    echo 开始构建单文件版本...
+    
+    REM 调用setup.py打包 - 单文件版本
+    python setup.py --mode onefile
 ) else (
     echo.
     echo 开始构建调试版本...
@@ -73,10 +74,15 @@ if %ERRORLEVEL% EQU 1 (
 )
 
 REM 打包完成
-if exist dist\QuickText.exe (
+if exist dist\onedir\QuickText\QuickText.exe (
+    echo.
+    echo ===== 目录版本构建成功 =====
+    echo 可执行文件位于: %CD%\dist\onedir\QuickText\QuickText.exe
+    echo 发布时请复制整个 dist\onedir\QuickText 目录
+) else if exist dist\onefile\QuickText.exe (
     echo.
-    echo ===== 标准版本构建成功 =====
-    echo 可执行文件位于: %CD%\dist\QuickText.exe
+    echo ===== 单文件版本构建成功 =====
+    echo 可执行文件位于: %CD%\dist\onefile\QuickText.exe
 ) else if exist dist\QuickText_debug\QuickText_debug.exe (
     echo.
     echo ===== 调试版本构建成功 =====
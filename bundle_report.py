@@ -0,0 +1,114 @@
+"""
+比较不同打包方式的体积和启动耗时
+
+    python bundle_report.py                # 测量已打包的 dist/onedir 和 dist/onefile
+    python bundle_report.py --build        # 先用 setup.py 分别打包再测量
+    python bundle_report.py --runs 10 --json
+
+启动耗时为以 --exit-after-startup 参数运行程序直到进程退出的时间，
+程序在窗口显示并完成所有延迟启动阶段后退出。第一次运行单独记录（冷启动），
+其余运行取中位数和最小值。测量前请先关闭正在运行的QuickText，
+否则新进程只会通知已运行的实例显示窗口然后退出。
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from setup import directory_size, executable_path
+
+# 参与比较的打包方式
+MODES = ["onedir", "onefile"]
+
+# 单次启动的最长等待时间（秒）
+LAUNCH_TIMEOUT = 60
+
+
+def bundle_size(mode, script_dir):
+    """返回 (总字节数, 文件数)"""
+    exe_path = executable_path(mode, script_dir)
+    if mode == "onedir":
+        bundle_dir = os.path.dirname(exe_path)
+        count = sum(len(files) for _, _, files in os.walk(bundle_dir))
+        return directory_size(bundle_dir), count
+    return os.path.getsize(exe_path), 1
+
+
+def measure_launch(exe_path):
+    """运行一次程序直到其自行退出，返回耗时（毫秒）"""
+    start = time.perf_counter()
+    subprocess.run([exe_path, "--exit-after-startup"], check=True,
+                   timeout=LAUNCH_TIMEOUT, stdout=subprocess.DEVNULL,
+                   stderr=subprocess.DEVNULL)
+    return (time.perf_counter() - start) * 1000
+
+
+def report_mode(mode, script_dir, runs):
+    """测量一种打包方式"""
+    exe_path = executable_path(mode, script_dir)
+    if not os.path.exists(exe_path):
+        return {"mode": mode, "error": f"找不到 {exe_path}"}
+
+    size, file_count = bundle_size(mode, script_dir)
+    try:
+        timings = [measure_launch(exe_path) for _ in range(runs)]
+    except (subprocess.SubprocessError, OSError) as e:
+        return {"mode": mode, "error": f"启动失败: {str(e)}"}
+    warm = timings[1:] or timings
+    return {
+        "mode": mode,
+        "path": exe_path,
+        "size_bytes": size,
+        "files": file_count,
+        "cold_ms": round(timings[0], 1),
+        "warm_median_ms": round(statistics.median(warm), 1),
+        "warm_min_ms": round(min(warm), 1),
+        "runs": runs,
+    }
+
+
+def print_table(results):
+    """以表格形式输出结果"""
+    print(f"{'打包方式':<10}{'体积(MB)':>10}{'文件数':>8}"
+          f"{'冷启动(ms)':>12}{'中位数(ms)':>12}{'最小值(ms)':>12}")
+    for result in results:
+        if "error" in result:
+            print(f"{result['mode']:<10}{result['error']}")
+            continue
+        print(f"{result['mode']:<10}"
+              f"{result['size_bytes'] / 1024 / 1024:>10.1f}"
+              f"{result['files']:>8}"
+              f"{result['cold_ms']:>12.0f}"
+              f"{result['warm_median_ms']:>12.0f}"
+              f"{result['warm_min_ms']:>12.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="比较不同打包方式的体积和启动耗时")
+    parser.add_argument("--build", action="store_true",
+                        help="测量前先用 setup.py 打包每种方式")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=MODES,
+                        help="要比较的打包方式")
+    parser.add_argument("--runs", type=int, default=5,
+                        help="每种方式的启动次数（至少2次）")
+    parser.add_argument("--json", action="store_true", help="以JSON格式输出")
+    options = parser.parse_args()
+
+    script_dir = os.path.dirname(os.path.abspath(__file__)) or "."
+
+    if options.build:
+        for mode in options.modes:
+            subprocess.run([sys.executable, os.path.join(script_dir, "setup.py"),
+                            "--mode", mode], check=True, cwd=script_dir)
+
+    results = [report_mode(mode, script_dir, max(options.runs, 2))
+               for mode in options.modes]
+
+    if options.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+    else:
+        print_table(results)
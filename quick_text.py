@@ -1,19 +1,390 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+import time
+
+# 启动计时的起点，放在其他导入之前以便统计导入耗时
+STARTUP_TIME = time.perf_counter()
+
+import difflib
 import os
-import json
 import tkinter as tk
-from tkinter import ttk, messagebox, scrolledtext
-import pyperclip
-import keyboard
+from tkinter import ttk, messagebox, scrolledtext, filedialog
 import threading
-import time
 import sys
+import queue
+from collections import deque
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
 
+from quicktext import api, core, daemon
+from quicktext.clipboard import ClipboardHelper, run_clipboard_helper
+from quicktext.core import (ClipboardHistory, CommandRunner, PresetStore, RevisionStore,
+                            UndoHistory, UsageLog, compile_template, make_preset, perf,
+                            preset_content, preset_options)
+from quicktext.watchdog import StallWatchdog
+
+
+# 可配置的全局热键动作：(动作名, 说明)
+HOTKEY_ACTIONS = [
+    ("toggle", "打开/隐藏应用"),
+    ("history", "显示剪贴板历史"),
+    ("palette", "打开快速搜索面板"),
+]
+
+# 快速搜索面板中最多显示的结果数量
+PALETTE_LIMIT = 200
+
+# 不支持文件事件的平台（Windows）上用于唤醒主循环的虚拟事件
+HOTKEY_WAKE_EVENT = "<<HotkeyWake>>"
+
+# 快速访问中按常用度排列的选项卡
+MOST_USED_TAB = "最常用"
+
+# 复制预设后延迟写入使用记录的时间（毫秒），连续复制只写一次
+USAGE_FLUSH_DELAY = 5000
+
+# 热键到快速搜索面板可交互的延迟目标（毫秒）
+PALETTE_LATENCY_BUDGET = 50
+
+# 文本区域分块加载时每块的字符数
+TEXT_CHUNK_SIZE = 64 * 1024
+
+# 超过此字符数的内容关闭自动换行，编辑区域切换为只读查看
+LARGE_CONTENT_THRESHOLD = 1024 * 1024
+
+# 每个分组视图中除按钮外的控件：画布、滚动条、按钮框架
+VIEW_WIDGETS = 3
+
+# 每个按钮占用的控件：按钮框架和按钮
+BUTTON_WIDGETS = 2
+
+# 每个分组视图注册的Python回调：滚动条命令、画布滚动命令和两个<Configure>处理，
+# 另外每个按钮注册一个命令
+VIEW_CALLBACKS = 4
+
+# 控件数量自检的间隔（毫秒）
+WIDGET_CHECK_INTERVAL = 60 * 1000
+
+# Tcl命令数量比上次自检多出超过此数量时报告可能的泄漏
+WIDGET_DRIFT_TOLERANCE = 200
+
+# 导入导出的格式：(格式, 说明)，None 表示根据扩展名判断
+TRANSFER_FORMATS = [
+    (None, "自动判断"),
+    ("csv", "CSV"),
+    ("jsonl", "JSONL"),
+    ("dir", "文本文件目录"),
+    ("json", "presets.json"),
+]
+
+# 导入时每读取多少条记录更新一次进度
+IMPORT_PROGRESS_INTERVAL = 1000
+
+# 导入时名称冲突的处理方式：(方式, 说明)
+IMPORT_POLICIES = [
+    ("skip", "跳过"),
+    ("overwrite", "覆盖"),
+    ("rename", "重命名"),
+]
+
+# 自动输入前等待热键松开的最长时间和检查间隔（秒）
+AUTOTYPE_RELEASE_TIMEOUT = 1.0
+AUTOTYPE_RELEASE_CHECK = 0.01
+
+# 全局热键库，首次注册热键时才导入（导入时会加载平台相关的钩子实现）
+keyboard = None
+
+
+def load_keyboard():
+    """导入并返回keyboard库"""
+    global keyboard
+    if keyboard is None:
+        import keyboard as module
+        keyboard = module
+    return keyboard
+
+
+def type_after_release(hotkey, content, timeout=AUTOTYPE_RELEASE_TIMEOUT):
+    """等热键中的按键（包括Ctrl、Alt等修饰键）全部松开后输入内容，在后台线程中调用
+
+    按着修饰键时输入的字符会变成组合键，可能触发目标程序的快捷键。
+    超过 timeout 秒仍未松开时照常输入。
+    """
+    kb = load_keyboard()
+    keys = {part.strip() for step in hotkey.split(",")
+            for part in step.split("+") if part.strip()}
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            if not any(kb.is_pressed(key) for key in keys):
+                break
+        except ValueError:
+            # 无法识别的按键名称，不再等待
+            break
+        time.sleep(AUTOTYPE_RELEASE_CHECK)
+    kb.write(content)
+
+
+class StartupTrace:
+    """启动各阶段耗时，格式与 python -X importtime 类似，输出到标准错误
+
+    使用 --trace-startup 参数或设置环境变量 QUICKTEXT_TRACE_STARTUP=1 开启。
+    """
+
+    def __init__(self, start):
+        self.enabled = False
+        self.start = start
+        self.last = start
+
+    def mark(self, stage):
+        """记录一个阶段结束"""
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        if self.last == self.start:
+            print("startup: self [us] | cumulative | stage", file=sys.stderr)
+        print(f"startup: {(now - self.last) * 1e6:>9.0f} | "
+              f"{(now - self.start) * 1e6:>10.0f} | {stage}", file=sys.stderr)
+        self.last = now
+
+
+startup_trace = StartupTrace(STARTUP_TIME)
+
+
+class ClipboardWriter:
+    """异步剪贴板写入器，点击后立即返回
+
+    Linux下运行界面时直接使用Tk自身的剪贴板；没有界面时使用常驻辅助进程；
+    其他情况以及辅助进程不可用时回退到pyperclip。
+    """
+
+    def __init__(self, root=None):
+        self.root = root
+        self.queue = queue.Queue()
+        self.is_linux = sys.platform.startswith('linux')
+        self.use_tk = root is not None and self.is_linux
+        self.helper = ClipboardHelper() if self.is_linux else None
+        self.last_content = None
+        self._lock = threading.Lock()
+        self._scheduled = False
+        self._worker = None
+
+    def copy(self, content, on_error=None):
+        """将写入请求放入队列"""
+        self.queue.put((content, on_error))
+
+        if self.use_tk:
+            # 连续的多次写入合并为一次处理
+            with self._lock:
+                if self._scheduled:
+                    return
+                self._scheduled = True
+            self.root.after_idle(self._drain_tk)
+        elif self._worker is None:
+            self._worker = threading.Thread(target=self._run, daemon=True)
+            self._worker.start()
+
+    def _take_latest(self, block=False):
+        """取出队列中最新的一次写入，之前的写入已被覆盖无需执行"""
+        latest = self.queue.get() if block else None
+        while True:
+            try:
+                latest = self.queue.get_nowait()
+            except queue.Empty:
+                return latest
+
+    def _drain_tk(self):
+        """在Tk主循环中执行写入"""
+        with self._lock:
+            self._scheduled = False
+        latest = self._take_latest()
+        if latest is None:
+            return
+
+        content, on_error = latest
+        try:
+            with perf.span("clipboard.write"):
+                self.root.clipboard_clear()
+                self.root.clipboard_append(content)
+            self.last_content = content
+        except tk.TclError as e:
+            if on_error:
+                on_error(e)
+
+    def _run(self):
+        """后台写入线程"""
+        while True:
+            content, on_error = self._take_latest(block=True)
+            try:
+                with perf.span("clipboard.write"):
+                    self._write(content)
+                self.last_content = content
+            except Exception as e:
+                if on_error:
+                    on_error(e)
+
+    def _write(self, content):
+        """在后台线程中写入剪贴板"""
+        if self.helper is not None:
+            try:
+                self.helper.write(content)
+                return
+            except OSError as e:
+                print(f"剪贴板辅助进程不可用: {str(e)}")
+                self.helper = None
+
+        import pyperclip
+        pyperclip.copy(content)
+
+    def close(self):
+        """退出前把Tk持有的剪贴板内容交给辅助进程，避免随窗口一起丢失"""
+        if self.use_tk and self.last_content is not None:
+            try:
+                self.helper.write(self.last_content)
+            except OSError:
+                pass
+        if self.helper is not None:
+            self.helper.close()
+
+
+class HotkeyManager:
+    """全局热键管理器
+
+    keyboard库在自己的线程中等待系统按键事件，回调只把动作放入线程安全队列，
+    由Tk主循环统一执行，空闲时没有任何定时唤醒。
+    支持文件事件的平台上，其他线程向管道写入一个字节唤醒主循环，不调用Tk方法；
+    Windows的Tk不支持文件事件，改为生成一个虚拟事件，由线程版Tcl转交给主线程处理。
+    必须在Tk主线程中创建。
+    """
 
-class QuickText:
     def __init__(self, root):
+        self.root = root
+        self.queue = queue.Queue()
+        self.actions = {}
+        self.handles = []
+        self.value_handles = []
+        # 当前正在执行的动作被触发的时间，用于测量响应延迟
+        self.event_time = None
+        self._lock = threading.Lock()
+        self._scheduled = False
+        self._wake_write = None
+        if sys.platform == "win32":
+            root.bind(HOTKEY_WAKE_EVENT, lambda event: self.drain())
+            # 主循环开始之前无法转交虚拟事件，开始时先处理一次队列
+            root.after_idle(self.drain)
+        else:
+            self._wake_read, self._wake_write = os.pipe()
+            os.set_blocking(self._wake_read, False)
+            os.set_blocking(self._wake_write, False)
+            # 主循环开始之前写入的字节会在主循环开始后处理
+            root.createfilehandler(self._wake_read, tk.READABLE, self._on_wake)
+
+    def register_action(self, name, callback):
+        """注册一个可以绑定热键的动作"""
+        self.actions[name] = callback
+
+    def bind(self, bindings):
+        """按 {动作名: [热键, ...]} 重新注册所有热键，返回注册失败的列表"""
+        self.unbind_all()
+        errors = []
+        for action, hotkeys in bindings.items():
+            if action not in self.actions:
+                continue
+            for hotkey in hotkeys:
+                try:
+                    handle = load_keyboard().add_hotkey(
+                        hotkey, self.post, args=(action,))
+                    self.handles.append(handle)
+                except Exception as e:
+                    errors.append((hotkey, e))
+        return errors
+
+    def bind_values(self, action, hotkeys):
+        """为同一个动作注册一组热键，触发时以热键本身作为参数，返回注册失败的列表"""
+        for handle in self.value_handles:
+            self._remove(handle)
+        self.value_handles = []
+
+        errors = []
+        for hotkey in hotkeys:
+            try:
+                handle = load_keyboard().add_hotkey(
+                    hotkey, self.post, args=(action, hotkey))
+                self.value_handles.append(handle)
+            except Exception as e:
+                errors.append((hotkey, e))
+        return errors
+
+    def unbind_all(self):
+        """注销所有已注册的动作热键"""
+        for handle in self.handles:
+            self._remove(handle)
+        self.handles = []
+
+    @staticmethod
+    def _remove(handle):
+        """注销一个热键"""
+        try:
+            keyboard.remove_hotkey(handle)
+        except (KeyError, ValueError):
+            pass
+
+    def post(self, action, *args):
+        """从任意线程提交一个动作（动作名或可调用对象）"""
+        self.queue.put((action, args, time.perf_counter()))
+        with self._lock:
+            if self._scheduled:
+                return
+            self._scheduled = True
+        try:
+            if self._wake_write is not None:
+                os.write(self._wake_write, b"\0")
+            else:
+                self.root.event_generate(HOTKEY_WAKE_EVENT, when="tail")
+        except BlockingIOError:
+            # 管道已满说明主循环尚未处理之前的唤醒
+            pass
+        except (RuntimeError, tk.TclError):
+            # 主循环尚未开始或已经退出，开始时会处理队列中的动作
+            with self._lock:
+                self._scheduled = False
+
+    def _on_wake(self, file, mask):
+        """管道可读时在主循环中执行"""
+        try:
+            while os.read(self._wake_read, 4096):
+                pass
+        except BlockingIOError:
+            pass
+        self.drain()
+
+    def drain(self):
+        """在Tk主循环中执行队列中的所有动作"""
+        with self._lock:
+            self._scheduled = False
+        while True:
+            try:
+                action, args, self.event_time = self.queue.get_nowait()
+            except queue.Empty:
+                return
+            callback = action if callable(action) else self.actions.get(action)
+            if callback is None:
+                continue
+            name = ""
+            if perf.enabled:
+                # 从按下热键（或其他线程提交）到主循环开始处理的延迟
+                perf.record("hotkey.latency", self.event_time,
+                            time.perf_counter() - self.event_time)
+                name = action if isinstance(action, str) else callback.__name__
+            try:
+                with perf.span("hotkey." + name):
+                    callback(*args)
+            except Exception as e:
+                print(f"热键动作执行失败: {str(e)}")
+
+
+class QuickText:
+    def __init__(self, root, server=None, exit_after_startup=False):
         self.root = root
         self.root.title("QuickText - 快速文本工具")
         # 窗口大小已在main函数中通过center_window设置
@@ -23,109 +394,154 @@ class QuickText:
         self.root.minsize(864, 500)
 
         # 数据存储路径
-        self.data_dir = self.get_data_dir()
-        self.data_file = os.path.join(self.data_dir, "presets.json")
-
-        # 预设文本数据
-        self.presets = self.load_presets()
+        self.data_dir = core.get_data_dir()
+        self.settings_file = os.path.join(self.data_dir, "settings.json")
+
+        # 应用设置
+        self.settings = core.load_settings(self.settings_file)
+        if self.settings.get("perf_enabled"):
+            perf.enabled = True
+
+        # 预设文本数据（加载、排序、搜索由 quicktext.core 负责）
+        self.store = PresetStore(os.path.join(self.data_dir, "presets.json"))
+        self.load_presets()
+        startup_trace.mark("加载设置和预设")
+
+        # 预设修改的撤销和重做，每一步只记录逆操作
+        self.undo_history = UndoHistory()
+
+        # 预设的历史版本，首次修改或查看时才创建，启动时不读取
+        self.revisions = None
+
+        # 异步剪贴板写入器
+        self.clipboard = ClipboardWriter(self.root)
+
+        # 命令型预设执行器
+        self.commands = CommandRunner()
+
+        # 文本区域尚未完成的分块加载：控件 -> (after标识, 内容, 已加载位置)
+        self.text_load_jobs = {}
+
+        # 复制提示框，首次使用时创建
+        self.toast = None
+        self.toast_job = None
+
+        # 剪贴板历史
+        self.history = ClipboardHistory()
+        self.history_file = os.path.join(
+            self.data_dir, "clipboard_history.json")
+        self.history_save_job = None
+        self.history_popup = None
+        self.load_history()
+
+        # 预设使用记录，用于常用度排序和"最常用"选项卡
+        self.usage = UsageLog(os.path.join(self.data_dir, "usage.jsonl"))
+        self.usage_flush_job = None
+        # "最常用"选项卡上次刷新时使用记录的版本
+        self.most_used_version = None
+        self.load_usage()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+
+        # 全局热键
+        self.hotkeys = HotkeyManager(self.root)
+        self.hotkeys.register_action("toggle", self.toggle_visibility)
+        self.hotkeys.register_action("history", self.show_history_popup)
+        self.hotkeys.register_action("paste_preset", self.paste_preset_hotkey)
+        self.hotkeys.register_action("palette", self.show_palette)
+        # 不在设置界面中显示，可在settings.json的hotkeys中绑定
+        self.hotkeys.register_action("profile", self.toggle_profiling)
+        self.preset_hotkeys = {}
+
+        # 主循环卡顿检测，折叠堆栈写入 stalls.log
+        self.watchdog = None
+        threshold = self.settings.get("stall_threshold_ms", 0)
+        if threshold > 0:
+            self.watchdog = StallWatchdog(
+                os.path.join(self.data_dir, "stalls.log"), threshold / 1000)
+
+        # 按需性能分析，报告保存在presets.json所在目录（首次使用时导入cProfile）
+        self.profile_session = None
+        self.profile_peak_widgets = 0
+        self.profile_job = None
+        self.profile_button = None
+        self.root.bind("<Control-Shift-P>", self.toggle_profiling)
+        self.root.bind("<Control-Shift-p>", self.toggle_profiling)
+
+        # 撤销和重做预设的修改（焦点在输入框中时仍用于编辑文本）
+        self.root.bind("<Control-z>", self.on_undo_key)
+        for sequence in ("<Control-y>", "<Control-Shift-Z>", "<Control-Shift-z>"):
+            self.root.bind(sequence, self.on_redo_key)
+
+        # 启动完成后立即退出，用于测量启动耗时
+        self.exit_after_startup = exit_after_startup
+
+        # 快速搜索面板和设置选项卡在窗口显示后再创建
+        self.palette = None
+        self.settings_notebook = None
 
         # 创建UI
         self.create_ui()
-
-        # 设置热键监听线程
-        self.hotkey_thread = threading.Thread(
-            target=self.listen_for_hotkeys, daemon=True)
-        self.hotkey_thread.start()
-
-    def get_data_dir(self):
-        """获取数据目录，优先使用当前目录"""
-        # 首先检查当前工作目录
-        current_dir = os.getcwd()
-        if os.path.exists(os.path.join(current_dir, "presets.json")):
-            return current_dir
-
-        # 如果当前目录下不存在配置文件，则检查exe所在目录
-        if getattr(sys, 'frozen', False):
-            # 在PyInstaller打包环境中
-            exe_dir = os.path.dirname(sys.executable)
-            if os.path.exists(os.path.join(exe_dir, "presets.json")):
-                return exe_dir
-
-        # 最后使用脚本所在目录或用户数据目录
-        if getattr(sys, 'frozen', False):
-            # 使用exe所在目录
-            app_data = os.path.dirname(sys.executable)
-        else:
-            # 在开发环境中使用脚本所在目录
-            app_data = os.path.dirname(os.path.abspath(__file__))
-
-        return app_data
+        startup_trace.mark("创建快速访问选项卡")
+
+        # 其余部分在窗口显示后逐个完成，不推迟首次显示
+        self.root.after_idle(self.run_deferred_startup, [
+            ("启动卡顿检测", self.start_watchdog),
+            ("注册全局热键", self.apply_hotkeys),
+            ("注册预设热键", self.refresh_preset_hotkeys),
+            # 预先创建隐藏的快速搜索面板，之后每次调用直接复用
+            ("创建快速搜索面板", self.ensure_palette),
+            ("创建设置选项卡", self.ensure_settings_tab),
+        ])
+
+        # 单实例服务，接收再次启动和命令行工具发来的请求
+        self.server = server
+        if self.server is not None:
+            try:
+                self.server.start(self.serve_request)
+            except OSError as e:
+                print(f"无法启动单实例服务: {str(e)}")
+
+    @property
+    def presets(self):
+        """预设文本数据 {分组: {名称: 预设}}"""
+        return self.store.presets
+
+    @property
+    def data_file(self):
+        """预设文件路径，保存到备用位置后会改变"""
+        return self.store.data_file
+
+    def save_settings(self):
+        """保存应用设置"""
+        try:
+            core.save_settings(self.settings_file, self.settings)
+            return True
+        except Exception as e:
+            messagebox.showerror("保存错误", f"无法保存设置: {str(e)}")
+            return False
 
     def load_presets(self):
         """从JSON文件加载预设文本"""
-        default_presets = {"常用": {
-            "欢迎使用": "欢迎使用QuickText!\n\n这是您的第一个预设文本。\n您可以在设置中添加更多预设。",
-            "网络诊断": "ipconfig /all & ping www.google.com",
-            "系统信息": "systeminfo",
-            "查看进程": "tasklist | findstr \"chrome\""
-        }}
-
-        if os.path.exists(self.data_file):
-            try:
-                with open(self.data_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-
-                    # 检查是否为新的分组格式，如果不是则转换
-                    if data and not isinstance(next(iter(data.values())), dict):
-                        # 转换旧格式到新格式
-                        return {"常用": data}
-                    return data
-            except Exception as e:
-                messagebox.showerror("加载错误", f"无法加载预设文件: {str(e)}")
-                # 创建默认预设文件
-                self.presets = default_presets
-                self.save_presets()
-                return default_presets
-        else:
+        try:
+            self.store.load()
+        except Exception as e:
+            messagebox.showerror("加载错误", f"无法加载预设文件: {str(e)}")
             # 创建默认预设文件
-            self.presets = default_presets
-            self.save_presets()
-            return default_presets
+            self.store.reset()
+            self.report_save_error()
 
     def save_presets(self):
         """保存预设文本到JSON文件"""
-        try:
-            # 确保目录存在
-            dir_path = os.path.dirname(self.data_file)
-            if dir_path and not os.path.exists(dir_path):
-                os.makedirs(dir_path, exist_ok=True)
-
-            with open(self.data_file, 'w', encoding='utf-8') as f:
-                json.dump(self.presets, f, ensure_ascii=False, indent=2)
-
-            print(f"预设数据已保存到: {self.data_file}")
-            return True
-        except Exception as e:
-            error_msg = f"无法保存预设文件: {str(e)}"
-            messagebox.showerror("保存错误", error_msg)
-            print(f"保存错误: {str(e)}, 路径: {self.data_file}")
+        saved = self.store.save()
+        self.report_save_error()
+        return saved
 
-            # 尝试保存到当前工作目录
-            try:
-                current_dir = os.getcwd()
-                fallback_file = os.path.join(current_dir, "presets.json")
-                with open(fallback_file, 'w', encoding='utf-8') as f:
-                    json.dump(self.presets, f, ensure_ascii=False, indent=2)
-
-                # 更新数据文件路径
-                self.data_dir = current_dir
-                self.data_file = fallback_file
-
-                print(f"已成功保存到备用位置: {fallback_file}")
-                return True
-            except Exception as e2:
-                print(f"备用保存也失败: {str(e2)}")
-                return False
+    def report_save_error(self):
+        """提示最近一次保存到首选位置失败"""
+        if self.store.save_error is not None:
+            messagebox.showerror(
+                "保存错误", f"无法保存预设文件: {str(self.store.save_error)}")
+            self.store.save_error = None
 
     def create_ui(self):
         """创建用户界面"""
@@ -147,8 +563,51 @@ class QuickText:
         # 设置快速访问选项卡
         self.setup_quick_tab()
 
-        # 设置设置选项卡（包含预设管理功能）
-        self.setup_settings_tab()
+        # 设置选项卡（包含预设管理功能）在首次切换到该选项卡或启动完成后创建
+        self.notebook.bind("<<NotebookTabChanged>>", self.on_main_tab_changed)
+
+    def run_deferred_startup(self, stages):
+        """窗口显示后执行剩余的启动阶段，每个阶段之间让出主循环处理事件"""
+        if not stages:
+            startup_trace.mark("启动完成")
+            if self.exit_after_startup:
+                self.on_close()
+            return
+
+        name, func = stages[0]
+        func()
+        startup_trace.mark(name)
+        self.root.after_idle(self.run_deferred_startup, stages[1:])
+
+    def start_watchdog(self):
+        """开始检测主循环卡顿，窗口隐藏或最小化期间暂停"""
+        if self.watchdog is None:
+            return
+        self.watchdog.start(self.root)
+        if self.root.state() != 'normal':
+            self.watchdog.pause()
+        self.root.bind("<Map>", self.on_root_map, add="+")
+        self.root.bind("<Unmap>", self.on_root_map, add="+")
+
+    def on_root_map(self, event):
+        """主窗口显示时恢复卡顿检测，隐藏时暂停"""
+        # 绑定在主窗口上的事件也会由其中的控件触发
+        if event.widget is not self.root:
+            return
+        if event.type == tk.EventType.Map:
+            self.watchdog.resume()
+        else:
+            self.watchdog.pause()
+
+    def on_main_tab_changed(self, event):
+        """切换到设置选项卡时确保其已创建"""
+        if self.notebook.select() == str(self.settings_frame):
+            self.ensure_settings_tab()
+
+    def ensure_settings_tab(self):
+        """创建设置选项卡，已创建时不做处理"""
+        if self.settings_notebook is None:
+            self.setup_settings_tab()
 
     def create_custom_styles(self):
         """创建自定义样式"""
@@ -199,6 +658,8 @@ class QuickText:
         # 创建一个包含选项卡的笔记本控件，用于分组
         self.groups_notebook = ttk.Notebook(left_frame)
         self.groups_notebook.pack(fill=tk.BOTH, expand=True)
+        self.groups_notebook.bind("<<NotebookTabChanged>>",
+                                  lambda event: self.refresh_most_used_if_stale())
 
         # 右侧预览框架
         right_frame = ttk.Frame(quick_paned)
@@ -213,101 +674,511 @@ class QuickText:
         self.preview_text.pack(fill=tk.BOTH, expand=True)
         self.preview_text.config(state=tk.DISABLED)  # 设为只读
 
+        # 鼠标滚轮滚动当前分组，只绑定一次（每次重建选项卡都调用bind_all
+        # 会不断注册新的回调，且滚动的总是最后创建的画布）
+        self.groups_notebook.bind_all("<MouseWheel>", self.on_group_mouse_wheel)
+        self.groups_notebook.bind_all("<Button-4>", self.on_group_mouse_wheel)
+        self.groups_notebook.bind_all("<Button-5>", self.on_group_mouse_wheel)
+
         # 设置分组和刷新按钮
+        self.group_frames = {}
         self.setup_group_tabs()
 
+        # 定期检查控件数量是否偏离预期
+        self.widget_baseline = None
+        self.root.after(WIDGET_CHECK_INTERVAL, self.check_widget_accounting)
+
+    @perf.timed("render.group_tabs")
     def setup_group_tabs(self):
         """设置分组选项卡"""
-        # 清除现有选项卡
-        for tab in self.groups_notebook.tabs():
-            self.groups_notebook.forget(tab)
+        # 销毁现有选项卡（只从笔记本中移除不会释放其中的控件）
+        for frame in self.group_frames.values():
+            frame.destroy()
 
         # 为每个分组创建一个选项卡
         self.group_frames = {}
         self.group_canvases = {}
         self.group_button_frames = {}
+        # 分组当前显示的 (项目, 按钮命令工厂)，画布宽度变化时用于重新布局
+        self.group_items = {}
+        # 分组画布上次布局时的宽度
+        self.group_widths = {}
 
-        for group_name in self.presets.keys():
-            # 创建分组框架
-            group_frame = ttk.Frame(self.groups_notebook)
-            self.groups_notebook.add(group_frame, text=group_name)
-            self.group_frames[group_name] = group_frame
-
-            # 创建滚动区域
-            canvas = tk.Canvas(group_frame, width=300, height=200)
-            scrollbar = ttk.Scrollbar(
-                group_frame, orient=tk.VERTICAL, command=canvas.yview)
-
-            button_frame = ttk.Frame(canvas)
+        # "最常用"选项卡排在最前面
+        if self.settings.get("show_most_used"):
+            self.create_group_view(MOST_USED_TAB)
 
-            canvas.configure(yscrollcommand=scrollbar.set)
-            canvas.bind_all("<MouseWheel>", lambda event, c=canvas: c.yview_scroll(
-                int(-1*(event.delta/120)), "units"))
-            canvas.bind_all("<Button-4>", lambda event,
-                            c=canvas: c.yview_scroll(-1, "units"))
-            canvas.bind_all("<Button-5>", lambda event,
-                            c=canvas: c.yview_scroll(1, "units"))
+        for group_name in self.store.ordered_groups():
+            self.create_group_view(group_name)
 
-            scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-            canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        # 刷新所有分组的按钮
+        self.refresh_all_group_buttons()
+        self.refresh_most_used_view()
 
-            # 创建按钮框架
-            canvas.create_window((0, 0), window=button_frame,
-                                 anchor=tk.NW, width=canvas.winfo_width())
+    def create_group_view(self, group_name):
+        """创建一个分组（或搜索结果）选项卡及其滚动区域"""
+        # 创建分组框架
+        group_frame = ttk.Frame(self.groups_notebook)
+        self.groups_notebook.add(group_frame, text=group_name)
+        self.group_frames[group_name] = group_frame
 
-            # 更新Canvas的scrollregion
-            def update_scrollregion(event, c=canvas):
-                c.configure(scrollregion=c.bbox("all"))
-                # 调整按钮框架宽度与Canvas宽度一致
-                c.itemconfig(c.find_withtag("all")[0], width=c.winfo_width())
+        # 创建滚动区域
+        canvas = tk.Canvas(group_frame, width=300, height=200)
+        scrollbar = ttk.Scrollbar(
+            group_frame, orient=tk.VERTICAL, command=canvas.yview)
 
-            button_frame.bind("<Configure>", update_scrollregion)
+        button_frame = ttk.Frame(canvas)
 
-            # 存储引用
-            self.group_canvases[group_name] = canvas
-            self.group_button_frames[group_name] = button_frame
+        canvas.configure(yscrollcommand=scrollbar.set)
 
-            # 初始化分组的最后宽度记录
-            setattr(self, f'last_width_{group_name}', canvas.winfo_width())
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        # 创建按钮框架
+        canvas.create_window((0, 0), window=button_frame,
+                             anchor=tk.NW, width=canvas.winfo_width())
+
+        # 更新Canvas的scrollregion
+        def update_scrollregion(event, c=canvas):
+            c.configure(scrollregion=c.bbox("all"))
+            # 调整按钮框架宽度与Canvas宽度一致
+            c.itemconfig(c.find_withtag("all")[0], width=c.winfo_width())
+
+        button_frame.bind("<Configure>", update_scrollregion)
+
+        # 窗口大小变化时按当前显示的项目重新布局，只绑定一次
+        canvas.bind("<Configure>", lambda event, g=group_name:
+                    self.on_canvas_resize(event, g))
+
+        # 存储引用
+        self.group_canvases[group_name] = canvas
+        self.group_button_frames[group_name] = button_frame
+
+        # 初始化分组的最后宽度记录
+        self.group_widths[group_name] = canvas.winfo_width()
+
+    def remove_group_view(self, group_name):
+        """销毁一个分组（或搜索结果）选项卡"""
+        frame = self.group_frames.pop(group_name, None)
+        if frame is not None:
+            frame.destroy()
+        self.group_canvases.pop(group_name, None)
+        self.group_button_frames.pop(group_name, None)
+        self.group_items.pop(group_name, None)
+        self.group_widths.pop(group_name, None)
+
+    def group_tab_index(self, group_name):
+        """分组选项卡应在的位置（"最常用"选项卡排在最前面）"""
+        index = self.store.ordered_groups().index(group_name)
+        return index + 1 if MOST_USED_TAB in self.group_frames else index
+
+    def add_group_view(self, group_name):
+        """按分组的顺序插入一个分组选项卡并显示其按钮，不重建其他分组"""
+        self.create_group_view(group_name)
+        self.groups_notebook.insert(self.group_tab_index(group_name),
+                                    self.group_frames[group_name])
+        # 搜索中由调用者重新搜索
+        if not self.search_var.get():
+            self.refresh_group_buttons(group_name)
+
+    def on_group_mouse_wheel(self, event):
+        """在分组选项卡中滚动鼠标滚轮时滚动当前分组"""
+        # Windows下滚轮事件发给焦点控件，按鼠标所在位置判断
+        try:
+            widget = self.root.winfo_containing(event.x_root, event.y_root)
+        except KeyError:
+            # 鼠标位于Tk内部创建的控件上（如下拉框的弹出列表）
+            return
+        if widget is None or not str(widget).startswith(str(self.groups_notebook)):
+            return
+        selected = self.groups_notebook.select()
+        for group_name, frame in self.group_frames.items():
+            if str(frame) == selected:
+                break
+        else:
+            return
 
-        # 刷新所有分组的按钮
-        self.refresh_all_group_buttons()
+        if event.num == 4:
+            delta = -1
+        elif event.num == 5:
+            delta = 1
+        else:
+            delta = int(-1*(event.delta/120))
+        self.group_canvases[group_name].yview_scroll(delta, "units")
 
     def refresh_all_group_buttons(self):
         """刷新所有分组的按钮"""
-        for group_name, items in self.presets.items():
-            self.refresh_group_buttons(group_name, items)
+        for group_name in self.store.ordered_groups():
+            self.refresh_group_buttons(group_name)
 
-    def refresh_group_buttons(self, group_name, items):
+    def refresh_group_buttons(self, group_name):
         """刷新指定分组的按钮"""
-        self.create_buttons_for_items(group_name, items)
+        self.create_buttons_for_items(
+            group_name, [(name, preset_content(value))
+                         for name, value in self.store.ordered_items(group_name)])
 
-    def on_canvas_resize(self, event, group_name, items):
+    def refresh_most_used_view(self):
+        """按常用度刷新"最常用"选项卡"""
+        if MOST_USED_TAB not in self.group_button_frames:
+            return
+        keys = self.usage.top(exists=self.preset_exists)
+        labels = {f"[{group}] {name}": (group, name) for group, name in keys}
+
+        def create_handler(label, content):
+            group, name = labels[label]
+
+            def command():
+                # 点击时再读取内容，预设在此期间可能已被修改或删除
+                if self.preset_exists(group, name):
+                    self.show_and_copy_preset(
+                        group, name, preset_content(self.presets[group][name]))
+            return command
+
+        self.create_buttons_for_items(
+            MOST_USED_TAB,
+            [(label, preset_content(self.presets[group][name]))
+             for label, (group, name) in labels.items()],
+            create_handler)
+        self.most_used_version = self.usage.version
+
+    def refresh_most_used_if_stale(self):
+        """当前显示"最常用"选项卡且使用记录有变化时刷新
+
+        复制后不立即刷新，避免按钮在鼠标下改变位置。
+        """
+        frame = self.group_frames.get(MOST_USED_TAB)
+        if (frame is not None and self.most_used_version != self.usage.version
+                and self.groups_notebook.select() == str(frame)):
+            self.refresh_most_used_view()
+
+    def on_canvas_resize(self, event, group_name):
         """当画布大小变化时重新布局按钮"""
         # 获取新的画布宽度
         new_width = event.width
 
         # 如果宽度变化超过一定阈值，重新排列按钮
-        if abs(new_width - getattr(self, f'last_width_{group_name}', 0)) > 50:
-            setattr(self, f'last_width_{group_name}', new_width)
-            self.refresh_group_buttons(group_name, items)
+        if abs(new_width - self.group_widths.get(group_name, 0)) > 50:
+            self.group_widths[group_name] = new_width
+            if group_name in self.group_items:
+                self.create_buttons_for_items(
+                    group_name, *self.group_items[group_name])
 
     def show_and_copy_preset(self, group_name, name, content):
         """显示预设内容并复制到剪贴板"""
+        # 命令型预设复制命令的输出
+        value = self.presets.get(group_name, {}).get(name)
+        if preset_options(value).get("command"):
+            self.resolve_preset(
+                group_name, name,
+                lambda output: self.copy_and_preview(group_name, name, output))
+            return
+
+        if self.settings.get("expand_templates"):
+            template = compile_template(content)
+            if template.variables:
+                values = self.builtin_template_values(template)
+                missing = [v for v in template.variables if v not in values]
+                if missing:
+                    # 需要用户填写的变量，填写完成后再复制
+                    self.prompt_template_values(
+                        group_name, name, content, template, values, missing)
+                    return
+                content = template.render(values)
+
+        self.copy_and_preview(group_name, name, content)
+
+    def copy_and_preview(self, group_name, name, content):
+        """复制内容并在预览区域显示"""
+        # 先复制到剪贴板，不等待预览加载
+        self.copy_to_clipboard(content, preset_id=(group_name, name))
+
         # 显示预设内容
-        self.preview_text.config(state=tk.NORMAL)
-        self.preview_text.delete(1.0, tk.END)
-        self.preview_text.insert(tk.END, content)
-        self.preview_text.config(state=tk.DISABLED)
+        self.load_text_chunked(self.preview_text, content, readonly=True)
+
+    def resolve_preset(self, group, name, deliver, on_error=None):
+        """取得预设实际要复制的内容后调用 deliver(内容)
+
+        普通预设只展开内置变量后立即调用；命令型预设有缓存结果时立即使用缓存，
+        否则在命令执行完成后回到主循环中调用，执行期间不阻塞界面。
+        命令执行失败时调用 on_error(错误)。
+        """
+        value = self.presets[group][name]
+        content = preset_content(value)
+        options = preset_options(value)
+        if not options.get("command"):
+            deliver(self.expand_builtin_variables(content))
+            return
+
+        def finish(output, error):
+            if error is not None:
+                self.show_toast("命令执行失败", str(error)[:40])
+                if on_error is not None:
+                    on_error(error)
+                return
+            deliver(output)
+
+        cached = self.commands.get(
+            (group, name), content,
+            options.get("ttl", core.DEFAULT_COMMAND_TTL),
+            options.get("timeout", core.DEFAULT_COMMAND_TIMEOUT),
+            lambda output, error: self.hotkeys.post(finish, output, error))
+
+        if cached is not None:
+            deliver(cached)
+        else:
+            self.show_toast("正在执行命令", name)
+
+    def expand_builtin_variables(self, content):
+        """只展开内置变量，用于不便弹出对话框的复制方式"""
+        if not self.settings.get("expand_templates"):
+            return content
+        template = compile_template(content)
+        if not template.variables:
+            return content
+        return template.render(self.builtin_template_values(template))
+
+    def builtin_template_values(self, template):
+        """计算模板中用到的内置变量"""
+        return core.builtin_values(template, self.read_clipboard)
+
+    def read_clipboard(self):
+        """读取当前剪贴板内容，剪贴板为空或不是文本时返回空字符串"""
+        try:
+            return self.root.clipboard_get()
+        except tk.TclError:
+            return ""
+
+    def prompt_template_values(self, group_name, name, content, template, values, missing):
+        """弹出对话框填写模板变量"""
+        dialog = tk.Toplevel(self.root)
+        dialog.title("填写模板变量")
+        dialog.transient(self.root)
+        dialog.grab_set()
+
+        # 居中显示对话框，高度随变量数量增加
+        self.center_dialog(dialog, height=90 + 35 * len(missing))
+
+        frame = ttk.Frame(dialog, padding="10")
+        frame.pack(fill=tk.BOTH, expand=True)
+        frame.grid_columnconfigure(1, weight=1)
+
+        entries = {}
+        for row, variable in enumerate(missing):
+            ttk.Label(frame, text=f"{variable}:").grid(
+                row=row, column=0, sticky=tk.W, pady=3)
+            entry = ttk.Entry(frame)
+            entry.grid(row=row, column=1, sticky="ew", padx=(5, 0), pady=3)
+            entries[variable] = entry
+        entries[missing[0]].focus_set()
 
-        # 复制到剪贴板
-        self.copy_to_clipboard(content)
+        # 按钮框架
+        btn_frame = ttk.Frame(frame)
+        btn_frame.grid(row=len(missing), column=0, columnspan=2,
+                       sticky="ew", pady=(10, 0))
+
+        def on_ok():
+            filled = dict(values)
+            for variable, entry in entries.items():
+                filled[variable] = entry.get()
+            dialog.destroy()
+            self.copy_and_preview(group_name, name, template.render(filled))
+
+        def on_raw():
+            dialog.destroy()
+            self.copy_and_preview(group_name, name, content)
+
+        # 确定按钮
+        ttk.Button(btn_frame, text="确定", command=on_ok).pack(
+            side=tk.LEFT, padx=5)
+
+        # 原样复制按钮
+        ttk.Button(btn_frame, text="原样复制", command=on_raw).pack(
+            side=tk.LEFT, padx=5)
+
+        # 取消按钮
+        ttk.Button(btn_frame, text="取消", command=dialog.destroy).pack(
+            side=tk.RIGHT, padx=5)
+
+        dialog.bind("<Return>", lambda e: on_ok())
+        dialog.bind("<Escape>", lambda e: dialog.destroy())
+
+    def load_text_chunked(self, widget, content, readonly=False):
+        """分块向文本区域加载内容
+
+        第一块立即显示，其余部分通过after分批插入，避免大内容阻塞界面。
+        同一文本区域再次加载时取消尚未完成的加载。
+        """
+        self.cancel_text_load(widget)
+
+        widget.config(state=tk.NORMAL)
+        widget.delete(1.0, tk.END)
+        # 大内容关闭自动换行，换行计算是插入时最主要的开销
+        large = len(content) > LARGE_CONTENT_THRESHOLD
+        widget.config(wrap=tk.NONE if large else tk.WORD)
+
+        def load_chunk(offset):
+            widget.config(state=tk.NORMAL)
+            widget.insert(tk.END, content[offset:offset + TEXT_CHUNK_SIZE])
+            if readonly:
+                widget.config(state=tk.DISABLED)
+
+            offset += TEXT_CHUNK_SIZE
+            if offset < len(content):
+                self.text_load_jobs[widget] = (
+                    widget.after(1, load_chunk, offset), content, offset)
+            else:
+                self.text_load_jobs.pop(widget, None)
+
+        load_chunk(0)
+
+    def cancel_text_load(self, widget):
+        """取消文本区域尚未完成的分块加载"""
+        job = self.text_load_jobs.pop(widget, None)
+        if job is not None:
+            widget.after_cancel(job[0])
+
+    def finish_text_load(self, widget):
+        """立即插入文本区域中尚未加载的剩余内容"""
+        job = self.text_load_jobs.pop(widget, None)
+        if job is not None:
+            after_id, content, offset = job
+            widget.after_cancel(after_id)
+            state = widget.cget("state")
+            widget.config(state=tk.NORMAL)
+            widget.insert(tk.END, content[offset:])
+            widget.config(state=state)
+
+    def load_history(self):
+        """加载剪贴板历史"""
+        try:
+            self.history.load(self.history_file)
+        except Exception as e:
+            print(f"加载剪贴板历史失败: {str(e)}")
+
+    def load_usage(self):
+        """加载预设使用记录"""
+        try:
+            self.usage.load()
+        except Exception as e:
+            print(f"加载使用记录失败: {str(e)}")
+
+    def flush_usage(self):
+        """写入预设使用记录"""
+        self.usage_flush_job = None
+        try:
+            self.usage.flush(self.preset_exists)
+        except OSError as e:
+            print(f"保存使用记录失败: {str(e)}")
+
+    def schedule_usage_flush(self):
+        """延迟写入使用记录，连续复制只写一次文件"""
+        if self.usage_flush_job is None:
+            self.usage_flush_job = self.root.after(
+                USAGE_FLUSH_DELAY, self.flush_usage)
+
+    def record_preset_use(self, group, name):
+        """记录一次预设复制到剪贴板历史和使用记录"""
+        self.history.push_preset(group, name)
+        self.schedule_history_save()
+        self.usage.record(group, name)
+        self.schedule_usage_flush()
+
+    def preset_exists(self, group, name):
+        """预设是否存在"""
+        return name in self.presets.get(group, {})
+
+    def save_history(self):
+        """保存剪贴板历史"""
+        self.history_save_job = None
+        try:
+            self.history.save(self.history_file)
+        except Exception as e:
+            print(f"保存剪贴板历史失败: {str(e)}")
+
+    def schedule_history_save(self):
+        """延迟保存剪贴板历史，连续复制只写一次文件"""
+        if self.history_save_job is None:
+            self.history_save_job = self.root.after(
+                2000, self.save_history)
+
+    def create_history_popup(self):
+        """创建剪贴板历史弹出窗口（只创建一次，之后隐藏复用）"""
+        popup = tk.Toplevel(self.root)
+        popup.title("剪贴板历史")
+        popup.withdraw()
+        popup.protocol("WM_DELETE_WINDOW", popup.withdraw)
+
+        listbox = tk.Listbox(popup, width=50, height=15, activestyle="none")
+        listbox.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+
+        listbox.bind("<Return>", lambda e: self.paste_history_item())
+        listbox.bind("<Double-Button-1>",
+                     lambda e: self.paste_history_item())
+        listbox.bind("<Escape>", lambda e: popup.withdraw())
+
+        self.history_popup = popup
+        self.history_listbox = listbox
+        self.history_keys = []
+        self.history_version = -1
+
+    def show_history_popup(self):
+        """显示剪贴板历史弹出窗口"""
+        if self.history_popup is None:
+            self.create_history_popup()
+
+        # 只有历史变化后才重新填充列表
+        if self.history_version != self.history.version:
+            self.history_keys = []
+            labels = []
+            for key in self.history.items():
+                if key[0] == "preset":
+                    group, name = key[1], key[2]
+                    if name not in self.presets.get(group, {}):
+                        continue
+                    labels.append(f"[{group}] {name}")
+                else:
+                    text = key[1].replace("\n", " ")
+                    labels.append(text[:40] + "..." if len(text) > 40 else text)
+                self.history_keys.append(key)
+
+            self.history_listbox.delete(0, tk.END)
+            if labels:
+                self.history_listbox.insert(tk.END, *labels)
+            self.history_version = self.history.version
+
+        # 显示在鼠标附近
+        x, y = self.root.winfo_pointerxy()
+        self.history_popup.geometry(f"+{x}+{y}")
+        self.history_popup.deiconify()
+        self.history_popup.lift()
+        self.history_listbox.focus_force()
+        if self.history_keys:
+            self.history_listbox.selection_clear(0, tk.END)
+            self.history_listbox.selection_set(0)
+            self.history_listbox.activate(0)
+
+    def paste_history_item(self):
+        """将选中的历史条目重新复制到剪贴板"""
+        selection = self.history_listbox.curselection()
+        if not selection:
+            return
+        key = self.history_keys[selection[0]]
+        self.history_popup.withdraw()
+
+        if key[0] == "preset":
+            group, name = key[1], key[2]
+            if name in self.presets.get(group, {}):
+                self.resolve_preset(group, name, lambda content: self.copy_to_clipboard(
+                    content, preset_id=(group, name)))
+        else:
+            self.copy_to_clipboard(key[1])
 
     def setup_settings_tab(self):
         """设置选项卡（包含预设管理功能）"""
         # 创建一个笔记本小部件，用于在设置中切换不同功能
         settings_notebook = ttk.Notebook(self.settings_frame)
         settings_notebook.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self.settings_notebook = settings_notebook
 
         # 常规设置选项卡
         general_frame = ttk.Frame(settings_notebook)
@@ -330,6 +1201,14 @@ class QuickText:
         # 设置关于选项卡
         self.setup_about_tab(about_frame)
 
+        # 诊断选项卡默认隐藏，按 Ctrl+Shift+D 显示
+        self.diagnostics_frame = ttk.Frame(settings_notebook)
+        settings_notebook.add(self.diagnostics_frame, text="诊断",
+                              state=tk.NORMAL if perf.enabled else tk.HIDDEN)
+        self.setup_diagnostics_tab(self.diagnostics_frame)
+        settings_notebook.bind("<<NotebookTabChanged>>",
+                               lambda event: self.refresh_diagnostics())
+
     def setup_general_tab(self, parent_frame):
         """设置常规设置选项卡"""
         # 设置标签
@@ -337,11 +1216,85 @@ class QuickText:
             anchor=tk.W, padx=10, pady=10)
 
         # 热键说明
-        ttk.Label(
-            parent_frame, text="按Ctrl+Alt+Q 打开/隐藏应用").pack(anchor=tk.W, padx=10, pady=5)
+        ttk.Label(parent_frame, text="每个动作可以绑定多个热键，用逗号分隔，例如 ctrl+alt+q, ctrl+shift+space").pack(
+            anchor=tk.W, padx=10, pady=5)
+
+        # 每个动作一行热键输入框
+        hotkeys_frame = ttk.Frame(parent_frame)
+        hotkeys_frame.pack(fill=tk.X, padx=10, pady=5)
+        hotkeys_frame.grid_columnconfigure(1, weight=1)
+
+        self.hotkey_vars = {}
+        for row, (action, description) in enumerate(HOTKEY_ACTIONS):
+            ttk.Label(hotkeys_frame, text=f"{description}:").grid(
+                row=row, column=0, sticky=tk.W, pady=3)
+            var = tk.StringVar(value=", ".join(
+                self.settings["hotkeys"].get(action, [])))
+            ttk.Entry(hotkeys_frame, textvariable=var).grid(
+                row=row, column=1, sticky="ew", padx=(5, 0), pady=3)
+            self.hotkey_vars[action] = var
+
+        ttk.Button(parent_frame, text="应用热键",
+                   command=self.save_hotkey_settings).pack(anchor=tk.W, padx=10, pady=5)
+
+        # 模板设置
+        ttk.Label(parent_frame, text="模板设置").pack(
+            anchor=tk.W, padx=10, pady=(15, 5))
+
+        self.expand_templates_var = tk.BooleanVar(
+            value=self.settings.get("expand_templates", True))
+        ttk.Checkbutton(parent_frame, text="复制时填写模板变量（如 [日期]、[时间]、[剪贴板]）",
+                        variable=self.expand_templates_var,
+                        command=self.save_template_settings).pack(anchor=tk.W, padx=10, pady=5)
+
+        # 常用度设置
+        ttk.Label(parent_frame, text="常用预设").pack(
+            anchor=tk.W, padx=10, pady=(15, 5))
+
+        self.rank_search_var = tk.BooleanVar(
+            value=self.settings.get("rank_search_by_usage", True))
+        ttk.Checkbutton(parent_frame, text="搜索结果中经常使用的预设排在前面",
+                        variable=self.rank_search_var,
+                        command=self.save_usage_settings).pack(anchor=tk.W, padx=10, pady=5)
+
+        self.show_most_used_var = tk.BooleanVar(
+            value=self.settings.get("show_most_used", False))
+        ttk.Checkbutton(parent_frame, text=f"在快速访问中显示\"{MOST_USED_TAB}\"选项卡",
+                        variable=self.show_most_used_var,
+                        command=self.save_usage_settings).pack(anchor=tk.W, padx=10, pady=5)
 
         # 添加更多设置选项（如果需要）
 
+    def save_template_settings(self):
+        """保存模板设置"""
+        self.settings["expand_templates"] = self.expand_templates_var.get()
+        self.save_settings()
+
+    def save_usage_settings(self):
+        """保存常用度设置，显示或隐藏"最常用"选项卡"""
+        self.settings["rank_search_by_usage"] = self.rank_search_var.get()
+        show_most_used = self.show_most_used_var.get()
+        changed = show_most_used != self.settings.get("show_most_used", False)
+        self.settings["show_most_used"] = show_most_used
+        self.save_settings()
+        if changed:
+            self.setup_group_tabs()
+
+    def save_hotkey_settings(self):
+        """保存热键设置并重新注册"""
+        for action, var in self.hotkey_vars.items():
+            hotkeys = [h.strip().lower()
+                       for h in var.get().split(",") if h.strip()]
+            self.settings["hotkeys"][action] = hotkeys
+        self.save_settings()
+
+        errors = self.apply_hotkeys()
+        if errors:
+            messagebox.showerror("错误", "以下热键注册失败:\n" + "\n".join(
+                f"{hotkey}: {str(e)}" for hotkey, e in errors))
+        else:
+            messagebox.showinfo("成功", "热键设置已应用")
+
     def setup_about_tab(self, parent_frame):
         """设置关于选项卡"""
         # 关于信息
@@ -357,6 +1310,270 @@ class QuickText:
         ttk.Label(about_inner_frame, text="版本: 1.0.0").pack(
             anchor=tk.W, padx=5, pady=5)
 
+    def setup_diagnostics_tab(self, parent_frame):
+        """设置诊断选项卡：热点路径耗时统计"""
+        toolbar = ttk.Frame(parent_frame)
+        toolbar.pack(fill=tk.X, padx=10, pady=10)
+
+        self.perf_enabled_var = tk.BooleanVar(value=perf.enabled)
+        ttk.Checkbutton(toolbar, text="记录耗时",
+                        variable=self.perf_enabled_var,
+                        command=self.save_perf_settings).pack(side=tk.LEFT)
+        ttk.Button(toolbar, text="导出跟踪",
+                   command=self.export_perf_trace).pack(side=tk.RIGHT)
+        self.profile_button = ttk.Button(
+            toolbar, command=self.toggle_profiling,
+            text="停止性能分析" if self.profiling else "开始性能分析")
+        self.profile_button.pack(side=tk.RIGHT)
+        ttk.Button(toolbar, text="清除",
+                   command=self.clear_perf_stats).pack(side=tk.RIGHT, padx=5)
+
+        columns = ("count", "p50", "p95", "p99", "max")
+        self.perf_tree = ttk.Treeview(parent_frame, columns=columns)
+        self.perf_tree.heading("#0", text="操作")
+        self.perf_tree.column("#0", width=200)
+        for column, title in zip(columns, ("次数", "p50 (ms)", "p95 (ms)",
+                                           "p99 (ms)", "最大 (ms)")):
+            self.perf_tree.heading(column, text=title)
+            self.perf_tree.column(column, width=80, anchor=tk.E)
+        self.perf_tree.pack(fill=tk.BOTH, expand=True, padx=10, pady=(0, 10))
+
+        # 控件统计，逐个控件遍历较慢，只在点击时刷新
+        accounting_bar = ttk.Frame(parent_frame)
+        accounting_bar.pack(fill=tk.X, padx=10)
+        self.accounting_label = ttk.Label(accounting_bar, text="控件统计")
+        self.accounting_label.pack(side=tk.LEFT)
+        ttk.Button(accounting_bar, text="刷新控件统计",
+                   command=self.refresh_widget_accounting).pack(side=tk.RIGHT)
+
+        columns = ("items", "widgets", "expected_widgets", "callbacks",
+                   "expected_callbacks")
+        self.accounting_tree = ttk.Treeview(
+            parent_frame, columns=columns, height=6)
+        self.accounting_tree.heading("#0", text="分组")
+        self.accounting_tree.column("#0", width=200)
+        for column, title in zip(columns, ("按钮", "控件", "预期控件",
+                                           "回调", "预期回调")):
+            self.accounting_tree.heading(column, text=title)
+            self.accounting_tree.column(column, width=80, anchor=tk.E)
+        self.accounting_tree.pack(fill=tk.X, padx=10, pady=(5, 10))
+
+        self.diagnostics_job = None
+        self.root.bind("<Control-Shift-D>", self.show_diagnostics_tab)
+        self.root.bind("<Control-Shift-d>", self.show_diagnostics_tab)
+
+    def show_diagnostics_tab(self, event=None):
+        """显示并切换到诊断选项卡"""
+        self.notebook.select(self.settings_frame)
+        self.settings_notebook.tab(self.diagnostics_frame, state=tk.NORMAL)
+        self.settings_notebook.select(self.diagnostics_frame)
+        return "break"
+
+    def diagnostics_visible(self):
+        """诊断选项卡当前是否可见"""
+        return (self.root.state() != "withdrawn" and
+                self.notebook.select() == str(self.settings_frame) and
+                self.settings_notebook.select() == str(self.diagnostics_frame))
+
+    def refresh_diagnostics(self):
+        """刷新耗时统计，诊断选项卡可见时每秒刷新一次"""
+        if self.diagnostics_job is not None:
+            self.root.after_cancel(self.diagnostics_job)
+            self.diagnostics_job = None
+        if not self.diagnostics_visible():
+            return
+
+        self.perf_tree.delete(*self.perf_tree.get_children())
+        for row in perf.summary():
+            self.perf_tree.insert("", tk.END, text=row["name"], values=(
+                row["count"], f"{row['p50_ms']:.2f}", f"{row['p95_ms']:.2f}",
+                f"{row['p99_ms']:.2f}", f"{row['max_ms']:.2f}"))
+        self.diagnostics_job = self.root.after(1000, self.refresh_diagnostics)
+
+    def refresh_widget_accounting(self):
+        """刷新控件统计"""
+        report = self.widget_accounting()
+        bodies = self.store.bodies.stats()
+        self.accounting_label.config(
+            text=f"预设 {report['presets']} 个（不同正文 {bodies['unique']} 份），"
+                 f"控件 {report['widgets']} 个，"
+                 f"回调 {report['callbacks']} 个，Tcl命令 {report['tcl_commands']} 个")
+        self.accounting_tree.delete(*self.accounting_tree.get_children())
+        for view in report["views"]:
+            self.accounting_tree.insert("", tk.END, text=view["group"], values=(
+                view["items"], view["widgets"], view["expected_widgets"],
+                view["callbacks"], view["expected_callbacks"]))
+
+    def save_perf_settings(self):
+        """开启或关闭耗时记录"""
+        perf.enabled = self.perf_enabled_var.get()
+        self.settings["perf_enabled"] = perf.enabled
+        self.save_settings()
+
+    def clear_perf_stats(self):
+        """清除已记录的耗时"""
+        perf.clear()
+        self.refresh_diagnostics()
+
+    def export_perf_trace(self):
+        """把最近的耗时记录导出为JSON跟踪文件"""
+        path = filedialog.asksaveasfilename(
+            title="导出跟踪", initialdir=self.data_dir,
+            initialfile="quicktext-trace.json", defaultextension=".json",
+            filetypes=[("JSON文件", "*.json")])
+        if not path:
+            return
+        try:
+            perf.export_trace(path)
+            self.show_toast("已导出跟踪", os.path.basename(path))
+        except Exception as e:
+            messagebox.showerror("导出错误", f"无法导出跟踪: {str(e)}")
+
+    @property
+    def profiling(self):
+        """是否正在进行性能分析"""
+        return self.profile_session is not None and self.profile_session.active
+
+    def toggle_profiling(self, event=None):
+        """开始或停止 cProfile 和 tracemalloc 分析"""
+        if self.profiling:
+            self.stop_profiling()
+        else:
+            if self.profile_session is None:
+                from quicktext.profiling import ProfileSession
+                self.profile_session = ProfileSession()
+            self.profile_session.start()
+            self.profile_peak_widgets = 0
+            self.sample_widget_count()
+            self.show_toast("性能分析已开始", "再次按 Ctrl+Shift+P 停止并保存报告")
+        if self.profile_button is not None:
+            self.profile_button.config(
+                text="停止性能分析" if self.profiling else "开始性能分析")
+        return "break"
+
+    def stop_profiling(self):
+        """停止分析并把报告写到presets.json旁边"""
+        if self.profile_job is not None:
+            self.root.after_cancel(self.profile_job)
+            self.profile_job = None
+        widgets = self.count_widgets()
+        info = {
+            "预设数量": self.store.count(),
+            "分组数量": len(self.presets),
+            "控件数量峰值": max(self.profile_peak_widgets, widgets),
+            "当前控件数量": widgets,
+        }
+        try:
+            report_file, _ = self.profile_session.stop(
+                os.path.dirname(self.data_file), info)
+            print(f"性能分析报告已保存到: {report_file}")
+            self.show_toast("性能分析已保存", os.path.basename(report_file))
+        except Exception as e:
+            messagebox.showerror("保存错误", f"无法保存性能分析报告: {str(e)}")
+
+    def sample_widget_count(self):
+        """分析期间每秒记录一次控件数量"""
+        self.profile_peak_widgets = max(self.profile_peak_widgets,
+                                        self.count_widgets())
+        self.profile_job = self.root.after(1000, self.sample_widget_count)
+
+    def count_widgets(self, widget=None):
+        """统计控件的所有下级控件数量，默认统计整个程序（包括隐藏的弹出窗口）"""
+        count = 0
+        pending = [widget or self.root]
+        while pending:
+            children = list(pending.pop().children.values())
+            count += len(children)
+            pending.extend(children)
+        return count
+
+    def count_callbacks(self, widget=None):
+        """统计控件及其下级控件注册的Python回调数量
+
+        每个 command、bind 等回调都注册为一个Tcl命令并保存在控件的
+        _tclCommands 中，直到控件销毁才释放，其闭包引用的对象也一直保留。
+        """
+        count = 0
+        pending = [widget or self.root]
+        while pending:
+            current = pending.pop()
+            count += len(getattr(current, "_tclCommands", None) or ())
+            pending.extend(current.children.values())
+        return count
+
+    def tcl_command_count(self):
+        """Tcl解释器中的命令数量：每个控件和每个Python回调各占一个"""
+        return len(self.root.tk.splitlist(self.root.tk.call("info", "commands")))
+
+    @staticmethod
+    def expected_view_counts(item_count):
+        """显示 item_count 个按钮的分组视图应有的 (控件数, 回调数)"""
+        return (VIEW_WIDGETS + BUTTON_WIDGETS * item_count,
+                VIEW_CALLBACKS + item_count)
+
+    def view_item_count(self, group_name):
+        """分组视图当前显示的按钮数量"""
+        items, _ = self.group_items.get(group_name, ((), None))
+        return len(items)
+
+    def widget_accounting(self):
+        """各分组视图（包括搜索结果）的控件和回调数量及其预期值"""
+        views = []
+        for group_name, frame in self.group_frames.items():
+            item_count = self.view_item_count(group_name)
+            expected_widgets, expected_callbacks = \
+                self.expected_view_counts(item_count)
+            views.append({
+                "group": group_name,
+                "items": item_count,
+                "widgets": self.count_widgets(frame),
+                "expected_widgets": expected_widgets,
+                "callbacks": self.count_callbacks(frame),
+                "expected_callbacks": expected_callbacks,
+            })
+        return {
+            "presets": self.store.count(),
+            "views": views,
+            "widgets": self.count_widgets(),
+            "callbacks": self.count_callbacks(),
+            "tcl_commands": self.tcl_command_count(),
+        }
+
+    def expected_view_tcl_commands(self):
+        """所有分组视图应占用的Tcl命令数量（选项卡框架、控件和回调）"""
+        total = 0
+        for group_name in self.group_frames:
+            widgets, callbacks = self.expected_view_counts(
+                self.view_item_count(group_name))
+            total += 1 + widgets + callbacks
+        return total
+
+    def check_widget_accounting(self):
+        """定期自检：扣除分组视图应占用的数量后，Tcl命令数量持续增长说明存在泄漏"""
+        self.root.after(WIDGET_CHECK_INTERVAL, self.check_widget_accounting)
+
+        # 只需一次Tcl调用，逐个控件统计只在发现异常时进行
+        other = self.tcl_command_count() - self.expected_view_tcl_commands()
+        if self.widget_baseline is None:
+            self.widget_baseline = other
+            return
+
+        drift = other - self.widget_baseline
+        if drift <= WIDGET_DRIFT_TOLERANCE:
+            return
+
+        report = self.widget_accounting()
+        print(f"控件数量超出预期: 比上次记录多出 {drift} 个Tcl命令，"
+              f"共 {report['widgets']} 个控件、{report['callbacks']} 个回调")
+        for view in report["views"]:
+            if view["widgets"] > view["expected_widgets"] or \
+                    view["callbacks"] > view["expected_callbacks"]:
+                print(f"  {view['group']}: 控件 {view['widgets']}"
+                      f"（预期 {view['expected_widgets']}），回调 "
+                      f"{view['callbacks']}（预期 {view['expected_callbacks']}）")
+        # 之后只在继续增长时再次报告
+        self.widget_baseline = other
+
     def setup_manage_tab(self):
         """设置预设管理选项卡"""
         # 创建分组管理选项卡
@@ -371,12 +1588,19 @@ class QuickText:
         group_manage_frame = ttk.Frame(manage_notebook)
         manage_notebook.add(group_manage_frame, text="管理分组")
 
+        # 创建导入导出框架
+        transfer_frame = ttk.Frame(manage_notebook)
+        manage_notebook.add(transfer_frame, text="导入导出")
+
         # 设置预设编辑界面
         self.setup_preset_edit_tab(edit_frame)
 
         # 设置分组管理界面
         self.setup_group_manage_tab(group_manage_frame)
 
+        # 设置导入导出界面
+        self.setup_transfer_tab(transfer_frame)
+
     def setup_preset_edit_tab(self, parent_frame):
         """设置预设编辑选项卡"""
         # 创建左右分割面板
@@ -433,6 +1657,14 @@ class QuickText:
         ttk.Button(btn_frame, text="重命名", command=self.rename_preset).pack(
             side=tk.LEFT, padx=5)
 
+        # 撤销、重做按钮
+        undo_frame = ttk.Frame(left_frame)
+        undo_frame.pack(fill=tk.X, pady=(0, 5))
+        ttk.Button(undo_frame, text="撤销", command=self.undo_change).pack(
+            side=tk.LEFT, padx=5)
+        ttk.Button(undo_frame, text="重做", command=self.redo_change).pack(
+            side=tk.LEFT, padx=5)
+
         # 右侧编辑框架
         right_frame = ttk.Frame(edit_paned)
         edit_paned.add(right_frame, weight=2)
@@ -445,19 +1677,54 @@ class QuickText:
             right_frame, wrap=tk.WORD)
         self.content_text.pack(fill=tk.BOTH, expand=True, pady=(0, 5))
 
+        # 大内容只读提示，只在需要时显示
+        self.content_notice = ttk.Label(right_frame, foreground="gray")
+        self.editor_readonly = False
+
         # 记录当前编辑的预设信息
         self.current_editing = {"group": None, "name": None}
 
         # 为编辑区域添加焦点事件，防止选择文本时丢失当前编辑的预设信息
         self.content_text.bind("<FocusIn>", self.on_content_focus)
 
+        # 预设属性：全局热键和自动输入
+        options_frame = ttk.Frame(right_frame)
+        options_frame.pack(fill=tk.X, pady=(0, 5))
+
+        ttk.Label(options_frame, text="全局热键:").pack(side=tk.LEFT)
+        self.preset_hotkey_var = tk.StringVar()
+        ttk.Entry(options_frame, textvariable=self.preset_hotkey_var, width=20).pack(
+            side=tk.LEFT, padx=5)
+
+        self.preset_autotype_var = tk.BooleanVar()
+        ttk.Checkbutton(options_frame, text="复制后自动输入",
+                        variable=self.preset_autotype_var).pack(side=tk.LEFT, padx=5)
+
+        # 命令型预设：复制命令的输出而不是命令本身
+        command_frame = ttk.Frame(right_frame)
+        command_frame.pack(fill=tk.X, pady=(0, 5))
+
+        self.preset_command_var = tk.BooleanVar()
+        ttk.Checkbutton(command_frame, text="作为命令执行，复制输出结果",
+                        variable=self.preset_command_var).pack(side=tk.LEFT)
+
+        ttk.Label(command_frame, text="结果缓存(秒):").pack(
+            side=tk.LEFT, padx=(10, 0))
+        self.preset_ttl_var = tk.StringVar(value=str(core.DEFAULT_COMMAND_TTL))
+        ttk.Entry(command_frame, textvariable=self.preset_ttl_var, width=6).pack(
+            side=tk.LEFT, padx=5)
+
         # 保存按钮
-        ttk.Button(right_frame, text="保存内容",
-                   command=self.save_content).pack(anchor=tk.E)
+        save_frame = ttk.Frame(right_frame)
+        save_frame.pack(fill=tk.X)
+        ttk.Button(save_frame, text="保存内容",
+                   command=self.save_content).pack(side=tk.RIGHT)
+        ttk.Button(save_frame, text="历史版本",
+                   command=self.show_revisions).pack(side=tk.RIGHT, padx=5)
 
         # 初始化
         if len(self.presets) > 0:
-            first_group = next(iter(self.presets.keys()))
+            first_group = self.store.ordered_groups()[0]
             self.group_var.set(first_group)
             self.refresh_preset_list()
 
@@ -481,17 +1748,90 @@ class QuickText:
 
             # 获取内容
             if group in self.presets and name in self.presets[group]:
-                content = self.presets[group][name]
-
-                # 清除并设置内容文本
-                self.content_text.delete(1.0, tk.END)
-                self.content_text.insert(tk.END, content)
+                self.show_preset_in_editor(group, name)
 
                 # 记录当前正在编辑的预设信息
                 self.current_editing = {"group": group, "name": name}
         except (IndexError, KeyError):
             pass
 
+    def show_preset_in_editor(self, group, name):
+        """在编辑区域显示预设的内容和属性"""
+        value = self.presets[group][name]
+        options = preset_options(value)
+
+        # 清除并设置内容文本，大内容切换为只读查看
+        content = preset_content(value)
+        self.set_editor_content(
+            content, readonly=len(content) > LARGE_CONTENT_THRESHOLD)
+
+        self.preset_hotkey_var.set(options.get("hotkey", ""))
+        self.preset_autotype_var.set(bool(options.get("autotype")))
+        self.preset_command_var.set(bool(options.get("command")))
+        self.preset_ttl_var.set(str(options.get("ttl", core.DEFAULT_COMMAND_TTL)))
+
+    def clear_editor(self):
+        """清空编辑区域的内容和属性"""
+        self.set_editor_content("")
+        self.preset_hotkey_var.set("")
+        self.preset_autotype_var.set(False)
+        self.preset_command_var.set(False)
+        self.preset_ttl_var.set(str(core.DEFAULT_COMMAND_TTL))
+
+    def set_editor_content(self, content, readonly=False):
+        """设置编辑区域的内容"""
+        self.editor_readonly = readonly
+        self.load_text_chunked(self.content_text, content, readonly=readonly)
+
+        if readonly:
+            self.content_notice.config(
+                text=f"内容较大（{len(content) // 1024} KB），已切换为只读查看，仍可修改热键等属性")
+            self.content_notice.pack(
+                anchor=tk.W, pady=(0, 5), before=self.content_text)
+        else:
+            self.content_notice.pack_forget()
+
+    def store_editor_content(self, group, name):
+        """将编辑区域的内容和属性写入预设，热键冲突时返回False"""
+        if self.editor_readonly:
+            # 只读查看时保留原内容
+            content = preset_content(self.presets[group][name])
+        else:
+            # 确保分块加载已经完成，避免保存不完整的内容
+            self.finish_text_load(self.content_text)
+            content = self.content_text.get(1.0, tk.END).rstrip()
+        hotkey = self.preset_hotkey_var.get().strip().lower()
+
+        # 检查热键是否已被其他预设或应用动作占用
+        owner = self.preset_hotkeys.get(hotkey)
+        used_by_action = any(hotkey in hotkeys
+                             for hotkeys in self.settings["hotkeys"].values())
+        if hotkey and ((owner and owner != (group, name)) or used_by_action):
+            messagebox.showerror("错误", f"热键 {hotkey} 已被占用")
+            return False
+
+        is_command = self.preset_command_var.get()
+        ttl = None
+        if is_command:
+            try:
+                ttl = int(self.preset_ttl_var.get())
+                if ttl < 0:
+                    raise ValueError
+            except ValueError:
+                messagebox.showerror("错误", "结果缓存时间必须是非负整数")
+                return False
+
+        options = preset_options(self.presets[group][name])
+        options["hotkey"] = hotkey
+        options["autotype"] = self.preset_autotype_var.get() and bool(hotkey)
+        options["command"] = is_command
+        options["ttl"] = ttl
+        value = make_preset(content, options)
+        if value != self.presets[group][name]:
+            self.apply_change(("set", group, name, value), f"编辑预设 {name}")
+        self.commands.forget((group, name))
+        return True
+
     def save_content(self):
         """保存编辑区域的内容到选中的预设"""
         # 优先使用记录的当前编辑预设信息
@@ -501,10 +1841,11 @@ class QuickText:
 
             # 确认分组和预设仍然存在
             if group in self.presets and name in self.presets[group]:
-                content = self.content_text.get(1.0, tk.END).rstrip()
-                self.presets[group][name] = content
+                if not self.store_editor_content(group, name):
+                    return
                 self.save_presets()
-                self.refresh_group_buttons(group, self.presets[group])
+                self.refresh_group_buttons(group)
+                self.refresh_preset_hotkeys()
                 messagebox.showinfo("成功", "内容已保存")
                 return
 
@@ -513,11 +1854,12 @@ class QuickText:
             group = self.group_var.get()
             idx = self.presets_listbox.curselection()[0]
             name = self.presets_listbox.get(idx)
-            content = self.content_text.get(1.0, tk.END).rstrip()
 
-            self.presets[group][name] = content
+            if not self.store_editor_content(group, name):
+                return
             self.save_presets()
-            self.refresh_group_buttons(group, self.presets[group])
+            self.refresh_group_buttons(group)
+            self.refresh_preset_hotkeys()
 
             # 更新当前编辑信息
             self.current_editing = {"group": group, "name": name}
@@ -526,23 +1868,177 @@ class QuickText:
         except (IndexError, KeyError):
             messagebox.showerror("错误", "请先选择一个预设")
 
-    def copy_to_clipboard(self, content):
+    def show_revisions(self):
+        """显示正在编辑的预设的历史版本，可以与当前内容比较并恢复"""
+        group, name = self.current_editing["group"], self.current_editing["name"]
+        if group not in self.presets or name not in self.presets.get(group, {}):
+            messagebox.showerror("错误", "请先选择一个预设")
+            return
+        revisions = self.ensure_revisions()
+
+        dialog = tk.Toplevel(self.root)
+        dialog.title(f"历史版本 - {name}")
+        dialog.transient(self.root)
+        self.center_dialog(dialog, 700, 450)
+
+        frame = ttk.Frame(dialog, padding="10")
+        frame.pack(fill=tk.BOTH, expand=True)
+
+        # 左侧为版本列表（最新的在前），右侧为与当前内容的差异
+        listbox = tk.Listbox(frame, width=26, activestyle="none", exportselection=False)
+        listbox.pack(side=tk.LEFT, fill=tk.Y)
+        right = ttk.Frame(frame)
+        right.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(10, 0))
+        diff_text = scrolledtext.ScrolledText(right, wrap=tk.NONE, height=20)
+        diff_text.pack(fill=tk.BOTH, expand=True)
+        diff_text.tag_configure("added", foreground="green")
+        diff_text.tag_configure("removed", foreground="red")
+        status = ttk.Label(right, text="正在读取历史版本...", foreground="gray")
+        status.pack(anchor=tk.W, pady=(5, 0))
+        restore_button = ttk.Button(right, text="恢复此版本", state=tk.DISABLED)
+        restore_button.pack(anchor=tk.E)
+
+        # 列表中每一行对应的版本序号，以及选中版本的内容
+        indexes = []
+        selected = {"index": None, "content": None}
+
+        def alive():
+            return dialog.winfo_exists()
+
+        def show_list(items, error):
+            if not alive():
+                return
+            if error is not None:
+                status.config(text=f"读取历史版本失败: {str(error)}")
+                return
+            listbox.delete(0, tk.END)
+            indexes.clear()
+            for index in range(len(items) - 1, -1, -1):
+                saved_at, length = items[index]
+                stamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(saved_at))
+                listbox.insert(tk.END, f"{stamp}  {length} 字")
+                indexes.append(index)
+            status.config(text=f"共 {len(items)} 个版本" if items else
+                          "还没有历史版本，保存修改后会自动记录")
+
+        def load_list():
+            revisions.run(lambda: revisions.revisions(group, name),
+                          lambda items, error: self.hotkeys.post(show_list, items, error))
+
+        def show_diff(result, error):
+            if not alive():
+                return
+            if error is not None:
+                status.config(text=f"读取历史版本失败: {str(error)}")
+                return
+            index, content, lines = result
+            if selected["index"] != index:
+                return
+            selected["content"] = content
+            diff_text.config(state=tk.NORMAL)
+            diff_text.delete(1.0, tk.END)
+            if not lines:
+                diff_text.insert(tk.END, "与当前内容相同")
+            for line in lines:
+                tag = ("added" if line.startswith("+") else
+                       "removed" if line.startswith("-") else "")
+                diff_text.insert(tk.END, line if line.endswith("\n") else line + "\n", tag)
+            diff_text.config(state=tk.DISABLED)
+            restore_button.config(state=tk.NORMAL if lines else tk.DISABLED)
+
+        def on_select(event):
+            try:
+                index = indexes[listbox.curselection()[0]]
+            except IndexError:
+                return
+            selected["index"] = index
+            selected["content"] = None
+            restore_button.config(state=tk.DISABLED)
+            current = preset_content(self.presets[group].get(name, ""))
+
+            # 解压和比较在后台线程中进行
+            def compare():
+                content = revisions.get(group, name, index)
+                lines = list(difflib.unified_diff(
+                    current.splitlines(keepends=True), content.splitlines(keepends=True),
+                    "当前内容", "历史版本", n=2))
+                return index, content, lines
+            revisions.run(compare,
+                          lambda result, error: self.hotkeys.post(show_diff, result, error))
+
+        def restore():
+            content = selected["content"]
+            if content is None or name not in self.presets.get(group, {}):
+                return
+            value = make_preset(content, preset_options(self.presets[group][name]))
+            self.apply_change(("set", group, name, value), f"恢复预设 {name}")
+            self.commands.forget((group, name))
+            self.save_presets()
+            self.refresh_group_buttons(group)
+            self.refresh_preset_hotkeys()
+            if self.current_editing == {"group": group, "name": name}:
+                self.show_preset_in_editor(group, name)
+            self.show_toast("已恢复历史版本", name)
+            load_list()
+
+        listbox.bind("<<ListboxSelect>>", on_select)
+        restore_button.config(command=restore)
+        dialog.bind("<Escape>", lambda e: dialog.destroy())
+        load_list()
+
+    @perf.timed("clipboard.copy")
+    def copy_to_clipboard(self, content, preset_id=None):
         """复制内容到剪贴板"""
-        try:
-            pyperclip.copy(content)
-            # 缩短消息内容，保留前20个字符
-            display_content = content[:20] + \
-                "..." if len(content) > 20 else content
-            self.show_toast("已复制到剪贴板", display_content)
-        except Exception as e:
-            messagebox.showerror("错误", f"复制失败: {str(e)}")
+        # 写入在后台进行，这里立即返回
+        self.clipboard.copy(content, on_error=self.on_copy_error)
 
-    def show_toast(self, title, message):
-        """显示一个简单的提示框，几秒后自动消失"""
+        # 记录到剪贴板历史，预设只记录其标识
+        if preset_id is not None:
+            self.record_preset_use(*preset_id)
+        else:
+            self.history.push_text(content)
+            self.schedule_history_save()
+
+        # 缩短消息内容，保留前20个字符
+        display_content = content[:20] + \
+            "..." if len(content) > 20 else content
+        self.show_toast("已复制到剪贴板", display_content)
+
+    def on_copy_error(self, error):
+        """剪贴板写入失败时提示
+
+        可能在剪贴板写入线程中调用，不直接操作Tk，提示框交给主循环显示。
+        """
+        self.hotkeys.post(messagebox.showerror, "错误", f"复制失败: {str(error)}")
+
+    def on_close(self):
+        """关闭窗口"""
+        if self.server is not None:
+            self.server.close()
+        if self.watchdog is not None:
+            self.watchdog.stop()
+        if self.profiling:
+            self.stop_profiling()
+        self.clipboard.close()
+        self.commands.shutdown()
+        if self.history_save_job is not None:
+            self.root.after_cancel(self.history_save_job)
+            self.save_history()
+        if self.usage_flush_job is not None:
+            self.root.after_cancel(self.usage_flush_job)
+            self.flush_usage()
+        if self.revisions is not None:
+            self.revisions.close()
+        self.root.destroy()
+
+    def create_toast(self):
+        """创建可复用的提示窗口（只创建一次，之后隐藏复用）"""
         toast = tk.Toplevel(self.root)
+        toast.withdraw()
         toast.overrideredirect(True)  # 无边框窗口
+        toast.configure(bg="#333333")
 
-        # 计算位置（右下角）
+        # 计算位置（右下角），屏幕尺寸只查询一次
         w, h = 300, 60
         ws = toast.winfo_screenwidth()
         hs = toast.winfo_screenheight()
@@ -550,46 +2046,193 @@ class QuickText:
         y = hs - h - 50
         toast.geometry(f"{w}x{h}+{x}+{y}")
 
-        toast.configure(bg="#333333")
-
         # 标题
-        ttk.Label(
+        self.toast_title = ttk.Label(
             toast,
-            text=title,
             background="#333333",
             foreground="white",
             font=("Arial", 10, "bold")
-        ).pack(anchor=tk.W, padx=10, pady=(5, 0))
+        )
+        self.toast_title.pack(anchor=tk.W, padx=10, pady=(5, 0))
 
         # 消息
-        ttk.Label(
+        self.toast_message = ttk.Label(
             toast,
-            text=message,
             background="#333333",
             foreground="white"
-        ).pack(anchor=tk.W, padx=10)
+        )
+        self.toast_message.pack(anchor=tk.W, padx=10)
 
-        # 3秒后自动关闭
-        toast.after(3000, toast.destroy)
+        self.toast = toast
 
-    def listen_for_hotkeys(self):
-        """监听全局热键"""
-        # 注册Ctrl+Alt+Q打开/隐藏应用
-        keyboard.add_hotkey('ctrl+alt+q', self.toggle_visibility)
+    def show_toast(self, title, message):
+        """显示一个简单的提示框，几秒后自动消失
 
-        # 保持线程运行
-        while True:
-            time.sleep(0.1)
+        连续调用只更新同一个窗口的文字并重新计时。
+        """
+        if self.toast is None:
+            self.create_toast()
+
+        self.toast_title.config(text=title)
+        self.toast_message.config(text=message)
+
+        # 已经显示时无需再次映射窗口
+        if self.toast_job is None:
+            self.toast.deiconify()
+            self.toast.lift()
+        else:
+            self.toast.after_cancel(self.toast_job)
+
+        # 3秒后自动隐藏
+        self.toast_job = self.toast.after(3000, self.hide_toast)
+
+    def hide_toast(self):
+        """隐藏提示框"""
+        self.toast_job = None
+        self.toast.withdraw()
+
+    def refresh_preset_hotkeys(self):
+        """重建 热键 -> 预设 查找表，并在变化时重新注册预设热键"""
+        table = {}
+        for group, items in self.presets.items():
+            for name, value in items.items():
+                hotkey = preset_options(value).get("hotkey")
+                if hotkey:
+                    table[hotkey] = (group, name)
+
+        if table.keys() == self.preset_hotkeys.keys():
+            self.preset_hotkeys = table
+            return
+
+        self.preset_hotkeys = table
+        for hotkey, e in self.hotkeys.bind_values("paste_preset", table):
+            print(f"注册预设热键 {hotkey} 失败: {str(e)}")
+
+    def paste_preset_hotkey(self, hotkey):
+        """预设热键触发：直接复制内容，不显示窗口也不更新任何控件"""
+        preset_id = self.preset_hotkeys.get(hotkey)
+        if preset_id is None:
+            return
+        group, name = preset_id
+        autotype = preset_options(self.presets[group][name]).get("autotype")
+
+        def deliver(content):
+            self.clipboard.copy(content, on_error=self.on_copy_error)
+            self.record_preset_use(group, name)
+
+            # 自动输入在后台线程中进行，避免阻塞主循环
+            if autotype:
+                threading.Thread(target=type_after_release,
+                                 args=(hotkey, content), daemon=True).start()
+
+        # 热键复制不弹出对话框，只展开内置变量
+        self.resolve_preset(group, name, deliver)
+
+    def apply_hotkeys(self):
+        """根据设置注册全局热键，返回注册失败的列表"""
+        errors = self.hotkeys.bind(self.settings["hotkeys"])
+        for hotkey, e in errors:
+            print(f"注册热键 {hotkey} 失败: {str(e)}")
+        return errors
 
     def toggle_visibility(self):
         """切换应用窗口的可见性"""
         if self.root.state() == 'normal':
             self.root.withdraw()  # 隐藏窗口
         else:
-            self.root.deiconify()  # 显示窗口
-            self.root.lift()  # 提升窗口到顶层
+            self.show_window()
+
+    def show_window(self):
+        """显示窗口并提升到顶层"""
+        self.refresh_most_used_if_stale()
+        self.root.deiconify()
+        self.root.lift()
+        self.root.focus_force()
+
+    def serve_request(self, request):
+        """单实例服务的请求入口，在服务线程中调用
+
+        请求交给主循环处理，这里等待结果，不在服务线程中访问预设数据。
+        """
+        future = Future()
+        self.hotkeys.post(self.handle_request, request, future)
+        try:
+            return future.result(timeout=daemon.REQUEST_TIMEOUT)
+        except FutureTimeoutError:
+            return {"ok": False, "error": "请求处理超时"}
+
+    def handle_request(self, request, future):
+        """在主循环中处理单实例服务收到的请求"""
+        start = time.perf_counter()
+
+        def reply(result=None, error=None):
+            if future.done():
+                return
+            if error is not None:
+                future.set_result({"ok": False, "error": str(error)})
+            else:
+                server_ms = (time.perf_counter() - start) * 1000
+                future.set_result({"ok": True, "result": result,
+                                   "server_ms": round(server_ms, 3)})
+
+        command = request.get("cmd")
+        try:
+            if command == "show":
+                self.show_window()
+                reply()
+            elif command in api.QUERY_HANDLERS:
+                reply(api.QUERY_HANDLERS[command](self.store, request))
+            elif command == "copy":
+                group, name = api.find_preset(self.store, request["ref"])
+
+                def deliver(content):
+                    self.copy_to_clipboard(content, (group, name))
+                    reply({"group": group, "name": name,
+                           "length": len(content)})
+
+                self.resolve_preset(group, name, deliver,
+                                    on_error=lambda e: reply(error=e))
+            elif command == "add":
+                new_group = api.split_ref(request["ref"])[0] not in self.presets
+                result = api.handle_add(self.store, request)
+                if not self.save_presets():
+                    raise api.RequestError("无法保存预设文件")
+                self.refresh_added_preset(
+                    result["group"], result["name"], new_group)
+                reply(result)
+            elif command == "import":
+                self.import_for_request(request, reply)
+            else:
+                raise api.RequestError(f"未知命令: {command}")
+        except KeyError as e:
+            reply(error=f"缺少参数: {str(e)}")
+        except (api.RequestError, ValueError) as e:
+            reply(error=e)
+        except Exception as e:
+            reply(error=e)
+            raise
+
+    def refresh_added_preset(self, group, name, new_group):
+        """通过请求添加预设后刷新界面"""
+        if new_group:
+            self.setup_group_tabs()
+        else:
+            self.refresh_group_buttons(group)
+
+        # 设置选项卡尚未创建时，创建时会读取最新数据
+        if self.settings_notebook is None:
+            return
+
+        if new_group:
+            self.refresh_groups_list()
+            self.update_group_combo()
+        if self.group_var.get() == group:
+            self.refresh_preset_list()
+        if (self.current_editing["group"] == group and
+                self.current_editing["name"] == name):
+            self.show_preset_in_editor(group, name)
 
-    def center_dialog(self, dialog):
+    def center_dialog(self, dialog, width=300, height=150):
         """使对话框居中显示在主窗口上"""
         # 更新主窗口几何信息
         self.root.update_idletasks()
@@ -601,8 +2244,8 @@ class QuickText:
         root_y = self.root.winfo_rooty()
 
         # 对话框尺寸
-        dialog_width = 300
-        dialog_height = 150
+        dialog_width = width
+        dialog_height = height
 
         # 计算居中位置
         x = root_x + (root_width - dialog_width) // 2
@@ -620,7 +2263,7 @@ class QuickText:
 
     def update_group_combo(self):
         """更新分组下拉框"""
-        groups = list(self.presets.keys())
+        groups = list(self.store.ordered_groups())
         self.group_combo['values'] = groups
         if groups and not self.group_var.get():
             self.group_var.set(groups[0])
@@ -637,7 +2280,7 @@ class QuickText:
         group = self.group_var.get()
         if group and group in self.presets:
             # 使用有序字典保存顺序
-            self.current_presets = list(self.presets[group].keys())
+            self.current_presets = self.store.ordered_names(group)
             for name in self.current_presets:
                 self.presets_listbox.insert(tk.END, name)
 
@@ -710,57 +2353,28 @@ class QuickText:
         except (IndexError, AttributeError):
             return
 
-        # 从列表中移除
-        self.current_presets.pop(self.drag_start_index)
-
-        # 插入到新位置
-        if drop_index >= len(self.current_presets):
-            self.current_presets.append(dragged_item)
-        else:
-            self.current_presets.insert(drop_index, dragged_item)
-
-        # 重新排序预设字典
-        self.reorder_presets(group, self.current_presets)
+        # 移动预设，只记录一次移动
+        self.move_preset(group, dragged_item, drop_index)
 
-        # 刷新列表显示
-        self.refresh_preset_list()
+        # 只移动列表中的这一项
+        self.presets_listbox.delete(self.drag_start_index)
+        self.presets_listbox.insert(drop_index, dragged_item)
+        self.presets_listbox.selection_clear(0, tk.END)
 
         # 选中移动后的项
         self.presets_listbox.selection_set(drop_index)
         self.presets_listbox.activate(drop_index)
 
         # 刷新快速访问按钮
-        self.refresh_group_buttons(group, self.presets[group])
+        self.refresh_group_buttons(group)
 
         # 更新内容显示
-        name = self.current_presets[drop_index]
-        content = self.presets[group][name]
-        self.content_text.delete(1.0, tk.END)
-        self.content_text.insert(tk.END, content)
-
-    def reorder_presets(self, group, new_order):
-        """根据新顺序重新排列预设"""
-        if not group or group not in self.presets:
-            return
-
-        # 创建一个新的有序字典
-        new_presets = {}
-
-        # 按新顺序重建字典
-        for name in new_order:
-            if name in self.presets[group]:
-                new_presets[name] = self.presets[group][name]
+        self.show_preset_in_editor(group, dragged_item)
 
-        # 确保没有丢失任何预设
-        for name, content in self.presets[group].items():
-            if name not in new_presets:
-                new_presets[name] = content
-
-        # 更新预设字典
-        self.presets[group] = new_presets
-
-        # 保存更改
-        self.save_presets()
+    def move_preset(self, group, name, index):
+        """将预设移动到分组中的新位置"""
+        self.apply_change(("move", group, name, index), f"移动预设 {name}")
+        self.report_save_error()
 
     def setup_group_manage_tab(self, parent_frame):
         """设置分组管理选项卡"""
@@ -801,12 +2415,239 @@ class QuickText:
         self.groups_listbox.bind('<B1-Motion>', self.on_group_list_drag)
         self.groups_listbox.bind('<ButtonRelease-1>', self.on_group_list_drop)
 
+    def setup_transfer_tab(self, parent_frame):
+        """设置导入导出选项卡"""
+        format_names = [description for _, description in TRANSFER_FORMATS]
+
+        # 导入
+        import_frame = ttk.LabelFrame(parent_frame, text="批量导入")
+        import_frame.pack(fill=tk.X, padx=10, pady=10)
+        import_frame.grid_columnconfigure(1, weight=1)
+
+        ttk.Label(import_frame, text="格式:").grid(
+            row=0, column=0, sticky=tk.W, padx=5, pady=3)
+        self.import_format_var = tk.StringVar(value=format_names[0])
+        ttk.Combobox(import_frame, textvariable=self.import_format_var,
+                     values=format_names, state="readonly").grid(
+            row=0, column=1, sticky=tk.W, padx=5, pady=3)
+
+        ttk.Label(import_frame, text="默认分组:").grid(
+            row=1, column=0, sticky=tk.W, padx=5, pady=3)
+        self.import_group_var = tk.StringVar(value=core.DEFAULT_IMPORT_GROUP)
+        ttk.Entry(import_frame, textvariable=self.import_group_var).grid(
+            row=1, column=1, sticky=tk.W, padx=5, pady=3)
+
+        ttk.Label(import_frame, text="名称已存在时:").grid(
+            row=2, column=0, sticky=tk.W, padx=5, pady=3)
+        policy_frame = ttk.Frame(import_frame)
+        policy_frame.grid(row=2, column=1, sticky=tk.W, padx=5, pady=3)
+        self.import_policy_var = tk.StringVar(value=IMPORT_POLICIES[0][0])
+        for policy, description in IMPORT_POLICIES:
+            ttk.Radiobutton(policy_frame, text=description, value=policy,
+                            variable=self.import_policy_var).pack(
+                side=tk.LEFT, padx=(0, 10))
+
+        button_frame = ttk.Frame(import_frame)
+        button_frame.grid(row=3, column=0, columnspan=2, sticky=tk.W,
+                          padx=5, pady=5)
+        self.import_buttons = [
+            ttk.Button(button_frame, text="导入文件...",
+                       command=lambda: self.choose_import_source(False)),
+            ttk.Button(button_frame, text="导入目录...",
+                       command=lambda: self.choose_import_source(True)),
+        ]
+        for button in self.import_buttons:
+            button.pack(side=tk.LEFT, padx=(0, 5))
+
+        self.import_progress = ttk.Progressbar(import_frame, mode="indeterminate")
+        self.import_progress.grid(row=4, column=0, columnspan=2, sticky="ew",
+                                  padx=5, pady=3)
+        self.import_status = ttk.Label(import_frame, text="")
+        self.import_status.grid(row=5, column=0, columnspan=2, sticky=tk.W,
+                                padx=5, pady=(0, 5))
+
+        # 导出
+        export_frame = ttk.LabelFrame(parent_frame, text="导出全部预设")
+        export_frame.pack(fill=tk.X, padx=10, pady=10)
+
+        ttk.Label(export_frame, text="格式:").pack(side=tk.LEFT, padx=5, pady=5)
+        self.export_format_var = tk.StringVar(value=format_names[1])
+        ttk.Combobox(export_frame, textvariable=self.export_format_var,
+                     values=format_names[1:], state="readonly").pack(
+            side=tk.LEFT, padx=5, pady=5)
+        ttk.Button(export_frame, text="导出...",
+                   command=self.export_presets).pack(side=tk.LEFT, padx=5, pady=5)
+
+    @staticmethod
+    def transfer_format(description):
+        """根据下拉框中的说明取得格式"""
+        for fmt, text in TRANSFER_FORMATS:
+            if text == description:
+                return fmt
+        return None
+
+    def choose_import_source(self, directory):
+        """选择要导入的文件或目录"""
+        if directory:
+            path = filedialog.askdirectory(title="选择要导入的目录")
+            fmt = "dir"
+        else:
+            path = filedialog.askopenfilename(
+                title="选择要导入的文件", filetypes=[
+                    ("预设文件", "*.csv *.jsonl *.ndjson *.json"),
+                    ("所有文件", "*.*")])
+            fmt = self.transfer_format(self.import_format_var.get())
+        if path:
+            self.start_import(path, fmt, self.import_policy_var.get(),
+                              self.import_group_var.get().strip() or
+                              core.DEFAULT_IMPORT_GROUP)
+
+    def start_import(self, path, fmt, policy, default_group):
+        """在后台线程中读取文件，读取完成后在主循环中一次性导入并保存"""
+        for button in self.import_buttons:
+            button.config(state=tk.DISABLED)
+        self.import_progress.start(50)
+        self.import_status.config(text="正在读取...")
+
+        result = core.ImportResult()
+        self.read_import_records(
+            path, fmt, default_group, result,
+            lambda records, error: self.finish_import(records, policy, result, error),
+            lambda count: self.import_status.config(text=f"已读取 {count} 条..."))
+
+    def read_import_records(self, path, fmt, default_group, result, finish,
+                            progress=None):
+        """在后台线程中读取要导入的记录，完成后在主循环中调用 finish(记录, 错误)
+
+        格式错误的记录记入 result.errors，progress(已读取数量) 也在主循环中调用。
+        """
+        def read():
+            try:
+                records = []
+                for record in core.read_records(path, fmt, default_group,
+                                                result.errors):
+                    records.append(record)
+                    if (progress is not None and
+                            len(records) % IMPORT_PROGRESS_INTERVAL == 0):
+                        self.hotkeys.post(progress, len(records))
+            except (OSError, ValueError) as e:
+                self.hotkeys.post(finish, None, e)
+                return
+            self.hotkeys.post(finish, records, None)
+
+        threading.Thread(target=read, daemon=True).start()
+
+    def import_for_request(self, request, reply):
+        """处理单实例服务收到的导入请求
+
+        与界面中的导入相同，读取和解析在后台线程中进行，完成后在主循环中一次性导入并保存。
+        """
+        result = core.ImportResult()
+        policy = request.get("policy", "skip")
+
+        def finish(records, error):
+            if error is None:
+                try:
+                    core.import_presets(self.store, records, policy, result=result)
+                except ValueError as e:
+                    error = e
+            if error is not None:
+                reply(error=api.RequestError(f"导入失败，未做任何修改: {str(error)}"))
+                return
+
+            summary = result.to_dict()
+            if summary["changed_groups"]:
+                if not self.save_presets():
+                    reply(error=api.RequestError("无法保存预设文件"))
+                    return
+                self.refresh_imported(summary)
+            reply(summary)
+
+        self.read_import_records(
+            request["path"], request.get("format"),
+            request.get("group") or core.DEFAULT_IMPORT_GROUP, result, finish)
+
+    def finish_import(self, records, policy, result, error):
+        """在主循环中应用读取到的记录，只保存和刷新一次"""
+        self.import_progress.stop()
+        for button in self.import_buttons:
+            button.config(state=tk.NORMAL)
+        if error is None:
+            try:
+                core.import_presets(self.store, records, policy, result=result)
+            except ValueError as e:
+                error = e
+        if error is not None:
+            self.import_status.config(text="")
+            messagebox.showerror("导入错误", f"导入失败，未做任何修改: {str(error)}")
+            return
+
+        summary = result.to_dict()
+        if result.total > result.skipped:
+            self.save_presets()
+            self.refresh_imported(summary)
+
+        status = (f"新增 {result.added}，覆盖 {result.overwritten}，"
+                  f"重命名 {result.renamed}，跳过 {result.skipped}")
+        if result.deduplicated:
+            status += f"，{result.deduplicated} 个与已有内容相同（已共用）"
+        if result.errors.count:
+            status += f"，{result.errors.count} 条记录格式错误"
+        self.import_status.config(text=status)
+        if result.errors:
+            messagebox.showwarning("导入完成", "以下记录未导入:\n" + "\n".join(
+                list(result.errors)[:20]))
+
+    def refresh_imported(self, summary):
+        """批量导入后只刷新新建和有变化的分组"""
+        for group in summary["new_groups"]:
+            self.create_group_view(group)
+        # 新建的分组放在搜索结果选项卡之前
+        if summary["new_groups"] and "搜索结果" in self.group_frames:
+            self.groups_notebook.insert("end", self.group_frames["搜索结果"])
+
+        if self.search_var.get():
+            # 搜索中只更新搜索结果
+            self.on_search_change()
+        else:
+            for group in summary["changed_groups"]:
+                self.refresh_group_buttons(group)
+        self.refresh_preset_hotkeys()
+
+        # 设置选项卡尚未创建时，创建时会读取最新数据
+        if self.settings_notebook is None:
+            return
+        if summary["new_groups"]:
+            self.refresh_groups_list()
+            self.update_group_combo()
+        if self.group_var.get() in summary["changed_groups"]:
+            self.refresh_preset_list()
+
+    def export_presets(self):
+        """导出全部预设"""
+        fmt = self.transfer_format(self.export_format_var.get())
+        if fmt == "dir":
+            path = filedialog.askdirectory(title="选择导出目录")
+        else:
+            path = filedialog.asksaveasfilename(
+                title="导出预设", defaultextension=f".{fmt}",
+                initialfile=f"quicktext-presets.{fmt}",
+                filetypes=[(self.export_format_var.get(), f"*.{fmt}")])
+        if not path:
+            return
+        try:
+            count = core.export_presets(self.store, path, fmt)
+        except (OSError, ValueError) as e:
+            messagebox.showerror("导出错误", f"无法导出预设: {str(e)}")
+            return
+        self.show_toast("导出完成", f"已导出 {count} 个预设")
+
     def refresh_groups_list(self):
         """刷新分组列表"""
         self.groups_listbox.delete(0, tk.END)
 
         # 保存当前分组列表
-        self.current_groups = list(self.presets.keys())
+        self.current_groups = self.store.ordered_groups()
         for group in self.current_groups:
             self.groups_listbox.insert(tk.END, group)
 
@@ -869,48 +2710,170 @@ class QuickText:
         except (IndexError, AttributeError):
             return
 
-        # 从列表中移除
-        self.current_groups.pop(self.group_drag_start_index)
-
-        # 插入到新位置
-        if drop_index >= len(self.current_groups):
-            self.current_groups.append(dragged_group)
-        else:
-            self.current_groups.insert(drop_index, dragged_group)
-
-        # 重新排序分组字典
-        self.reorder_groups(self.current_groups)
+        # 移动分组，只记录一次移动
+        self.move_group(dragged_group, drop_index)
 
-        # 刷新列表显示
-        self.refresh_groups_list()
+        # 只移动列表中的这一项
+        self.groups_listbox.delete(self.group_drag_start_index)
+        self.groups_listbox.insert(drop_index, dragged_group)
+        self.groups_listbox.selection_clear(0, tk.END)
 
         # 选中移动后的项
         self.groups_listbox.selection_set(drop_index)
         self.groups_listbox.activate(drop_index)
 
-        # 刷新选项卡
-        self.setup_group_tabs()
-
-    def reorder_groups(self, new_order):
-        """根据新顺序重新排列分组"""
-        # 创建一个新的有序字典
-        new_presets = {}
+        # 直接移动对应的选项卡，无需重建所有分组（选项卡位置要算上"最常用"选项卡）
+        if dragged_group in self.group_frames:
+            self.groups_notebook.insert(
+                self.group_tab_index(dragged_group), self.group_frames[dragged_group])
+        self.update_group_combo()
 
-        # 按新顺序重建字典
-        for name in new_order:
-            if name in self.presets:
-                new_presets[name] = self.presets[name]
+    def move_group(self, name, index):
+        """将分组移动到新位置"""
+        self.apply_change(("move_group", name, index), f"移动分组 {name}")
+        self.report_save_error()
+
+    def apply_change(self, change, label):
+        """执行一次可撤销的预设修改（格式见 quicktext.core.undo），调用者负责保存和刷新"""
+        old_value = self.presets[change[1]][change[2]] if change[0] == "set" else None
+        self.undo_history.apply(self.store, change, label)
+        self.track_revisions(change, old_value)
+
+    def ensure_revisions(self):
+        """取得历史版本存储，首次使用时创建"""
+        if self.revisions is None:
+            self.revisions = RevisionStore(
+                os.path.join(self.data_dir, "presets.history"))
+        return self.revisions
+
+    def track_revisions(self, change, old_value=None):
+        """预设内容修改或重命名后更新历史版本（写入在后台进行）"""
+        kind = change[0]
+        if kind == "set":
+            _, group, name, value = change
+            old_content = preset_content(old_value) if old_value is not None else None
+            if old_content != preset_content(value):
+                self.ensure_revisions().record(
+                    group, name, old_content, preset_content(value))
+        elif kind == "rename":
+            self.ensure_revisions().rename(*change[1:])
+        elif kind == "rename_group":
+            _, old_name, new_name = change
+            self.ensure_revisions().rename_group(
+                old_name, new_name, self.store.ordered_names(new_name))
+
+    def on_undo_key(self, event):
+        """Ctrl+Z：焦点不在输入框中时撤销预设的修改"""
+        if isinstance(event.widget, (tk.Text, tk.Entry)):
+            return None
+        self.undo_change()
+        return "break"
+
+    def on_redo_key(self, event):
+        """Ctrl+Y / Ctrl+Shift+Z：焦点不在输入框中时重做预设的修改"""
+        if isinstance(event.widget, (tk.Text, tk.Entry)):
+            return None
+        self.redo_change()
+        return "break"
+
+    def undo_change(self):
+        """撤销最近一次预设修改"""
+        try:
+            step = self.undo_history.undo(self.store)
+        except (KeyError, ValueError) as e:
+            messagebox.showerror("撤销失败", f"预设已被其他方式修改，无法撤销: {str(e)}")
+            return
+        if step is None:
+            self.show_toast("撤销", "没有可撤销的操作")
+            return
+        label, change = step
+        self.track_revisions(change)
+        self.refresh_after_change(change)
+        self.show_toast("已撤销", label)
 
-        # 确保没有丢失任何分组
-        for name, content in self.presets.items():
-            if name not in new_presets:
-                new_presets[name] = content
+    def redo_change(self):
+        """重做最近撤销的预设修改"""
+        try:
+            step = self.undo_history.redo(self.store)
+        except (KeyError, ValueError) as e:
+            messagebox.showerror("重做失败", f"预设已被其他方式修改，无法重做: {str(e)}")
+            return
+        if step is None:
+            self.show_toast("重做", "没有可重做的操作")
+            return
+        label, change = step
+        self.track_revisions(change)
+        self.refresh_after_change(change)
+        self.show_toast("已重做", label)
+
+    def refresh_after_change(self, change):
+        """撤销或重做之后保存，并只刷新涉及的分组"""
+        kind, group = change[0], change[1]
+        # 移动操作已写入顺序日志
+        if kind in ("move", "move_group"):
+            self.report_save_error()
+        else:
+            self.save_presets()
 
-        # 更新预设字典
-        self.presets = new_presets
+        if kind == "rename":
+            self.history.rename_preset(group, change[2], change[3])
+            self.usage.rename_preset(group, change[2], change[3])
+        elif kind == "rename_group":
+            old_name, group = change[1], change[2]
+            self.history.rename_group(old_name, group)
+            self.usage.rename_group(old_name, group)
+            self.remove_group_view(old_name)
+            self.add_group_view(group)
+        elif kind == "add_group":
+            self.add_group_view(group)
+        elif kind == "delete_group":
+            self.remove_group_view(group)
+        elif kind == "move_group":
+            self.groups_notebook.insert(self.group_tab_index(group),
+                                        self.group_frames[group])
+        elif kind == "set":
+            self.commands.forget((group, change[2]))
+        if kind in ("rename", "rename_group"):
+            self.schedule_history_save()
+            self.schedule_usage_flush()
+
+        if self.search_var.get():
+            self.on_search_change()
+        elif kind in ("set", "add", "delete", "rename", "move"):
+            self.refresh_group_buttons(group)
+        self.refresh_most_used_view()
+        if kind not in ("move", "move_group"):
+            self.refresh_preset_hotkeys()
+
+        # 设置选项卡尚未创建时，创建时会读取最新数据
+        if self.settings_notebook is None:
+            return
+        editing = self.current_editing
+        if kind == "rename" and editing == {"group": group, "name": change[2]}:
+            editing["name"] = change[3]
+        elif kind == "rename_group":
+            if editing["group"] == change[1]:
+                editing["group"] = group
+            if self.group_var.get() == change[1]:
+                self.group_var.set(group)
+
+        if kind in ("add_group", "delete_group", "rename_group", "move_group"):
+            self.refresh_groups_list()
+            self.update_group_combo()
+            if self.group_var.get() not in self.presets:
+                self.group_var.set(self.store.ordered_groups()[0])
+                self.refresh_preset_list()
+        if self.group_var.get() == group:
+            self.refresh_preset_list()
 
-        # 保存更改
-        self.save_presets()
+        # 正在编辑的预设被删除或修改时更新编辑区域
+        if editing["group"] is not None:
+            if editing["name"] in self.presets.get(editing["group"], {}):
+                if kind == "set" and (group, change[2]) == (editing["group"], editing["name"]):
+                    self.show_preset_in_editor(group, editing["name"])
+            else:
+                self.clear_editor()
+                self.current_editing = {"group": None, "name": None}
 
     def add_group(self):
         """添加新分组"""
@@ -950,11 +2913,12 @@ class QuickText:
                 messagebox.showerror("错误", "请输入分组名称")
                 return
 
-            if name in self.presets:
-                messagebox.showerror("错误", "分组名称已存在")
+            try:
+                self.apply_change(("add_group", name, [], None), f"添加分组 {name}")
+            except ValueError as e:
+                messagebox.showerror("错误", str(e))
                 return
 
-            self.presets[name] = {}
             self.save_presets()
             self.refresh_groups_list()
             self.update_group_combo()
@@ -1009,14 +2973,20 @@ class QuickText:
                     dialog.destroy()
                     return
 
-                if new_name in self.presets:
-                    messagebox.showerror("错误", "分组名称已存在")
+                # 重命名分组
+                try:
+                    self.apply_change(("rename_group", old_name, new_name),
+                                      f"重命名分组 {old_name}")
+                except ValueError as e:
+                    messagebox.showerror("错误", str(e))
                     return
 
-                # 重命名分组
-                self.presets[new_name] = self.presets[old_name]
-                del self.presets[old_name]
+                self.history.rename_group(old_name, new_name)
+                self.schedule_history_save()
+                self.usage.rename_group(old_name, new_name)
+                self.schedule_usage_flush()
                 self.save_presets()
+                self.refresh_preset_hotkeys()
                 self.refresh_groups_list()
                 self.update_group_combo()
                 self.setup_group_tabs()
@@ -1036,8 +3006,9 @@ class QuickText:
                 return
 
             if messagebox.askyesno("确认", f"确定要删除分组 '{name}'? 这将删除该分组下的所有预设。"):
-                del self.presets[name]
+                self.apply_change(("delete_group", name), f"删除分组 {name}")
                 self.save_presets()
+                self.refresh_preset_hotkeys()
                 self.refresh_groups_list()
                 self.update_group_combo()
                 self.setup_group_tabs()
@@ -1052,7 +3023,7 @@ class QuickText:
             return
 
         # 先清空内容编辑框
-        self.content_text.delete(1.0, tk.END)
+        self.clear_editor()
 
         # 创建对话框
         dialog = tk.Toplevel(self.root)
@@ -1090,19 +3061,21 @@ class QuickText:
                 messagebox.showerror("错误", "请输入预设名称")
                 return
 
-            if name in self.presets[group]:
-                messagebox.showerror("错误", "预设名称已存在")
-                return
-
             # 获取当前编辑区域的内容作为新预设的内容
             # 因为我们已经清空了编辑框，内容将为空
             content = self.content_text.get(1.0, tk.END).rstrip()
 
             # 添加新预设，内容为空
-            self.presets[group][name] = content
+            try:
+                self.apply_change(("add", group, name, content, None),
+                                  f"添加预设 {name}")
+            except ValueError as e:
+                messagebox.showerror("错误", str(e))
+                return
+
             self.save_presets()
             self.refresh_preset_list()
-            self.refresh_group_buttons(group, self.presets[group])
+            self.refresh_group_buttons(group)
 
             # 选中新添加的预设
             idx = self.current_presets.index(name)
@@ -1122,11 +3095,13 @@ class QuickText:
             name = self.presets_listbox.get(idx)
 
             if messagebox.askyesno("确认", f"确定要删除预设 '{name}'?"):
-                del self.presets[group][name]
+                self.apply_change(("delete", group, name), f"删除预设 {name}")
                 self.save_presets()
+                self.refresh_preset_hotkeys()
                 self.refresh_preset_list()
-                self.refresh_group_buttons(group, self.presets[group])
-                self.content_text.delete(1.0, tk.END)
+                self.refresh_group_buttons(group)
+                self.refresh_most_used_view()
+                self.clear_editor()
 
                 # 清除当前编辑信息
                 self.current_editing = {"group": None, "name": None}
@@ -1182,16 +3157,23 @@ class QuickText:
                     dialog.destroy()
                     return
 
-                if new_name in self.presets[group]:
-                    messagebox.showerror("错误", "预设名称已存在")
+                # 重命名预设
+                try:
+                    self.apply_change(("rename", group, old_name, new_name),
+                                      f"重命名预设 {old_name}")
+                except ValueError as e:
+                    messagebox.showerror("错误", str(e))
                     return
 
-                # 重命名预设
-                self.presets[group][new_name] = self.presets[group][old_name]
-                del self.presets[group][old_name]
+                self.history.rename_preset(group, old_name, new_name)
+                self.schedule_history_save()
+                self.usage.rename_preset(group, old_name, new_name)
+                self.schedule_usage_flush()
                 self.save_presets()
+                self.refresh_preset_hotkeys()
                 self.refresh_preset_list()
-                self.refresh_group_buttons(group, self.presets[group])
+                self.refresh_group_buttons(group)
+                self.refresh_most_used_view()
 
                 # 更新当前编辑信息
                 if self.current_editing["group"] == group and self.current_editing["name"] == old_name:
@@ -1202,6 +3184,137 @@ class QuickText:
         except (IndexError, KeyError):
             messagebox.showerror("错误", "请先选择一个预设")
 
+    def create_palette(self):
+        """创建快速搜索面板：一个搜索框加一个结果列表"""
+        palette = tk.Toplevel(self.root)
+        palette.withdraw()
+        palette.overrideredirect(True)
+        palette.attributes('-topmost', True)
+
+        frame = ttk.Frame(palette, padding=5)
+        frame.pack(fill=tk.BOTH, expand=True)
+
+        self.palette_var = tk.StringVar()
+        entry = ttk.Entry(frame, textvariable=self.palette_var, width=60)
+        entry.pack(fill=tk.X)
+
+        # Listbox只绘制可见的行，结果数量另有上限
+        listbox = tk.Listbox(frame, height=12, activestyle="none")
+        listbox.pack(fill=tk.BOTH, expand=True, pady=(5, 0))
+
+        self.palette_var.trace_add("write", self.on_palette_search)
+        entry.bind("<Return>", lambda e: self.copy_palette_selection())
+        entry.bind("<Escape>", lambda e: self.hide_palette())
+        entry.bind("<Down>", lambda e: self.move_palette_selection(1))
+        entry.bind("<Up>", lambda e: self.move_palette_selection(-1))
+        listbox.bind("<Double-Button-1>",
+                     lambda e: self.copy_palette_selection())
+        palette.bind("<FocusOut>", self.on_palette_focus_out)
+
+        # 窗口位置只计算一次
+        palette.update_idletasks()
+        width = palette.winfo_reqwidth()
+        x = (palette.winfo_screenwidth() - width) // 2
+        y = palette.winfo_screenheight() // 4
+        palette.geometry(f"+{x}+{y}")
+
+        self.palette = palette
+        self.palette_entry = entry
+        self.palette_listbox = listbox
+        self.palette_results = []
+        # 最近若干次从热键触发到面板可交互的耗时（毫秒）
+        self.palette_latencies = deque(maxlen=100)
+
+    def ensure_palette(self):
+        """创建快速搜索面板，已创建时不做处理"""
+        if self.palette is None:
+            self.create_palette()
+
+    def show_palette(self):
+        """显示快速搜索面板"""
+        start = self.hotkeys.event_time or time.perf_counter()
+        self.ensure_palette()
+
+        self.palette_var.set("")
+        self.palette.deiconify()
+        self.palette.lift()
+        self.palette_entry.focus_force()
+        self.palette.update_idletasks()
+
+        latency = (time.perf_counter() - start) * 1000
+        self.palette_latencies.append(latency)
+        if latency > PALETTE_LATENCY_BUDGET:
+            print(f"快速搜索面板响应耗时 {latency:.1f}ms，"
+                  f"超过 {PALETTE_LATENCY_BUDGET}ms")
+
+    def hide_palette(self):
+        """隐藏快速搜索面板"""
+        self.palette.withdraw()
+
+    def on_palette_focus_out(self, event):
+        """面板失去焦点时隐藏（焦点只是在面板内部移动时不隐藏）"""
+        def check_focus():
+            try:
+                focused = self.palette.focus_get()
+            except (KeyError, tk.TclError):
+                focused = None
+            if focused is None or focused.winfo_toplevel() is not self.palette:
+                self.hide_palette()
+        self.palette.after(100, check_focus)
+
+    def search_presets(self, query, limit=None):
+        """搜索预设，开启设置时常用的预设排在前面"""
+        if not self.settings.get("rank_search_by_usage"):
+            return self.store.search(query, limit=limit)
+        return self.usage.sort_by_usage(self.store.search(query), limit)
+
+    @perf.timed("search.palette")
+    def on_palette_search(self, *args):
+        """快速搜索面板的搜索框内容变化"""
+        query = self.palette_var.get()
+        if query:
+            results = self.search_presets(query, limit=PALETTE_LIMIT)
+        else:
+            # 没有输入时显示最近复制的预设，之后是其余最常用的预设
+            results = [key[1:] for key in self.history.items()
+                       if key[0] == "preset" and self.preset_exists(*key[1:])]
+            recent = set(results)
+            results += [key for key in self.usage.top(exists=self.preset_exists)
+                        if key not in recent]
+            results = results[:PALETTE_LIMIT]
+
+        self.palette_results = results
+        self.palette_listbox.delete(0, tk.END)
+        if results:
+            self.palette_listbox.insert(
+                tk.END, *(f"[{group}] {name}" for group, name in results))
+            self.palette_listbox.selection_set(0)
+            self.palette_listbox.activate(0)
+
+    def move_palette_selection(self, step):
+        """用上下键移动面板中的选中项"""
+        if not self.palette_results:
+            return "break"
+        selection = self.palette_listbox.curselection()
+        index = selection[0] + step if selection else 0
+        index = max(0, min(index, len(self.palette_results) - 1))
+        self.palette_listbox.selection_clear(0, tk.END)
+        self.palette_listbox.selection_set(index)
+        self.palette_listbox.activate(index)
+        self.palette_listbox.see(index)
+        return "break"
+
+    def copy_palette_selection(self):
+        """复制面板中选中的预设并隐藏面板"""
+        selection = self.palette_listbox.curselection()
+        if not selection:
+            return
+        group, name = self.palette_results[selection[0]]
+        self.hide_palette()
+        self.resolve_preset(group, name, lambda content: self.copy_to_clipboard(
+            content, preset_id=(group, name)))
+
+    @perf.timed("search.quick")
     def on_search_change(self, *args):
         """当搜索框内容变化时调用此函数"""
         search_text = self.search_var.get().lower()
@@ -1211,30 +3324,16 @@ class QuickText:
             self.refresh_all_group_buttons()
             return
 
-        # 保存所有匹配的预设
-        matched_presets = {}
-
         # 创建特殊的搜索结果分组，将所有匹配项合并显示
         search_results = {}
 
-        # 遍历所有分组和预设
-        for group_name, items in self.presets.items():
-            group_matches = {}
-
-            for name, content in items.items():
-                # 搜索名称和内容
-                if (search_text in name.lower() or
-                        search_text in content.lower()):
-                    # 添加到原分组的匹配结果
-                    group_matches[name] = content
+        # 在搜索索引中查找名称和内容
+        for group_name, name in self.search_presets(search_text):
+            content = preset_content(self.presets[group_name][name])
 
-                    # 添加到搜索结果，使用"分组名:预设名"作为键
-                    display_name = f"[{group_name}] {name}"
-                    search_results[display_name] = content
-
-            # 如果有匹配项，保存该分组的匹配结果
-            if group_matches:
-                matched_presets[group_name] = group_matches
+            # 添加到搜索结果，使用"分组名:预设名"作为键
+            display_name = f"[{group_name}] {name}"
+            search_results[display_name] = content
 
         # 首先清除所有分组的按钮
         for group_name in self.presets.keys():
@@ -1242,52 +3341,13 @@ class QuickText:
                 button_frame = self.group_button_frames[group_name]
                 for widget in button_frame.winfo_children():
                     widget.destroy()
+                self.group_items.pop(group_name, None)
 
         # 检查是否已有"搜索结果"分组，如果没有则创建
         search_tab_name = "搜索结果"
         if search_tab_name not in self.group_frames:
             # 创建搜索结果选项卡
-            search_frame = ttk.Frame(self.groups_notebook)
-            self.groups_notebook.add(search_frame, text=search_tab_name)
-            self.group_frames[search_tab_name] = search_frame
-
-            # 创建滚动区域
-            canvas = tk.Canvas(search_frame, width=300, height=200)
-            scrollbar = ttk.Scrollbar(
-                search_frame, orient=tk.VERTICAL, command=canvas.yview)
-
-            button_frame = ttk.Frame(canvas)
-
-            canvas.configure(yscrollcommand=scrollbar.set)
-            canvas.bind_all("<MouseWheel>", lambda event, c=canvas: c.yview_scroll(
-                int(-1*(event.delta/120)), "units"))
-            canvas.bind_all("<Button-4>", lambda event,
-                            c=canvas: c.yview_scroll(-1, "units"))
-            canvas.bind_all("<Button-5>", lambda event,
-                            c=canvas: c.yview_scroll(1, "units"))
-
-            scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-            canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-
-            # 创建按钮框架
-            canvas.create_window((0, 0), window=button_frame,
-                                 anchor=tk.NW, width=canvas.winfo_width())
-
-            # 更新Canvas的scrollregion
-            def update_scrollregion(event, c=canvas):
-                c.configure(scrollregion=c.bbox("all"))
-                # 调整按钮框架宽度与Canvas宽度一致
-                c.itemconfig(c.find_withtag("all")[0], width=c.winfo_width())
-
-            button_frame.bind("<Configure>", update_scrollregion)
-
-            # 存储引用
-            self.group_canvases[search_tab_name] = canvas
-            self.group_button_frames[search_tab_name] = button_frame
-
-            # 初始化分组的最后宽度记录
-            setattr(
-                self, f'last_width_{search_tab_name}', canvas.winfo_width())
+            self.create_group_view(search_tab_name)
 
         # 显示搜索结果
         if search_results:
@@ -1310,8 +3370,10 @@ class QuickText:
 
             # 显示搜索结果
             self.create_buttons_for_items(
-                search_tab_name, search_results, create_search_result_handler)
+                search_tab_name, list(search_results.items()),
+                create_search_result_handler)
 
+    @perf.timed("render.buttons")
     def create_buttons_for_items(self, group_name, items, command_func=None):
         """为指定的项目创建按钮"""
         if group_name not in self.group_button_frames:
@@ -1345,7 +3407,7 @@ class QuickText:
         x, y = 0, 0
         max_width = 0
 
-        for name, content in items.items():
+        for name, content in items:
             # 计算文本宽度
             temp_label.config(text=name)
             temp_label.update_idletasks()
@@ -1400,9 +3462,8 @@ class QuickText:
         # 销毁临时标签
         temp_label.destroy()
 
-        # 添加窗口大小变化事件处理
-        canvas.bind("<Configure>", lambda e, g=group_name,
-                    i=items: self.on_canvas_resize(e, g, i))
+        # 记录当前显示的项目，窗口大小变化时重新布局
+        self.group_items[group_name] = (items, command_func)
 
     def clear_search(self):
         """清除搜索框内容"""
@@ -1410,18 +3471,8 @@ class QuickText:
         # 刷新所有按钮
         self.refresh_all_group_buttons()
 
-        # 移除搜索结果选项卡
-        search_tab_name = "搜索结果"
-        for i, tab_id in enumerate(self.groups_notebook.tabs()):
-            if self.groups_notebook.tab(tab_id, "text") == search_tab_name:
-                self.groups_notebook.forget(tab_id)
-                if search_tab_name in self.group_frames:
-                    del self.group_frames[search_tab_name]
-                if search_tab_name in self.group_canvases:
-                    del self.group_canvases[search_tab_name]
-                if search_tab_name in self.group_button_frames:
-                    del self.group_button_frames[search_tab_name]
-                break
+        # 销毁搜索结果选项卡
+        self.remove_group_view("搜索结果")
 
 
 def center_window(window, width=864, height=500):
@@ -1440,11 +3491,39 @@ def center_window(window, width=864, height=500):
 
 def main():
     """程序主入口"""
+    if "--clipboard-helper" in sys.argv[1:]:
+        run_clipboard_helper()
+        return
+
+    # 带子命令时作为命令行工具运行，不创建窗口
+    if len(sys.argv) > 1 and not sys.argv[1].startswith("-"):
+        from quicktext import cli
+        sys.exit(cli.main(sys.argv[1:]))
+
+    startup_trace.enabled = ("--trace-startup" in sys.argv[1:] or
+                             bool(os.environ.get("QUICKTEXT_TRACE_STARTUP")))
+    startup_trace.mark("导入模块")
+
+    # 热点路径计时也可以在"诊断"选项卡中开启
+    if "--perf" in sys.argv[1:] or os.environ.get("QUICKTEXT_PERF"):
+        perf.enabled = True
+
+    # 已有实例在运行时只让它显示窗口，避免两个进程同时写入presets.json
+    server = None
+    if daemon.SUPPORTED:
+        data_file = os.path.join(core.get_data_dir(), "presets.json")
+        server = daemon.InstanceServer(data_file)
+        if not server.acquire():
+            if not daemon.show_running_instance(data_file):
+                print("QuickText已在运行，但没有响应")
+            return
+
     root = tk.Tk()
     root.title("QuickText - 快速文本工具")
 
     # 设置窗口居中显示
     center_window(root)
+    startup_trace.mark("创建Tk窗口")
 
     # 设置图标
     try:
@@ -1466,7 +3545,8 @@ def main():
     except Exception as e:
         print(f"加载图标出错: {e}")
 
-    app = QuickText(root)
+    app = QuickText(root, server=server,
+                    exit_after_startup="--exit-after-startup" in sys.argv[1:])
     root.mainloop()
 
 
@@ -0,0 +1,6 @@
+# -*- coding: utf-8 -*-
+"""
+QuickText - 快速文本工具
+"""
+
+__version__ = "1.0.0"
@@ -0,0 +1,10 @@
+# -*- coding: utf-8 -*-
+"""
+python -m quicktext 的入口
+"""
+
+import sys
+
+from .cli import main
+
+sys.exit(main())
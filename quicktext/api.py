@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+"""
+查询和添加预设的请求处理，命令行工具和单实例服务共用
+
+请求和结果都是可以直接转换为JSON的字典或列表，例如
+{"cmd": "search", "query": "ping", "limit": 10}。
+"""
+
+import os
+
+from . import core
+
+
+class RequestError(Exception):
+    """请求无法完成，消息直接显示给用户"""
+
+
+def split_ref(ref):
+    """把 "分组/名称" 拆分为 (分组, 名称)，没有分组时分组为None"""
+    group, sep, name = ref.partition("/")
+    if not sep:
+        return None, ref
+    return group, name
+
+
+def find_preset(store, ref):
+    """按 "分组/名称" 或仅按名称查找预设，返回 (分组, 名称)"""
+    group, name = split_ref(ref)
+    if group is not None and store.get(group, name) is not None:
+        return group, name
+
+    # 名称中本身可能包含 "/"，整体作为名称在所有分组中查找
+    matches = [(g, n) for g, n, _ in store.iter_presets() if n == ref]
+    if len(matches) == 1:
+        return matches[0]
+    if len(matches) > 1:
+        candidates = ", ".join(f"{g}/{n}" for g, n in matches)
+        raise RequestError(f"预设名称不唯一，请指定分组: {candidates}")
+    raise RequestError(f"找不到预设: {ref}")
+
+
+def preset_data(store, group, name):
+    """生成预设的输出数据"""
+    value = store.get(group, name)
+    data = {"group": group, "name": name,
+            "content": core.preset_content(value)}
+    data.update(core.preset_options(value))
+    return data
+
+
+def resolve_content(store, data_dir, group, name):
+    """取得复制预设时实际使用的内容，与图形界面通过热键复制时一致"""
+    value = store.get(group, name)
+    content = core.preset_content(value)
+    options = core.preset_options(value)
+    if options.get("command"):
+        return core.run_command(
+            content, options.get("timeout", core.DEFAULT_COMMAND_TIMEOUT))
+
+    settings = core.load_settings(os.path.join(data_dir, "settings.json"))
+    if not settings.get("expand_templates"):
+        return content
+    template = core.compile_template(content)
+    if not template.variables:
+        return content
+    return template.render(core.builtin_values(template))
+
+
+def handle_get(store, request):
+    """get：返回预设内容和属性"""
+    group, name = find_preset(store, request["ref"])
+    return preset_data(store, group, name)
+
+
+def handle_search(store, request):
+    """search：按名称和内容搜索"""
+    results = store.search(request["query"], limit=request.get("limit"))
+    return [preset_data(store, group, name) for group, name in results]
+
+
+def handle_add(store, request):
+    """add：添加或覆盖预设，只修改内存中的数据，调用者负责保存"""
+    group, name = split_ref(request["ref"])
+    if not group or not name:
+        raise RequestError("请使用 分组/名称 的格式指定新预设")
+
+    if group not in store.presets:
+        store.add_group(group)
+
+    content = request.get("content", "")
+    options = {"command": request.get("command", False)}
+    if store.get(group, name) is None:
+        store.add_preset(group, name, core.make_preset(content, options))
+        created = True
+    elif request.get("force"):
+        options = dict(core.preset_options(store.get(group, name)), **options)
+        store.set_preset(group, name, core.make_preset(content, options))
+        created = False
+    else:
+        raise RequestError(f"预设已存在: {group}/{name}（使用 --force 覆盖）")
+
+    return {"group": group, "name": name, "created": created}
+
+
+def handle_import(store, request, progress=None):
+    """import：从文件或目录批量导入，只修改内存中的数据，调用者负责保存"""
+    result = core.ImportResult()
+    try:
+        records = core.read_records(
+            request["path"], request.get("format"),
+            request.get("group") or core.DEFAULT_IMPORT_GROUP,
+            result.errors)
+        core.import_presets(store, records, request.get("policy", "skip"),
+                            progress, result)
+    except (OSError, ValueError) as e:
+        raise RequestError(f"导入失败，未做任何修改: {str(e)}")
+    return result.to_dict()
+
+
+def handle_export(store, request):
+    """export：按当前顺序导出所有预设"""
+    try:
+        count = core.export_presets(store, request["path"], request.get("format"))
+    except (OSError, ValueError) as e:
+        raise RequestError(f"导出失败: {str(e)}")
+    return {"path": request["path"], "count": count}
+
+
+# 只读取数据的请求
+QUERY_HANDLERS = {
+    "get": handle_get,
+    "search": handle_search,
+    "export": handle_export,
+}
@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+"""
+QuickText命令行工具，不启动图形界面
+
+    python -m quicktext get 常用/网络诊断
+    python -m quicktext search ping --json
+    python -m quicktext copy 网络诊断
+    echo "内容" | python -m quicktext add 常用/新预设
+    python -m quicktext import snippets.csv --on-conflict rename
+    python -m quicktext export backup.jsonl
+
+QuickText正在运行时请求由运行中的实例处理，直接使用其内存中的数据和搜索索引；
+否则直接读写presets.json。只导入 quicktext.core，不导入tkinter、keyboard和pyperclip。
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import sys
+
+from . import api, core, daemon
+
+
+def build_request(args):
+    """把命令行参数转换为请求"""
+    if args.command_name == "search":
+        return {"cmd": "search", "query": args.query, "limit": args.limit}
+    if args.command_name == "add":
+        content = args.content
+        if content is None:
+            content = sys.stdin.read().rstrip("\n")
+        return {"cmd": "add", "ref": args.ref, "content": content,
+                "command": args.command, "force": args.force}
+    if args.command_name == "import":
+        # 运行中的实例的工作目录可能不同，使用绝对路径
+        return {"cmd": "import", "path": os.path.abspath(args.path),
+                "format": args.format, "group": args.group,
+                "policy": args.on_conflict}
+    if args.command_name == "export":
+        return {"cmd": "export", "path": os.path.abspath(args.path),
+                "format": args.format}
+    return {"cmd": args.command_name, "ref": args.ref}
+
+
+def run_local(data_dir, request):
+    """没有运行中的实例时直接读写预设文件"""
+    store = core.PresetStore(os.path.join(data_dir, "presets.json"))
+    store.load()
+    command = request["cmd"]
+
+    if command in api.QUERY_HANDLERS:
+        return api.QUERY_HANDLERS[command](store, request)
+
+    if command == "copy":
+        from .clipboard import copy_text
+
+        group, name = api.find_preset(store, request["ref"])
+        content = api.resolve_content(store, data_dir, group, name)
+        copy_text(content)
+        return {"group": group, "name": name, "length": len(content)}
+
+    if command == "import":
+        result = api.handle_import(
+            store, request, progress=lambda count: print(f"已处理 {count} 条"))
+    else:
+        result = api.handle_add(store, request)
+    if not store.save():
+        raise api.RequestError(f"无法保存预设文件: {str(store.save_error)}")
+    return result
+
+
+def run(args, request):
+    """优先交给运行中的实例处理请求，返回结果"""
+    data_dir = core.get_data_dir()
+    if not args.local:
+        response = daemon.request(
+            os.path.join(data_dir, "presets.json"), request)
+        if response is not None:
+            if not response.get("ok"):
+                raise api.RequestError(response.get("error", "请求失败"))
+            return response.get("result")
+    return run_local(data_dir, request)
+
+
+def format_result(command, result):
+    """生成非JSON模式下的输出文本"""
+    if command == "get":
+        return result["content"]
+    if command == "search":
+        return "\n".join(f"{item['group']}/{item['name']}" for item in result)
+    if command == "import":
+        lines = [f"新增 {result['added']}，覆盖 {result['overwritten']}，"
+                 f"重命名 {result['renamed']}，跳过 {result['skipped']}，"
+                 f"错误 {result['error_count']}"]
+        if result["deduplicated"]:
+            lines.append(f"其中 {result['deduplicated']} 个预设与已有预设内容相同，"
+                         f"共用一份正文（{result['deduplicated_chars']} 个字符）")
+        return "\n".join(lines + result["errors"])
+    if command == "export":
+        return f"已导出 {result['count']} 个预设到: {result['path']}"
+    return None
+
+
+def build_parser():
+    """创建命令行参数解析器"""
+    parser = argparse.ArgumentParser(
+        prog="quicktext", description="QuickText命令行工具")
+    parser.add_argument("--json", action="store_true", help="以JSON格式输出")
+    parser.add_argument("--local", action="store_true",
+                        help="不连接运行中的QuickText，直接读写预设文件")
+    subparsers = parser.add_subparsers(dest="command_name", required=True)
+
+    get_parser = subparsers.add_parser("get", help="输出预设内容")
+    get_parser.add_argument("ref", help="分组/名称，名称唯一时可省略分组")
+
+    search_parser = subparsers.add_parser("search", help="搜索预设")
+    search_parser.add_argument("query", help="搜索关键字")
+    search_parser.add_argument("--limit", type=int, default=None,
+                               help="最多显示的结果数量")
+
+    copy_parser = subparsers.add_parser("copy", help="复制预设到剪贴板")
+    copy_parser.add_argument("ref", help="分组/名称，名称唯一时可省略分组")
+
+    add_parser = subparsers.add_parser("add", help="添加预设")
+    add_parser.add_argument("ref", help="分组/名称，分组不存在时自动创建")
+    add_parser.add_argument("content", nargs="?",
+                            help="预设内容，省略时从标准输入读取")
+    add_parser.add_argument("--command", action="store_true",
+                            help="作为命令执行，复制输出结果")
+    add_parser.add_argument("--force", action="store_true",
+                            help="预设已存在时覆盖其内容")
+
+    import_parser = subparsers.add_parser(
+        "import", help="从CSV、JSONL、文本文件目录或presets.json批量导入")
+    import_parser.add_argument("path", help="要导入的文件或目录")
+    import_parser.add_argument("--format", choices=core.FORMATS,
+                               help="文件格式，默认根据扩展名判断")
+    import_parser.add_argument("--group", default=core.DEFAULT_IMPORT_GROUP,
+                               help="记录中没有分组时使用的分组")
+    import_parser.add_argument("--on-conflict", choices=core.CONFLICT_POLICIES,
+                               default="skip", help="预设已存在时的处理方式")
+
+    export_parser = subparsers.add_parser("export", help="导出所有预设")
+    export_parser.add_argument("path", help="导出的文件或目录")
+    export_parser.add_argument("--format", choices=core.FORMATS,
+                               help="文件格式，默认根据扩展名判断")
+
+    for subparser in subparsers.choices.values():
+        # 允许把 --json 写在子命令之后
+        subparser.add_argument("--json", action="store_true",
+                               default=argparse.SUPPRESS,
+                               help="以JSON格式输出")
+
+    return parser
+
+
+def main(argv=None):
+    """命令行入口，返回退出码"""
+    args = build_parser().parse_args(argv)
+    try:
+        request = build_request(args)
+        # 核心库的日志输出到标准错误，标准输出只保留结果，便于管道处理
+        with contextlib.redirect_stdout(sys.stderr):
+            result = run(args, request)
+    except (api.RequestError, ValueError, OSError, RuntimeError) as e:
+        print(f"错误: {str(e)}", file=sys.stderr)
+        return 1
+
+    if args.json:
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+    else:
+        output = format_result(args.command_name, result)
+        if output:
+            print(output)
+    return 0
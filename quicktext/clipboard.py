@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+"""
+不依赖界面的剪贴板写入：Linux下使用常驻辅助进程持有剪贴板，其他平台使用pyperclip
+
+tkinter和pyperclip只在真正需要时导入，命令行工具导入本模块不会增加启动时间。
+"""
+
+import os
+import select
+import subprocess
+import sys
+import time
+
+from .core.paths import APP_DIR
+
+# 等待辅助进程启动或确认写入的最长时间（秒）
+HELPER_TIMEOUT = 5
+
+
+class ClipboardHelper:
+    """常驻的剪贴板辅助进程，用于没有Tk窗口时持有Linux剪贴板"""
+
+    def __init__(self, timeout=HELPER_TIMEOUT):
+        self.process = None
+        self.timeout = timeout
+        # 已读取但尚未处理的确认数据
+        self._replies = b""
+
+    def start(self):
+        """启动辅助进程"""
+        if getattr(sys, 'frozen', False):
+            command = [sys.executable, "--clipboard-helper"]
+        else:
+            command = [sys.executable, "-m", "quicktext.clipboard"]
+
+        # 使用独立会话，使辅助进程在调用者退出后仍能持有剪贴板
+        self.process = subprocess.Popen(
+            command, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL, start_new_session=True, cwd=APP_DIR)
+        self._replies = b""
+        # Tk初始化失败（如没有DISPLAY）时辅助进程直接退出，不会发出就绪确认
+        self._wait_reply(b"ready")
+
+    def _wait_reply(self, expected):
+        """等待辅助进程输出一行确认，超时或进程退出时抛出OSError"""
+        fd = self.process.stdout.fileno()
+        deadline = time.monotonic() + self.timeout
+        while b"\n" not in self._replies:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not select.select([fd], [], [], remaining)[0]:
+                self._fail("剪贴板辅助进程没有响应")
+            chunk = os.read(fd, 64)
+            if not chunk:
+                self._fail("剪贴板辅助进程已退出")
+            self._replies += chunk
+        line, _, self._replies = self._replies.partition(b"\n")
+        if line != expected:
+            self._fail(f"剪贴板辅助进程返回了意外的响应: {line!r}")
+
+    def _fail(self, message):
+        """结束无法使用的辅助进程并抛出OSError"""
+        process, self.process = self.process, None
+        try:
+            process.kill()
+        except OSError:
+            pass
+        raise OSError(message)
+
+    def write(self, content):
+        """发送一段内容给辅助进程，等待其确认已写入剪贴板"""
+        if self.process is None:
+            self.start()
+        elif self.process.poll() is not None:
+            # 输入未关闭时辅助进程不会主动退出，说明它已崩溃
+            self.process = None
+            raise OSError("剪贴板辅助进程已退出")
+        data = content.encode('utf-8')
+        try:
+            self.process.stdin.write(f"{len(data)}\n".encode('ascii') + data)
+            self.process.stdin.flush()
+        except OSError:
+            self._fail("剪贴板辅助进程已退出")
+        self._wait_reply(b"ok")
+
+    def close(self):
+        """关闭输入管道，辅助进程在失去剪贴板所有权后自行退出"""
+        if self.process is not None and self.process.stdin:
+            try:
+                self.process.stdin.close()
+            except OSError:
+                pass
+        self.process = None
+
+
+def copy_text(content):
+    """将文本写入系统剪贴板，调用返回后进程可以直接退出
+
+    辅助进程和pyperclip都无法写入时抛出OSError。
+    """
+    if sys.platform.startswith('linux'):
+        helper = ClipboardHelper()
+        try:
+            helper.write(content)
+            return
+        except OSError as e:
+            print(f"剪贴板辅助进程不可用: {str(e)}", file=sys.stderr)
+        finally:
+            helper.close()
+
+    try:
+        import pyperclip
+        pyperclip.copy(content)
+    except (ImportError, RuntimeError) as e:
+        # pyperclip找不到可用的剪贴板程序时抛出的异常是RuntimeError的子类
+        raise OSError(f"无法写入剪贴板: {str(e)}")
+
+
+def run_clipboard_helper():
+    """剪贴板辅助进程入口
+
+    从标准输入读取 "长度\\n内容" 格式的数据并持有剪贴板，
+    输入关闭后一直运行到剪贴板被其他程序接管。
+    Tk初始化完成后在标准输出写一行 "ready"，每收到一段内容写一行 "ok"。
+    """
+    import tkinter as tk
+
+    root = tk.Tk()
+    root.withdraw()
+    buffer = bytearray()
+    fd = sys.stdin.fileno()
+
+    def reply(line):
+        try:
+            os.write(sys.stdout.fileno(), line + b"\n")
+        except OSError:
+            # 调用者已退出，不再需要确认
+            pass
+
+    def watch_ownership():
+        try:
+            owner = root.tk.call('selection', 'own', '-selection', 'CLIPBOARD')
+        except tk.TclError:
+            owner = ""
+        if not owner:
+            root.destroy()
+            return
+        root.after(2000, watch_ownership)
+
+    def on_readable(file, mask):
+        chunk = os.read(fd, 65536)
+        if not chunk:
+            root.deletefilehandler(fd)
+            watch_ownership()
+            return
+
+        buffer.extend(chunk)
+        content = None
+        received = 0
+        while b"\n" in buffer:
+            header, _, rest = bytes(buffer).partition(b"\n")
+            size = int(header)
+            if len(rest) < size:
+                break
+            content = rest[:size].decode('utf-8')
+            del buffer[:len(header) + 1 + size]
+            received += 1
+
+        # 只写入最新的一段内容，但每段内容都要确认
+        if content is not None:
+            root.clipboard_clear()
+            root.clipboard_append(content)
+        for _ in range(received):
+            reply(b"ok")
+
+    root.createfilehandler(fd, tk.READABLE, on_readable)
+    reply(b"ready")
+    root.mainloop()
+
+
+if __name__ == "__main__":
+    run_clipboard_helper()
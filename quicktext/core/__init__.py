@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+"""
+QuickText核心库：预设存储、排序、搜索和持久化，不依赖tkinter等界面库
+"""
+
+from .commands import (DEFAULT_COMMAND_TIMEOUT, DEFAULT_COMMAND_TTL, CommandRunner,
+                       run_command)
+from .history import ClipboardHistory
+from .order import RankOrder
+from .paths import get_data_dir
+from .perf import PerfRecorder, perf
+from .presets import DEFAULT_PRESETS, make_preset, preset_content, preset_options
+from .revisions import RevisionStore
+from .search import SearchIndex
+from .settings import DEFAULT_SETTINGS, load_settings, save_settings
+from .store import PresetStore
+from .template import (BUILTIN_VARIABLES, CLIPBOARD_VARIABLES, CompiledTemplate,
+                       builtin_values, compile_template)
+from .transfer import (CONFLICT_POLICIES, DEFAULT_IMPORT_GROUP, FORMATS, ImportResult,
+                       export_presets, import_presets, read_records)
+from .undo import UndoHistory, apply_change
+from .usage import UsageLog
+
+__all__ = [
+    "BUILTIN_VARIABLES",
+    "CLIPBOARD_VARIABLES",
+    "CONFLICT_POLICIES",
+    "ClipboardHistory",
+    "CommandRunner",
+    "CompiledTemplate",
+    "DEFAULT_COMMAND_TIMEOUT",
+    "DEFAULT_COMMAND_TTL",
+    "DEFAULT_IMPORT_GROUP",
+    "DEFAULT_PRESETS",
+    "DEFAULT_SETTINGS",
+    "FORMATS",
+    "ImportResult",
+    "PerfRecorder",
+    "PresetStore",
+    "RankOrder",
+    "RevisionStore",
+    "SearchIndex",
+    "UndoHistory",
+    "UsageLog",
+    "apply_change",
+    "builtin_values",
+    "compile_template",
+    "export_presets",
+    "get_data_dir",
+    "import_presets",
+    "load_settings",
+    "make_preset",
+    "perf",
+    "preset_content",
+    "preset_options",
+    "read_records",
+    "run_command",
+    "save_settings",
+]
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""
+按内容寻址的预设正文表：相同的正文在内存中只保存一份
+"""
+
+
+class BodyTable:
+    """预设正文表
+
+    以正文本身为键（即按字符串哈希寻址，哈希相同时再逐字比较，不会误合并）
+    保存唯一的正文字符串和引用计数。预设通过 acquire() 取得共享的字符串，
+    不再使用时调用 release()，引用计数归零后删除。
+    """
+
+    def __init__(self):
+        # 正文 -> 共享的正文对象
+        self.bodies = {}
+        # 正文 -> 引用数，只记录被多个预设引用的正文
+        self.refs = {}
+        # 累计复用已有正文的次数和省下的字符数
+        self.reused = 0
+        self.reused_chars = 0
+
+    def __len__(self):
+        return len(self.bodies)
+
+    def clear(self):
+        """清空正文表，累计统计保留"""
+        self.bodies = {}
+        self.refs = {}
+
+    def acquire(self, content):
+        """登记一次引用，返回表中共享的正文"""
+        existing = self.bodies.get(content)
+        if existing is None:
+            self.bodies[content] = content
+            return content
+        self.refs[content] = self.refs.get(content, 1) + 1
+        self.reused += 1
+        self.reused_chars += len(content)
+        return existing
+
+    def release(self, content):
+        """释放一次引用"""
+        count = self.refs.get(content)
+        if count is None:
+            self.bodies.pop(content, None)
+        elif count > 2:
+            self.refs[content] = count - 1
+        else:
+            del self.refs[content]
+
+    def shared(self):
+        """被多个预设引用的正文"""
+        return self.refs.keys()
+
+    def stats(self):
+        """唯一正文数、引用数、唯一正文的字符数和重复部分的字符数"""
+        return {
+            "unique": len(self.bodies),
+            "references": len(self.bodies) + sum(self.refs.values()) - len(self.refs),
+            "unique_chars": sum(len(content) for content in self.bodies),
+            "shared_chars": sum(len(content) * (count - 1)
+                                for content, count in self.refs.items()),
+        }
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""
+命令型预设的执行和结果缓存
+"""
+
+import subprocess
+import threading
+import time
+
+# 命令型预设结果的默认缓存时间和执行超时（秒）
+DEFAULT_COMMAND_TTL = 60
+DEFAULT_COMMAND_TIMEOUT = 10
+
+
+def run_command(command, timeout=DEFAULT_COMMAND_TIMEOUT):
+    """执行命令并返回标准输出，失败或超时时抛出异常"""
+    try:
+        result = subprocess.run(
+            command, shell=True, capture_output=True, text=True,
+            errors="replace", timeout=timeout)
+    except subprocess.TimeoutExpired:
+        raise TimeoutError(f"命令执行超过 {timeout} 秒")
+    if result.returncode != 0 and not result.stdout:
+        raise RuntimeError(
+            result.stderr.strip() or f"退出码 {result.returncode}")
+    return result.stdout.rstrip("\n")
+
+
+class CommandRunner:
+    """命令型预设的执行器
+
+    每条命令在独立的子进程中执行，由线程池负责等待和超时，
+    结果按预设的缓存时间保存，过期后先返回旧结果再在后台刷新。
+    """
+
+    def __init__(self, max_workers=4):
+        # 延迟导入，命令行工具只用 run_command 时无需加载线程池
+        from concurrent.futures import ThreadPoolExecutor
+
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="quicktext-command")
+        # 键 -> (命令, 输出, 完成时间)
+        self.cache = {}
+        # 正在执行的键 -> 等待结果的回调列表
+        self.pending = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, command, ttl, timeout, on_done):
+        """返回缓存的输出，没有可用缓存时返回None
+
+        缓存不存在时在后台执行命令，完成后在工作线程中调用 on_done(输出, 错误)；
+        缓存已过期时同样在后台刷新，但不调用 on_done。
+        """
+        with self._lock:
+            cached = self.cache.get(key)
+            if cached is not None and cached[0] != command:
+                # 命令内容已修改，旧结果作废
+                cached = None
+            stale = cached is None or time.time() - cached[2] > ttl
+
+            if stale:
+                callbacks = self.pending.get(key)
+                if callbacks is None:
+                    callbacks = self.pending[key] = []
+                    self.executor.submit(self._run, key, command, timeout)
+                if cached is None:
+                    callbacks.append(on_done)
+
+        return cached[1] if cached is not None else None
+
+    def _run(self, key, command, timeout):
+        """在工作线程中执行命令"""
+        output, error = None, None
+        try:
+            output = run_command(command, timeout)
+        except Exception as e:
+            error = e
+
+        with self._lock:
+            if error is None:
+                self.cache[key] = (command, output, time.time())
+            callbacks = self.pending.pop(key, [])
+
+        for callback in callbacks:
+            callback(output, error)
+
+    def forget(self, key):
+        """清除某个预设的缓存结果"""
+        with self._lock:
+            self.cache.pop(key, None)
+
+    def shutdown(self):
+        """停止执行器，不等待正在执行的命令"""
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+"""
+剪贴板历史
+"""
+
+import json
+from collections import OrderedDict
+
+
+class ClipboardHistory:
+    """有界的剪贴板历史环
+
+    预设只保存 (分组, 名称) 标识而不复制内容，重复复制的条目会被移到最前面。
+    条目数量或占用字节数超出上限时淘汰最旧的条目；单条超过 max_bytes 的内容不记录，
+    因此占用的字节数始终不超过上限。
+    """
+
+    def __init__(self, max_items=50, max_bytes=64 * 1024):
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        # 键为 ("preset", 分组, 名称) 或 ("text", 内容)，值为占用字节数，最新的在末尾
+        self.entries = OrderedDict()
+        self.total_bytes = 0
+        # 每次变化递增，用于判断弹出窗口是否需要重新填充
+        self.version = 0
+
+    @staticmethod
+    def entry_size(key):
+        """估算条目占用的字节数"""
+        return sum(len(part.encode('utf-8')) for part in key[1:])
+
+    def push(self, key):
+        """记录一次复制，内容超过 max_bytes 时不记录并返回False"""
+        if key in self.entries:
+            self.entries.move_to_end(key)
+        else:
+            size = self.entry_size(key)
+            if size > self.max_bytes:
+                return False
+            self.entries[key] = size
+            self.total_bytes += size
+            self.evict()
+        self.version += 1
+        return True
+
+    def push_preset(self, group, name):
+        """记录一次预设复制"""
+        return self.push(("preset", group, name))
+
+    def push_text(self, text):
+        """记录一次非预设内容的复制"""
+        return self.push(("text", text))
+
+    def evict(self):
+        """淘汰最旧的条目直到满足上限"""
+        while (len(self.entries) > self.max_items or
+               self.total_bytes > self.max_bytes):
+            _, size = self.entries.popitem(last=False)
+            self.total_bytes -= size
+
+    def replace_keys(self, mapping):
+        """按映射函数替换条目键，保持原有顺序"""
+        entries = OrderedDict()
+        for key in self.entries:
+            new_key = mapping(key)
+            if new_key is not None and new_key not in entries:
+                size = self.entry_size(new_key)
+                if size <= self.max_bytes:
+                    entries[new_key] = size
+        self.entries = entries
+        self.total_bytes = sum(entries.values())
+        self.evict()
+        self.version += 1
+
+    def rename_preset(self, group, old_name, new_name):
+        """预设重命名后更新条目"""
+        old_key = ("preset", group, old_name)
+        if old_key in self.entries:
+            new_key = ("preset", group, new_name)
+            self.replace_keys(lambda k: new_key if k == old_key else k)
+
+    def rename_group(self, old_group, new_group):
+        """分组重命名后更新条目"""
+        self.replace_keys(
+            lambda k: ("preset", new_group, k[2])
+            if k[0] == "preset" and k[1] == old_group else k)
+
+    def items(self):
+        """从新到旧返回所有条目键"""
+        return list(reversed(self.entries))
+
+    def to_data(self):
+        """转换为可保存的数据"""
+        return [list(key) for key in self.entries]
+
+    def load_data(self, data):
+        """从保存的数据恢复"""
+        for item in data:
+            if isinstance(item, list) and item and item[0] in ("preset", "text"):
+                self.push(tuple(item))
+
+    def load(self, path):
+        """从文件恢复历史，文件不存在时不做处理"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                self.load_data(json.load(f))
+        except FileNotFoundError:
+            pass
+
+    def save(self, path):
+        """将历史写入文件"""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_data(), f, ensure_ascii=False)
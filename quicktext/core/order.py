@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+"""
+预设的排列顺序
+"""
+
+from bisect import bisect_left
+
+
+class RankOrder:
+    """基于稀疏排名键的顺序结构，移动单个元素只需计算一个新排名
+
+    排好序的键和对应的排名保存在两个平行列表中，定位元素时按排名二分查找，
+    不需要逐个比较键；回放移动日志等批量修改排名后整体重新排序一次。
+    """
+
+    # 初始排名间隔，越大可以在两个元素之间插入的次数越多
+    STEP = 1024.0
+    # 相邻排名间隔小于此值时重新均匀分配排名
+    MIN_GAP = 1e-6
+
+    def __init__(self, keys=()):
+        self.ranks = {}
+        self._sorted = []
+        # 与 _sorted 对应的排名，用于二分查找
+        self._sorted_ranks = []
+        for key in keys:
+            self.append(key)
+
+    def __len__(self):
+        return len(self.ranks)
+
+    def __contains__(self, key):
+        return key in self.ranks
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def keys(self):
+        """按排名顺序返回所有键"""
+        if self._sorted is None:
+            self._sorted = sorted(self.ranks, key=self.ranks.__getitem__)
+            self._sorted_ranks = [self.ranks[key] for key in self._sorted]
+        return self._sorted
+
+    def _index(self, key):
+        """按排名二分查找键在排序列表中的位置"""
+        keys = self.keys()
+        index = bisect_left(self._sorted_ranks, self.ranks[key])
+        # 排名相同（如损坏的移动日志）时向后查找
+        while keys[index] != key:
+            index += 1
+        return index
+
+    def append(self, key):
+        """将键追加到末尾"""
+        keys = self.keys()
+        rank = (self._sorted_ranks[-1] if keys else 0.0) + self.STEP
+        self.ranks[key] = rank
+        keys.append(key)
+        self._sorted_ranks.append(rank)
+
+    def remove(self, key):
+        """移除键"""
+        if key in self.ranks:
+            if self._sorted is not None:
+                index = self._index(key)
+                del self._sorted[index]
+                del self._sorted_ranks[index]
+            del self.ranks[key]
+
+    def rename(self, old_key, new_key):
+        """重命名键并保持原有位置"""
+        if old_key not in self.ranks:
+            self.append(new_key)
+            return
+        if self._sorted is not None:
+            self._sorted[self._index(old_key)] = new_key
+        self.ranks[new_key] = self.ranks.pop(old_key)
+
+    def set_rank(self, key, rank):
+        """直接设置键的排名（用于回放移动日志）"""
+        if key in self.ranks:
+            self.ranks[key] = rank
+            self._sorted = None
+            self._sorted_ranks = None
+
+    def move(self, key, index):
+        """将键移动到指定位置
+
+        返回 (新排名, 是否重新分配了全部排名)
+        """
+        keys = self.keys()
+        ranks = self._sorted_ranks
+        old_index = self._index(key)
+        del keys[old_index]
+        del ranks[old_index]
+        index = max(0, min(index, len(keys)))
+
+        # 只根据目标位置两侧的邻居计算新排名
+        before = ranks[index - 1] if index > 0 else None
+        after = ranks[index] if index < len(keys) else None
+        if before is None and after is None:
+            rank = self.STEP
+        elif before is None:
+            rank = after - self.STEP
+        elif after is None:
+            rank = before + self.STEP
+        else:
+            rank = (before + after) / 2
+
+        keys.insert(index, key)
+        ranks.insert(index, rank)
+        self.ranks[key] = rank
+
+        # 间隔耗尽时重新均匀分配排名
+        if before is not None and after is not None and (
+                rank - before < self.MIN_GAP or after - rank < self.MIN_GAP):
+            for i, k in enumerate(keys):
+                self.ranks[k] = (i + 1) * self.STEP
+            self._sorted_ranks = [self.ranks[k] for k in keys]
+            return self.ranks[key], True
+
+        return rank, False
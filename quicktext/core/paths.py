@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+"""
+数据文件路径
+"""
+
+import os
+import sys
+
+# 开发环境中程序所在目录（quick_text.py 所在目录）
+APP_DIR = os.path.dirname(os.path.dirname(
+    os.path.dirname(os.path.abspath(__file__))))
+
+
+def get_data_dir():
+    """获取数据目录，优先使用当前目录"""
+    # 首先检查当前工作目录
+    current_dir = os.getcwd()
+    if os.path.exists(os.path.join(current_dir, "presets.json")):
+        return current_dir
+
+    # 如果当前目录下不存在配置文件，则检查exe所在目录
+    if getattr(sys, 'frozen', False):
+        # 在PyInstaller打包环境中
+        exe_dir = os.path.dirname(sys.executable)
+        if os.path.exists(os.path.join(exe_dir, "presets.json")):
+            return exe_dir
+
+    # 最后使用脚本所在目录或用户数据目录
+    if getattr(sys, 'frozen', False):
+        # 使用exe所在目录
+        app_data = os.path.dirname(sys.executable)
+    else:
+        # 在开发环境中使用脚本所在目录
+        app_data = APP_DIR
+
+    return app_data
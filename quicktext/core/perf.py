@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+"""
+热点路径计时：搜索、渲染、保存、加载、剪贴板写入和热键分发
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+
+# 每种操作保留的最近耗时数量
+DEFAULT_SPAN_CAPACITY = 1024
+
+# 导出跟踪时保留的最近事件数量（所有操作合计）
+DEFAULT_EVENT_CAPACITY = 10000
+
+
+class _NullSpan:
+    """未开启时使用的空计时区间"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    """一次计时区间，退出时记录耗时"""
+
+    __slots__ = ("recorder", "name", "start")
+
+    def __init__(self, recorder, name):
+        self.recorder = recorder
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.recorder.record(self.name, self.start,
+                             time.perf_counter() - self.start)
+        return False
+
+
+def percentile(ordered, fraction):
+    """已排序序列的百分位数（取最近的样本）"""
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+class PerfRecorder:
+    """热点路径计时器
+
+    每种操作的最近耗时保存在固定长度的环形缓冲区中，按需计算p50/p95/p99；
+    同时保留最近的事件用于导出Chrome跟踪格式（可在 chrome://tracing 或
+    Perfetto 中查看）。未开启时 span() 返回共享的空对象，timed() 包装的函数
+    只多一次属性检查。
+    """
+
+    def __init__(self, capacity=DEFAULT_SPAN_CAPACITY,
+                 event_capacity=DEFAULT_EVENT_CAPACITY):
+        self.enabled = False
+        self.capacity = capacity
+        self.start = time.perf_counter()
+        # 操作名 -> 最近的耗时（秒）
+        self.spans = {}
+        # (操作名, 开始时间, 耗时, 线程标识)
+        self.events = deque(maxlen=event_capacity)
+        self._lock = threading.Lock()
+
+    def span(self, name):
+        """计时区间，用于 with 语句"""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name)
+
+    def timed(self, name):
+        """装饰器：为函数的每次调用计时"""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.record(name, start, time.perf_counter() - start)
+            return wrapper
+        return decorator
+
+    def record(self, name, start, duration):
+        """记录一次耗时（秒），可在任意线程中调用"""
+        samples = self.spans.get(name)
+        if samples is None:
+            with self._lock:
+                samples = self.spans.setdefault(
+                    name, deque(maxlen=self.capacity))
+        samples.append(duration)
+        self.events.append((name, start, duration, threading.get_ident()))
+
+    def clear(self):
+        """清除所有记录"""
+        with self._lock:
+            self.spans = {}
+            self.events.clear()
+
+    def summary(self):
+        """各操作的统计，耗时单位为毫秒，按操作名排序"""
+        rows = []
+        for name, samples in sorted(self.spans.items()):
+            ordered = sorted(samples)
+            if not ordered:
+                continue
+            rows.append({
+                "name": name,
+                "count": len(ordered),
+                "p50_ms": round(percentile(ordered, 0.50) * 1000, 3),
+                "p95_ms": round(percentile(ordered, 0.95) * 1000, 3),
+                "p99_ms": round(percentile(ordered, 0.99) * 1000, 3),
+                "max_ms": round(ordered[-1] * 1000, 3),
+            })
+        return rows
+
+    def trace(self):
+        """以Chrome跟踪事件格式返回最近的事件"""
+        pid = os.getpid()
+        events = [{
+            "name": name,
+            "cat": name.split(".", 1)[0],
+            "ph": "X",
+            "ts": round((start - self.start) * 1e6, 1),
+            "dur": round(duration * 1e6, 1),
+            "pid": pid,
+            "tid": tid,
+        } for name, start, duration, tid in list(self.events)]
+        return {
+            "traceEvents": events,
+            "displayTimeUnit": "ms",
+            "otherData": {"summary": self.summary()},
+        }
+
+    def export_trace(self, path):
+        """把最近的事件导出为JSON跟踪文件"""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.trace(), f, ensure_ascii=False)
+
+
+# 进程内共享的计时器，默认关闭
+perf = PerfRecorder()
@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+"""
+预设数据格式
+
+预设可以是纯文本，也可以是带附加属性（热键、命令等）的字典：
+{"content": "...", "hotkey": "ctrl+alt+1", "autotype": true, "command": true, "ttl": 60}
+"""
+
+# 首次运行时创建的默认预设
+DEFAULT_PRESETS = {"常用": {
+    "欢迎使用": "欢迎使用QuickText!\n\n这是您的第一个预设文本。\n您可以在设置中添加更多预设。",
+    "网络诊断": "ipconfig /all & ping www.google.com",
+    "系统信息": "systeminfo",
+    "查看进程": "tasklist | findstr \"chrome\""
+}}
+
+
+def preset_content(value):
+    """获取预设的文本内容，预设可以是纯文本或带属性的字典"""
+    if isinstance(value, dict):
+        return value.get("content", "")
+    return value
+
+
+def preset_options(value):
+    """获取预设的附加属性（热键等）"""
+    if isinstance(value, dict):
+        return {k: v for k, v in value.items() if k != "content"}
+    return {}
+
+
+def make_preset(content, options=None):
+    """生成预设数据，没有附加属性时保存为纯文本以兼容旧格式"""
+    options = {k: v for k, v in (options or {}).items()
+               if v is not None and v is not False and v != ""}
+    if not options:
+        return content
+    return dict(content=content, **options)
@@ -0,0 +1,268 @@
+# -*- coding: utf-8 -*-
+"""
+预设的历史版本
+
+每个预设的历史保存在 presets.json 旁边目录中的一个文件里，只在查看或恢复时读取，
+启动时不加载。文件由若干条记录组成，每条记录为固定长度的头部加 zlib 压缩的数据：
+关键帧保存完整内容，其余记录保存相对上一版本的按行差异；每 keyframe_interval 个
+版本写入一个关键帧，读取任意版本最多只需解压一个关键帧和之后的几条差异。
+写入和读取都在一个后台线程中依次进行，保存预设时不等待压缩和写文件。
+"""
+
+import difflib
+import hashlib
+import json
+import os
+import queue
+import struct
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
+# 每隔多少个版本保存一次完整内容
+KEYFRAME_INTERVAL = 16
+
+# 后台线程缓存最近几个预设的最新版本，连续保存时无需重新读取文件
+TAIL_CACHE_SIZE = 16
+
+# 记录头部：保存时间、类型、内容字符数、压缩数据的字节数
+HEADER = struct.Struct("<dBII")
+
+KEYFRAME = 0
+DELTA = 1
+
+
+def make_delta(old, new):
+    """生成从 old 到 new 的按行差异：[起始行, 结束行] 表示沿用旧内容，字符串表示新内容"""
+    old_lines = old.splitlines(keepends=True)
+    new_lines = new.splitlines(keepends=True)
+    ops = []
+    matcher = difflib.SequenceMatcher(None, old_lines, new_lines)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            ops.append([i1, i2])
+        elif j2 > j1:
+            ops.append("".join(new_lines[j1:j2]))
+    return ops
+
+
+def apply_delta(old, ops):
+    """把按行差异应用到 old 上"""
+    old_lines = old.splitlines(keepends=True)
+    return "".join("".join(old_lines[op[0]:op[1]]) if isinstance(op, list) else op
+                   for op in ops)
+
+
+def read_headers(f):
+    """依次读取记录头部，返回 [(数据位置, 时间, 类型, 字符数, 字节数)]
+
+    文件末尾写入中断的残缺记录被忽略。
+    """
+    records = []
+    f.seek(0, os.SEEK_END)
+    end = f.tell()
+    offset = 0
+    while offset + HEADER.size <= end:
+        f.seek(offset)
+        saved_at, kind, length, size = HEADER.unpack(f.read(HEADER.size))
+        offset += HEADER.size
+        if offset + size > end:
+            break
+        records.append((offset, saved_at, kind, length, size))
+        offset += size
+    return records
+
+
+class RevisionStore:
+    """预设的历史版本
+
+    record()、rename() 等写入操作放入队列后立即返回，由后台线程依次执行；
+    run() 把读取操作排在已提交的写入之后执行，完成后在后台线程中调用回调。
+    revisions() 和 get() 直接读取文件，可以在任意线程中调用。
+    """
+
+    def __init__(self, directory, keyframe_interval=KEYFRAME_INTERVAL):
+        self.directory = directory
+        self.keyframe_interval = keyframe_interval
+        self.queue = queue.Queue()
+        self._worker = None
+        # 文件路径 -> (最新内容, 最新版本之前连续差异的数量, 完整记录的结尾位置)，
+        # 只在后台线程中使用
+        self._tails = OrderedDict()
+
+    def path(self, group, name):
+        """预设历史文件的路径，文件名为分组和名称的哈希"""
+        digest = hashlib.sha1(f"{group}\0{name}".encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, digest[:24] + ".rev")
+
+    def submit(self, func, *args):
+        """把操作放入后台线程的队列"""
+        self.queue.put((func, args))
+        if self._worker is None:
+            self._worker = threading.Thread(
+                target=self._run, name="revision-writer", daemon=True)
+            self._worker.start()
+
+    def _run(self):
+        """后台线程：依次执行队列中的操作"""
+        while True:
+            item = self.queue.get()
+            try:
+                if item is None:
+                    return
+                func, args = item
+                try:
+                    func(*args)
+                except Exception as e:
+                    print(f"写入历史版本失败: {str(e)}")
+            finally:
+                self.queue.task_done()
+
+    def close(self, timeout=5):
+        """等待已提交的操作完成后停止后台线程"""
+        if self._worker is not None:
+            self.queue.put(None)
+            self._worker.join(timeout)
+            self._worker = None
+
+    def flush(self):
+        """等待已提交的操作全部完成"""
+        if self._worker is not None:
+            self.queue.join()
+
+    def record(self, group, name, old_content, new_content):
+        """预设内容从 old_content 改为 new_content 后记录新版本
+
+        历史中的最新版本不是 old_content（还没有历史，或在其他地方被修改过）时
+        先把 old_content 记为一个版本；old_content 为None时只记录新版本。
+        内容没有变化时不记录。
+        """
+        self.submit(self._append, self.path(group, name), old_content, new_content)
+
+    def rename(self, group, old_name, new_name):
+        """预设重命名后移动其历史"""
+        self.submit(self._move, self.path(group, old_name),
+                    self.path(group, new_name))
+
+    def rename_group(self, old_group, new_group, names):
+        """分组重命名后移动其中预设的历史"""
+        for name in names:
+            self.submit(self._move, self.path(old_group, name),
+                        self.path(new_group, name))
+
+    def run(self, func, callback):
+        """在已提交的写入之后于后台线程中执行 func()，然后调用 callback(结果, 错误)"""
+        def call():
+            try:
+                result = func()
+            except Exception as e:
+                callback(None, e)
+                return
+            callback(result, None)
+        self.submit(call)
+
+    def revisions(self, group, name):
+        """预设的所有版本，从旧到新返回 [(保存时间, 字符数)]，只读取记录头部"""
+        try:
+            with open(self.path(group, name), 'rb') as f:
+                return [(saved_at, length)
+                        for _, saved_at, _, length, _ in read_headers(f)]
+        except FileNotFoundError:
+            return []
+
+    def get(self, group, name, index):
+        """读取第 index 个版本（从0开始，负数从最新的版本倒数）的内容"""
+        with open(self.path(group, name), 'rb') as f:
+            return self._read(f, read_headers(f), index)
+
+    @staticmethod
+    def _read(f, records, index):
+        """从最近的关键帧开始依次应用差异，得到指定版本的内容"""
+        index = range(len(records))[index]
+        start = index
+        while records[start][2] != KEYFRAME:
+            start -= 1
+
+        content = None
+        for offset, _, kind, _, size in records[start:index + 1]:
+            f.seek(offset)
+            data = zlib.decompress(f.read(size)).decode('utf-8')
+            content = data if kind == KEYFRAME else apply_delta(content, json.loads(data))
+        return content
+
+    def _load_tail(self, path):
+        """取得文件中最新的版本、它之前连续差异的数量和最后一条完整记录的结尾位置
+
+        没有历史时返回 (None, 0, 0)。
+        """
+        tail = self._tails.get(path)
+        if tail is not None:
+            self._tails.move_to_end(path)
+            return tail
+        try:
+            with open(path, 'rb') as f:
+                records = read_headers(f)
+                if not records:
+                    return None, 0, 0
+                deltas = 0
+                while records[-1 - deltas][2] != KEYFRAME:
+                    deltas += 1
+                offset, _, _, _, size = records[-1]
+                return self._read(f, records, -1), deltas, offset + size
+        except FileNotFoundError:
+            return None, 0, 0
+
+    def _remember(self, path, content, deltas, end):
+        """缓存文件中最新的版本"""
+        self._tails[path] = (content, deltas, end)
+        self._tails.move_to_end(path)
+        while len(self._tails) > TAIL_CACHE_SIZE:
+            self._tails.popitem(last=False)
+
+    def _append(self, path, old_content, new_content):
+        """追加版本（后台线程）"""
+        content, deltas, end = self._load_tail(path)
+        # 还没有历史，或预设在其他地方被修改过时，先补上修改前的内容
+        if old_content is None or old_content == content:
+            versions = [new_content]
+        else:
+            versions = [old_content, new_content]
+
+        records = []
+        for version in versions:
+            if version == content:
+                continue
+            kind, text = KEYFRAME, version
+            if content is not None and deltas + 1 < self.keyframe_interval:
+                delta = json.dumps(make_delta(content, version), ensure_ascii=False)
+                # 差异不比完整内容小时直接保存完整内容
+                if len(delta) < len(version):
+                    kind, text = DELTA, delta
+            deltas = deltas + 1 if kind == DELTA else 0
+            records.append((kind, text, len(version)))
+            content = version
+        if not records:
+            return
+
+        saved_at = time.time()
+        data = b""
+        for kind, text, length in records:
+            payload = zlib.compress(text.encode('utf-8'))
+            data += HEADER.pack(saved_at, kind, length, len(payload)) + payload
+        os.makedirs(self.directory, exist_ok=True)
+        with open(path, 'ab') as f:
+            # 截掉上次写入中断留下的残缺记录，否则新记录会接在残缺数据之后无法读取
+            if f.tell() != end:
+                f.truncate(end)
+            f.write(data)
+        self._remember(path, content, deltas, end + len(data))
+
+    def _move(self, old_path, new_path):
+        """移动历史文件（后台线程）"""
+        tail = self._tails.pop(old_path, None)
+        self._tails.pop(new_path, None)
+        if os.path.exists(old_path):
+            os.replace(old_path, new_path)
+            if tail is not None:
+                self._remember(new_path, *tail)
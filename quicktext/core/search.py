@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""
+预设搜索索引
+"""
+
+
+class SearchIndex:
+    """预设搜索索引
+
+    预先保存小写后的名称和内容，避免每次按键都重新转换全部预设；
+    内容相同的预设共用一份小写内容，每次搜索每份内容只比较一次；
+    新查询以上一次查询开头时只在上一次的结果中继续筛选。
+    """
+
+    def __init__(self):
+        # (分组, 名称, 小写名称, 内容序号)
+        self.entries = []
+        # 去重后的小写内容
+        self.bodies = []
+        self.dirty = True
+        self._last_query = None
+        self._last_hits = None
+        self._last_body_hits = None
+
+    def rebuild(self, items):
+        """根据 (分组, 名称, 内容) 序列重建索引"""
+        slots = {}
+        bodies = []
+        entries = []
+        for group, name, content in items:
+            slot = slots.get(content)
+            if slot is None:
+                slot = slots[content] = len(bodies)
+                bodies.append(content.lower())
+            entries.append((group, name, name.lower(), slot))
+        self.entries = entries
+        self.bodies = bodies
+        self.dirty = False
+        self._last_query = None
+        self._last_hits = None
+        self._last_body_hits = None
+
+    def invalidate(self):
+        """标记索引需要重建"""
+        self.dirty = True
+
+    def search(self, query, limit=None):
+        """返回匹配的 (分组, 名称) 列表，按预设顺序排列"""
+        query = query.lower()
+        if self._last_query and query.startswith(self._last_query):
+            candidates = self._last_hits
+            body_candidates = self._last_body_hits
+        else:
+            candidates = range(len(self.entries))
+            body_candidates = range(len(self.bodies))
+
+        bodies = self.bodies
+        body_hits = [i for i in body_candidates if query in bodies[i]]
+        matched = bytearray(len(bodies))
+        for i in body_hits:
+            matched[i] = 1
+
+        entries = self.entries
+        hits = [i for i in candidates
+                if matched[entries[i][3]] or query in entries[i][2]]
+        self._last_query = query
+        self._last_hits = hits
+        self._last_body_hits = body_hits
+
+        if limit is not None:
+            hits = hits[:limit]
+        return [(entries[i][0], entries[i][1]) for i in hits]
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+"""
+应用设置
+"""
+
+import copy
+import json
+import os
+
+# 默认设置
+DEFAULT_SETTINGS = {
+    "hotkeys": {
+        "toggle": ["ctrl+alt+q"],
+        "history": ["ctrl+alt+h"],
+        "palette": ["ctrl+alt+p"],
+    },
+    # 复制时填写模板变量
+    "expand_templates": True,
+    # 记录热点路径耗时，在隐藏的"诊断"选项卡中查看
+    "perf_enabled": False,
+    # 主循环超过此时间（毫秒）没有响应时记录主线程的调用栈，0表示关闭
+    "stall_threshold_ms": 500,
+    # 搜索结果按使用频率和最近使用时间排序
+    "rank_search_by_usage": True,
+    # 在快速访问中显示"最常用"选项卡
+    "show_most_used": False,
+}
+
+
+def load_settings(path):
+    """从JSON文件加载应用设置，缺少的项使用默认值"""
+    settings = copy.deepcopy(DEFAULT_SETTINGS)
+    if os.path.exists(path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            for key, value in data.items():
+                if isinstance(value, dict) and isinstance(settings.get(key), dict):
+                    settings[key].update(value)
+                else:
+                    settings[key] = value
+        except Exception as e:
+            print(f"加载设置失败: {str(e)}")
+    return settings
+
+
+def save_settings(path, settings):
+    """保存应用设置"""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(settings, f, ensure_ascii=False, indent=2)
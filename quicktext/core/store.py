@@ -0,0 +1,362 @@
+# -*- coding: utf-8 -*-
+"""
+预设存储：加载、保存、排序、增删改和搜索，不依赖任何界面库
+"""
+
+import copy
+import json
+import os
+
+from .bodies import BodyTable
+from .order import RankOrder
+from .perf import perf
+from .presets import DEFAULT_PRESETS, preset_content
+from .search import SearchIndex
+
+
+class PresetStore:
+    """预设存储
+
+    数据结构为 {分组: {名称: 预设}}，分组和预设的顺序由 RankOrder 维护。
+    预设的正文通过 BodyTable 共享，内容相同的预设引用同一个字符串。
+    增删改操作只修改内存中的数据，需要调用 save() 写入文件；
+    移动操作只向顺序日志追加一条记录，下次完整保存时合并进 presets.json。
+    """
+
+    def __init__(self, data_file):
+        self.data_file = data_file
+        self.data_dir = os.path.dirname(data_file)
+        self.presets = {}
+        self.group_order = RankOrder()
+        self.preset_orders = {}
+        self.bodies = BodyTable()
+        self.search_index = SearchIndex()
+        # 最近一次保存到首选位置失败的错误（即使已保存到备用位置）
+        self.save_error = None
+
+    @perf.timed("store.load")
+    def load(self):
+        """从JSON文件加载预设，文件不存在时创建默认预设
+
+        文件损坏时抛出异常，调用者可以提示后调用 reset()。
+        """
+        if not os.path.exists(self.data_file):
+            self.reset()
+            return
+
+        with open(self.data_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+
+        # 检查是否为新的分组格式，如果不是则转换
+        if data and not isinstance(next(iter(data.values())), dict):
+            # 转换旧格式到新格式
+            data = {"常用": data}
+
+        self.presets = data
+        self.share_bodies()
+        self.init_orders()
+
+    def reset(self):
+        """使用默认预设并写入文件"""
+        self.presets = copy.deepcopy(DEFAULT_PRESETS)
+        self.share_bodies()
+        self.init_orders()
+        self.save()
+
+    @perf.timed("store.save")
+    def save(self):
+        """保存预设文本到JSON文件，失败时尝试保存到当前工作目录"""
+        self.save_error = None
+        try:
+            # 确保目录存在
+            dir_path = os.path.dirname(self.data_file)
+            if dir_path and not os.path.exists(dir_path):
+                os.makedirs(dir_path, exist_ok=True)
+
+            self.write_file(self.data_file)
+            self.on_saved()
+
+            print(f"预设数据已保存到: {self.data_file}")
+            return True
+        except Exception as e:
+            self.save_error = e
+            print(f"保存错误: {str(e)}, 路径: {self.data_file}")
+
+            # 尝试保存到当前工作目录
+            try:
+                current_dir = os.getcwd()
+                fallback_file = os.path.join(current_dir, "presets.json")
+                self.write_file(fallback_file)
+
+                # 更新数据文件路径
+                self.data_dir = current_dir
+                self.data_file = fallback_file
+                self.on_saved()
+
+                print(f"已成功保存到备用位置: {fallback_file}")
+                return True
+            except Exception as e2:
+                print(f"备用保存也失败: {str(e2)}")
+                return False
+
+    def write_file(self, path):
+        """按当前顺序写入预设文件
+
+        输出与 json.dump(indent=2) 完全相同，但被多个预设共享的正文只编码一次。
+        """
+        shared = self.bodies.shared()
+        encoded = {}
+        dumps = json.JSONEncoder(ensure_ascii=False).encode
+
+        def encode(value, indent):
+            if isinstance(value, str):
+                if value not in shared:
+                    return dumps(value)
+                text = encoded.get(value)
+                if text is None:
+                    text = encoded[value] = dumps(value)
+                return text
+            if isinstance(value, dict) and value:
+                inner = "\n" + "  " * (indent + 1)
+                fields = (dumps(k) + ": " + encode(v, indent + 1)
+                          for k, v in value.items())
+                return "{" + inner + ("," + inner).join(fields) + "\n" + "  " * indent + "}"
+            return json.dumps(value, ensure_ascii=False, indent=2).replace(
+                "\n", "\n" + "  " * indent)
+
+        # 逐个预设写入，不在内存中拼出整个文件
+        with open(path, 'w', encoding='utf-8') as f:
+            separator = "{\n  "
+            for group in self.group_order:
+                f.write(separator + dumps(group) + ": ")
+                separator = ",\n  "
+                items = self.ordered_items(group)
+                if not items:
+                    f.write("{}")
+                    continue
+                item_separator = "{\n    "
+                for name, value in items:
+                    f.write(item_separator + dumps(name) + ": " + encode(value, 2))
+                    item_separator = ",\n    "
+                f.write("\n  }")
+            f.write("{}" if separator == "{\n  " else "\n}")
+
+    def on_saved(self):
+        """完整保存后顺序已写入文件，清空移动日志"""
+        self.clear_order_journal()
+
+    def get_order_file(self):
+        """获取顺序移动日志的路径"""
+        return os.path.splitext(self.data_file)[0] + ".order.jsonl"
+
+    def share_body(self, value):
+        """在正文表中登记预设的正文，返回使用共享正文的预设"""
+        content = preset_content(value)
+        if not isinstance(content, str):
+            return value
+        shared = self.bodies.acquire(content)
+        if not isinstance(value, dict):
+            return shared
+        if shared is not content and "content" in value:
+            value = dict(value, content=shared)
+        return value
+
+    def release_body(self, value):
+        """释放预设在正文表中的引用"""
+        content = preset_content(value)
+        if isinstance(content, str):
+            self.bodies.release(content)
+
+    def share_bodies(self):
+        """加载后重建正文表，让内容相同的预设共用一个字符串"""
+        self.bodies.clear()
+        for items in self.presets.values():
+            for name, value in items.items():
+                items[name] = self.share_body(value)
+
+    def init_orders(self):
+        """根据预设数据初始化排列顺序，并回放移动日志"""
+        self.group_order = RankOrder(self.presets.keys())
+        self.preset_orders = {group: RankOrder(items.keys())
+                              for group, items in self.presets.items()}
+        self.replay_order_journal()
+        self.search_index.invalidate()
+
+    def replay_order_journal(self):
+        """回放上次完整保存之后记录的移动操作"""
+        order_file = self.get_order_file()
+        if not os.path.exists(order_file):
+            return
+
+        try:
+            with open(order_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        delta = json.loads(line)
+                        group = delta["group"]
+                        rank = float(delta["rank"])
+                    except (ValueError, KeyError, TypeError):
+                        # 忽略写入中断造成的残缺记录
+                        continue
+
+                    if "name" in delta:
+                        order = self.preset_orders.get(group)
+                        if order is not None:
+                            order.set_rank(delta["name"], rank)
+                    else:
+                        self.group_order.set_rank(group, rank)
+        except OSError as e:
+            print(f"读取顺序日志失败: {str(e)}")
+
+    def append_order_delta(self, delta):
+        """将一次移动追加到顺序日志中，失败时改为完整保存"""
+        try:
+            with open(self.get_order_file(), 'a', encoding='utf-8') as f:
+                f.write(json.dumps(delta, ensure_ascii=False) + "\n")
+            return True
+        except OSError as e:
+            print(f"写入顺序日志失败: {str(e)}")
+            return self.save()
+
+    def clear_order_journal(self):
+        """删除顺序日志"""
+        order_file = self.get_order_file()
+        if os.path.exists(order_file):
+            try:
+                os.remove(order_file)
+            except OSError as e:
+                print(f"删除顺序日志失败: {str(e)}")
+
+    def ordered_groups(self):
+        """按顺序返回分组名称"""
+        return self.group_order.keys()
+
+    def ordered_items(self, group):
+        """按顺序返回分组中的 (名称, 预设) 列表"""
+        items = self.presets.get(group, {})
+        order = self.preset_orders.get(group)
+        if order is None:
+            return list(items.items())
+        return [(name, items[name]) for name in order]
+
+    def ordered_names(self, group):
+        """按顺序返回分组中的预设名称"""
+        order = self.preset_orders.get(group)
+        return order.keys() if order is not None else []
+
+    def ordered_data(self):
+        """生成按当前顺序排列的预设数据，用于写入文件"""
+        return {group: dict(self.ordered_items(group))
+                for group in self.group_order}
+
+    def move_group(self, name, index):
+        """将分组移动到新位置，并记录这一次移动"""
+        if name not in self.presets:
+            return
+
+        rank, rebalanced = self.group_order.move(name, index)
+        self.search_index.invalidate()
+
+        # 排名重新分配时需要完整保存，否则只追加一条移动记录
+        if rebalanced:
+            self.save()
+        else:
+            self.append_order_delta({"group": name, "rank": rank})
+
+    def move_preset(self, group, name, index):
+        """将预设移动到分组中的新位置，并记录这一次移动"""
+        if group not in self.preset_orders or name not in self.presets[group]:
+            return
+
+        rank, rebalanced = self.preset_orders[group].move(name, index)
+        self.search_index.invalidate()
+
+        # 排名重新分配时需要完整保存，否则只追加一条移动记录
+        if rebalanced:
+            self.save()
+        else:
+            self.append_order_delta(
+                {"group": group, "name": name, "rank": rank})
+
+    def get(self, group, name):
+        """获取预设，不存在时返回None"""
+        return self.presets.get(group, {}).get(name)
+
+    def iter_presets(self):
+        """按顺序遍历所有 (分组, 名称, 预设)"""
+        for group in self.ordered_groups():
+            for name, value in self.ordered_items(group):
+                yield group, name, value
+
+    def count(self):
+        """预设总数"""
+        return sum(len(items) for items in self.presets.values())
+
+    @perf.timed("store.search")
+    def search(self, query, limit=None):
+        """按名称和内容搜索，返回匹配的 (分组, 名称) 列表"""
+        if self.search_index.dirty:
+            self.search_index.rebuild(
+                (group, name, preset_content(value))
+                for group, name, value in self.iter_presets())
+        return self.search_index.search(query, limit=limit)
+
+    def add_group(self, name, index=None):
+        """添加新分组，index 为None时放在末尾"""
+        if name in self.presets:
+            raise ValueError("分组名称已存在")
+        self.presets[name] = {}
+        self.group_order.append(name)
+        if index is not None:
+            self.group_order.move(name, index)
+        self.preset_orders[name] = RankOrder()
+
+    def rename_group(self, old_name, new_name):
+        """重命名分组，保持其位置不变"""
+        if new_name in self.presets:
+            raise ValueError("分组名称已存在")
+        self.presets[new_name] = self.presets.pop(old_name)
+        self.group_order.rename(old_name, new_name)
+        self.preset_orders[new_name] = self.preset_orders.pop(old_name)
+        self.search_index.invalidate()
+
+    def delete_group(self, name):
+        """删除分组及其中的所有预设"""
+        for value in self.presets.pop(name).values():
+            self.release_body(value)
+        self.group_order.remove(name)
+        self.preset_orders.pop(name, None)
+        self.search_index.invalidate()
+
+    def add_preset(self, group, name, value, index=None):
+        """添加新预设，index 为None时放在分组末尾"""
+        if name in self.presets[group]:
+            raise ValueError("预设名称已存在")
+        self.presets[group][name] = self.share_body(value)
+        self.preset_orders[group].append(name)
+        if index is not None:
+            self.preset_orders[group].move(name, index)
+        self.search_index.invalidate()
+
+    def set_preset(self, group, name, value):
+        """修改已有预设的内容或属性"""
+        if name not in self.presets[group]:
+            raise KeyError(name)
+        old_value = self.presets[group][name]
+        self.presets[group][name] = self.share_body(value)
+        self.release_body(old_value)
+        self.search_index.invalidate()
+
+    def rename_preset(self, group, old_name, new_name):
+        """重命名预设，保持其位置不变"""
+        if new_name in self.presets[group]:
+            raise ValueError("预设名称已存在")
+        self.presets[group][new_name] = self.presets[group].pop(old_name)
+        self.preset_orders[group].rename(old_name, new_name)
+        self.search_index.invalidate()
+
+    def delete_preset(self, group, name):
+        """删除预设"""
+        self.release_body(self.presets[group].pop(name))
+        self.preset_orders[group].remove(name)
+        self.search_index.invalidate()
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""
+模板变量的解析和展开
+"""
+
+import hashlib
+import re
+import time
+from collections import OrderedDict
+
+# 模板占位符，例如 [日期]、[会议名称]、[user_name]
+# 变量名只能由文字、数字和下划线组成且不以数字开头，不含空格和运算符；
+# 紧跟在文字或右括号后的下标（如 a[i]、f(x)[0]）和Markdown链接 [文字](地址) 不算变量，
+# 以免把 [ -f x ]、[1, 2] 等命令和代码中的方括号当成模板
+TEMPLATE_PATTERN = re.compile(r"(?<![\w\]\)])\[([^\W\d]\w{0,19})\](?!\()")
+
+# 内置模板变量
+BUILTIN_VARIABLES = {
+    "日期": lambda: time.strftime("%Y-%m-%d"),
+    "时间": lambda: time.strftime("%H:%M"),
+    "date": lambda: time.strftime("%Y-%m-%d"),
+    "time": lambda: time.strftime("%H:%M"),
+}
+
+# 读取当前剪贴板内容的内置变量名
+CLIPBOARD_VARIABLES = ("剪贴板", "clipboard")
+
+# 已编译模板的缓存数量
+TEMPLATE_CACHE_SIZE = 512
+
+
+class CompiledTemplate:
+    """解析后的模板：文字片段与变量名交替排列，展开时只需拼接"""
+
+    __slots__ = ("parts", "variables")
+
+    def __init__(self, content):
+        # 按正则切分后，偶数位置为文字，奇数位置为变量名
+        self.parts = tuple(TEMPLATE_PATTERN.split(content))
+        self.variables = tuple(dict.fromkeys(self.parts[1::2]))
+
+    def render(self, values):
+        """用变量值展开模板，没有提供值的占位符保持原样"""
+        parts = list(self.parts)
+        for i in range(1, len(parts), 2):
+            name = parts[i]
+            parts[i] = values[name] if name in values else f"[{name}]"
+        return "".join(parts)
+
+
+# 已编译的模板，以内容哈希为键
+_template_cache = OrderedDict()
+
+
+def compile_template(content):
+    """编译模板，相同内容只解析一次"""
+    key = hashlib.blake2b(content.encode('utf-8'), digest_size=16).digest()
+    template = _template_cache.get(key)
+    if template is None:
+        template = CompiledTemplate(content)
+        _template_cache[key] = template
+        if len(_template_cache) > TEMPLATE_CACHE_SIZE:
+            _template_cache.popitem(last=False)
+    else:
+        _template_cache.move_to_end(key)
+    return template
+
+
+def builtin_values(template, read_clipboard=None):
+    """计算模板中用到的内置变量，read_clipboard 用于读取当前剪贴板内容"""
+    values = {}
+    for variable in template.variables:
+        if variable in BUILTIN_VARIABLES:
+            values[variable] = BUILTIN_VARIABLES[variable]()
+        elif variable in CLIPBOARD_VARIABLES and read_clipboard is not None:
+            values[variable] = read_clipboard()
+    return values
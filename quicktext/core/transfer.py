@@ -0,0 +1,360 @@
+# -*- coding: utf-8 -*-
+"""
+批量导入和导出：CSV、JSONL、文本文件目录和presets.json格式
+
+读取函数逐条生成 (分组, 名称, 预设)，不会一次读入整个文件（presets.json
+本身是一个JSON对象，只能整体解析）。格式错误的记录跳过并记入错误列表。
+导入的所有修改在内存中完成，出错时全部撤销，由调用者在结束后保存一次。
+"""
+
+import csv
+import json
+import os
+
+from .presets import make_preset, preset_content, preset_options
+
+# 支持的格式
+FORMATS = ("csv", "jsonl", "dir", "json")
+
+# 名称冲突时的处理方式：跳过、覆盖、重命名为 "名称 (2)"
+CONFLICT_POLICIES = ("skip", "overwrite", "rename")
+
+# 记录中没有分组时使用的分组
+DEFAULT_IMPORT_GROUP = "导入"
+
+# 每处理多少条记录报告一次进度
+PROGRESS_INTERVAL = 1000
+
+# CSV文件的列，除 name 外都可以省略
+CSV_COLUMNS = ["group", "name", "content", "hotkey", "autotype", "command", "ttl"]
+
+# 导出为文本文件时，文件名中不能使用的字符
+UNSAFE_FILENAME_CHARS = '<>:"/\\|?*'
+
+# 导入错误列表中最多保留的条数
+MAX_ERRORS = 100
+
+
+def detect_format(path):
+    """根据路径判断格式"""
+    if os.path.isdir(path):
+        return "dir"
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".csv":
+        return "csv"
+    if extension in (".jsonl", ".ndjson"):
+        return "jsonl"
+    if extension == ".json":
+        return "json"
+    raise ValueError(f"无法识别的文件格式: {path}")
+
+
+def parse_bool(value):
+    """解析CSV中的布尔值"""
+    return str(value).strip().lower() in ("1", "true", "yes", "y", "是")
+
+
+def record_value(fields):
+    """从记录的字段生成预设，未知字段忽略"""
+    options = {}
+    if fields.get("hotkey"):
+        options["hotkey"] = str(fields["hotkey"]).strip().lower()
+    for key in ("autotype", "command"):
+        if fields.get(key) not in (None, ""):
+            options[key] = parse_bool(fields[key])
+    if fields.get("ttl") not in (None, ""):
+        options["ttl"] = int(fields["ttl"])
+    if fields.get("timeout") not in (None, ""):
+        options["timeout"] = float(fields["timeout"])
+    return make_preset(str(fields.get("content") or ""), options)
+
+
+class ImportErrors(list):
+    """导入时跳过的记录，只保留前 MAX_ERRORS 条消息，count 为总数"""
+
+    def __init__(self):
+        super().__init__()
+        self.count = 0
+
+    def add(self, location, message):
+        """记录一条错误"""
+        self.count += 1
+        if len(self) < MAX_ERRORS:
+            self.append(f"{location}: {message}")
+
+
+def read_csv(path, default_group=DEFAULT_IMPORT_GROUP, errors=None):
+    """读取CSV文件，第一行为列名"""
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        reader = csv.DictReader(f)
+        if not reader.fieldnames or "name" not in reader.fieldnames:
+            raise ValueError("CSV文件缺少 name 列")
+        for fields in reader:
+            try:
+                name = (fields.get("name") or "").strip()
+                if not name:
+                    raise ValueError("名称为空")
+                group = (fields.get("group") or "").strip() or default_group
+                yield group, name, record_value(fields)
+            except ValueError as e:
+                if errors is not None:
+                    errors.add(f"第{reader.line_num}行", str(e))
+
+
+def read_jsonl(path, default_group=DEFAULT_IMPORT_GROUP, errors=None):
+    """读取JSONL文件，每行一个 {"group", "name", "content", ...} 对象"""
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                fields = json.loads(line)
+                if not isinstance(fields, dict):
+                    raise ValueError("不是JSON对象")
+                name = str(fields.get("name") or "").strip()
+                if not name:
+                    raise ValueError("名称为空")
+                group = str(fields.get("group") or "").strip() or default_group
+                yield group, name, record_value(fields)
+            except (ValueError, TypeError) as e:
+                if errors is not None:
+                    errors.add(f"第{line_number}行", str(e))
+
+
+def read_text_dir(path, default_group=DEFAULT_IMPORT_GROUP, errors=None):
+    """读取文本文件目录：子目录名为分组，文件名（不含扩展名）为预设名称
+
+    目录下直接存放的文件放入默认分组。
+    """
+    def read_files(directory, group):
+        for entry in sorted(os.scandir(directory), key=lambda e: e.name):
+            if not entry.is_file() or entry.name.startswith("."):
+                continue
+            try:
+                with open(entry.path, 'r', encoding='utf-8-sig') as f:
+                    content = f.read()
+            except (OSError, UnicodeDecodeError) as e:
+                if errors is not None:
+                    errors.add(entry.path, str(e))
+                continue
+            yield group, os.path.splitext(entry.name)[0], content
+
+    yield from read_files(path, default_group)
+    for entry in sorted(os.scandir(path), key=lambda e: e.name):
+        if entry.is_dir() and not entry.name.startswith("."):
+            yield from read_files(entry.path, entry.name)
+
+
+def read_presets_json(path, default_group=DEFAULT_IMPORT_GROUP, errors=None):
+    """读取presets.json格式的文件（包括没有分组的旧格式）"""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if not isinstance(data, dict):
+        raise ValueError("预设文件格式不正确")
+    if data and not isinstance(next(iter(data.values())), dict):
+        data = {default_group: data}
+
+    for group, items in data.items():
+        if not isinstance(items, dict):
+            if errors is not None:
+                errors.add(group, "分组内容不是JSON对象")
+            continue
+        for name, value in items.items():
+            try:
+                if isinstance(value, dict) and isinstance(value.get("content"), str):
+                    # 与CSV、JSONL相同地规范化热键、布尔值和缓存时间等属性
+                    value = record_value(value)
+                elif not isinstance(value, str):
+                    raise ValueError("预设内容不是字符串或带 content 字段的对象")
+            except (ValueError, TypeError) as e:
+                if errors is not None:
+                    errors.add(f"{group}/{name}", str(e))
+                continue
+            yield group, name, value
+
+
+READERS = {
+    "csv": read_csv,
+    "jsonl": read_jsonl,
+    "dir": read_text_dir,
+    "json": read_presets_json,
+}
+
+
+def read_records(path, fmt=None, default_group=DEFAULT_IMPORT_GROUP,
+                 errors=None):
+    """按格式逐条读取 (分组, 名称, 预设)，fmt 为None时根据路径判断"""
+    fmt = fmt or detect_format(path)
+    if fmt not in READERS:
+        raise ValueError(f"不支持的格式: {fmt}")
+    return READERS[fmt](path, default_group, errors)
+
+
+def unique_name(items, name):
+    """生成分组中不存在的名称：名称 (2)、名称 (3) ……"""
+    index = 2
+    while f"{name} ({index})" in items:
+        index += 1
+    return f"{name} ({index})"
+
+
+class ImportResult:
+    """导入结果"""
+
+    def __init__(self):
+        self.added = 0
+        self.overwritten = 0
+        self.renamed = 0
+        self.skipped = 0
+        # 导入的预设中复用了已有正文的数量和省下的字符数
+        self.deduplicated = 0
+        self.deduplicated_chars = 0
+        self.errors = ImportErrors()
+        # 新建的分组（按创建顺序）和内容有变化的分组
+        self.new_groups = []
+        self.changed_groups = set()
+
+    @property
+    def total(self):
+        """处理的记录数（不含格式错误的记录）"""
+        return self.added + self.overwritten + self.renamed + self.skipped
+
+    def to_dict(self):
+        """转换为可以写入JSON的字典"""
+        return {
+            "added": self.added,
+            "overwritten": self.overwritten,
+            "renamed": self.renamed,
+            "skipped": self.skipped,
+            "deduplicated": self.deduplicated,
+            "deduplicated_chars": self.deduplicated_chars,
+            "error_count": self.errors.count,
+            "errors": list(self.errors),
+            "new_groups": self.new_groups,
+            "changed_groups": sorted(self.changed_groups),
+        }
+
+
+def import_presets(store, records, policy="skip", progress=None, result=None):
+    """把记录导入预设存储，返回 ImportResult
+
+    只修改内存中的数据，调用者负责保存。读取或导入过程中出现异常时撤销
+    已做的所有修改再抛出。progress(已处理数量) 每 PROGRESS_INTERVAL 条调用一次。
+    result 可以传入已收集了读取错误的 ImportResult。
+    """
+    if policy not in CONFLICT_POLICIES:
+        raise ValueError(f"不支持的冲突处理方式: {policy}")
+
+    result = result or ImportResult()
+    reused = store.bodies.reused
+    reused_chars = store.bodies.reused_chars
+    # 撤销记录：("group", 分组) / ("add", 分组, 名称) / ("set", 分组, 名称, 原预设)
+    undo = []
+    try:
+        for count, (group, name, value) in enumerate(records, 1):
+            if progress is not None and count % PROGRESS_INTERVAL == 0:
+                progress(count)
+
+            if group not in store.presets:
+                store.add_group(group)
+                undo.append(("group", group))
+                result.new_groups.append(group)
+
+            existing = store.presets[group].get(name)
+            if existing is None:
+                store.add_preset(group, name, value)
+                undo.append(("add", group, name))
+                result.added += 1
+            elif policy == "skip" or existing == value:
+                result.skipped += 1
+                continue
+            elif policy == "overwrite":
+                store.set_preset(group, name, value)
+                undo.append(("set", group, name, existing))
+                result.overwritten += 1
+            else:
+                new_name = unique_name(store.presets[group], name)
+                store.add_preset(group, new_name, value)
+                undo.append(("add", group, new_name))
+                result.renamed += 1
+            result.changed_groups.add(group)
+    except BaseException:
+        rollback(store, undo)
+        raise
+    result.deduplicated += store.bodies.reused - reused
+    result.deduplicated_chars += store.bodies.reused_chars - reused_chars
+    return result
+
+
+def rollback(store, undo):
+    """按相反顺序撤销导入的修改"""
+    for action in reversed(undo):
+        if action[0] == "group":
+            store.delete_group(action[1])
+        elif action[0] == "add":
+            store.delete_preset(action[1], action[2])
+        else:
+            store.set_preset(action[1], action[2], action[3])
+
+
+def safe_filename(name):
+    """把预设名称转换为可用的文件名"""
+    cleaned = "".join("_" if c in UNSAFE_FILENAME_CHARS or ord(c) < 32 else c
+                      for c in name).strip(" .")
+    return cleaned or "_"
+
+
+def export_presets(store, path, fmt=None, progress=None):
+    """按当前顺序导出所有预设，返回导出的数量
+
+    dir 格式只导出内容，热键等属性会丢失。
+    """
+    fmt = fmt or detect_format(path)
+    if fmt == "json":
+        store.write_file(path)
+        return store.count()
+
+    count = 0
+    records = store.iter_presets()
+    if fmt == "csv":
+        with open(path, 'w', encoding='utf-8-sig', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=CSV_COLUMNS,
+                                    extrasaction="ignore")
+            writer.writeheader()
+            for count, (group, name, value) in enumerate(records, 1):
+                writer.writerow(dict(preset_options(value), group=group,
+                                     name=name, content=preset_content(value)))
+                if progress is not None and count % PROGRESS_INTERVAL == 0:
+                    progress(count)
+    elif fmt == "jsonl":
+        with open(path, 'w', encoding='utf-8') as f:
+            for count, (group, name, value) in enumerate(records, 1):
+                fields = {"group": group, "name": name,
+                          "content": preset_content(value)}
+                fields.update(preset_options(value))
+                f.write(json.dumps(fields, ensure_ascii=False) + "\n")
+                if progress is not None and count % PROGRESS_INTERVAL == 0:
+                    progress(count)
+    elif fmt == "dir":
+        os.makedirs(path, exist_ok=True)
+        used = set()
+        for count, (group, name, value) in enumerate(records, 1):
+            group_dir = os.path.join(path, safe_filename(group))
+            if group_dir not in used:
+                os.makedirs(group_dir, exist_ok=True)
+                used.add(group_dir)
+            # 不同名称转换后可能得到相同的文件名
+            base = os.path.join(group_dir, safe_filename(name))
+            file_path = base + ".txt"
+            index = 2
+            while file_path in used:
+                file_path = f"{base} ({index}).txt"
+                index += 1
+            used.add(file_path)
+            with open(file_path, 'w', encoding='utf-8') as f:
+                f.write(preset_content(value))
+            if progress is not None and count % PROGRESS_INTERVAL == 0:
+                progress(count)
+    else:
+        raise ValueError(f"不支持的格式: {fmt}")
+    return count
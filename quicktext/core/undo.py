@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+"""
+撤销和重做：每一步只记录修改的逆操作，不保存整份预设数据的快照
+
+修改以元组表示，apply_change(store, 修改) 执行修改并返回其逆操作：
+
+    ("set", 分组, 名称, 预设)
+    ("add", 分组, 名称, 预设, 位置)
+    ("delete", 分组, 名称)
+    ("rename", 分组, 原名称, 新名称)
+    ("move", 分组, 名称, 位置)
+    ("add_group", 分组, [(名称, 预设), ...], 位置)
+    ("delete_group", 分组)
+    ("rename_group", 原名称, 新名称)
+    ("move_group", 分组, 位置)
+
+逆操作引用的预设与预设存储共用同一个对象，每一步占用的内存与修改的大小成正比。
+"""
+
+from collections import deque
+
+# 最多保留的撤销步数
+UNDO_LIMIT = 100
+
+
+def apply_change(store, change):
+    """执行一次修改，返回其逆操作
+
+    预设或分组不存在、名称已被占用时抛出 KeyError 或 ValueError，不做修改。
+    移动操作由预设存储自行写入顺序日志，其余修改需要调用者保存。
+    """
+    kind = change[0]
+    if kind == "set":
+        _, group, name, value = change
+        old_value = store.presets[group][name]
+        store.set_preset(group, name, value)
+        return ("set", group, name, old_value)
+    if kind == "add":
+        _, group, name, value, index = change
+        store.add_preset(group, name, value, index)
+        return ("delete", group, name)
+    if kind == "delete":
+        _, group, name = change
+        value = store.presets[group][name]
+        index = store.ordered_names(group).index(name)
+        store.delete_preset(group, name)
+        return ("add", group, name, value, index)
+    if kind == "rename":
+        _, group, old_name, new_name = change
+        if old_name not in store.presets[group]:
+            raise KeyError(old_name)
+        store.rename_preset(group, old_name, new_name)
+        return ("rename", group, new_name, old_name)
+    if kind == "move":
+        _, group, name, index = change
+        old_index = store.ordered_names(group).index(name)
+        store.move_preset(group, name, index)
+        return ("move", group, name, old_index)
+    if kind == "add_group":
+        _, group, items, index = change
+        store.add_group(group, index)
+        for name, value in items:
+            store.add_preset(group, name, value)
+        return ("delete_group", group)
+    if kind == "delete_group":
+        _, group = change
+        items = store.ordered_items(group)
+        index = store.ordered_groups().index(group)
+        store.delete_group(group)
+        return ("add_group", group, items, index)
+    if kind == "rename_group":
+        _, old_name, new_name = change
+        if old_name not in store.presets:
+            raise KeyError(old_name)
+        store.rename_group(old_name, new_name)
+        return ("rename_group", new_name, old_name)
+    if kind == "move_group":
+        _, group, index = change
+        old_index = store.ordered_groups().index(group)
+        store.move_group(group, index)
+        return ("move_group", group, old_index)
+    raise ValueError(f"未知的修改: {kind}")
+
+
+class UndoHistory:
+    """撤销和重做栈
+
+    每一步保存 (说明, 逆操作)。执行新的修改时清空重做栈，超出 limit 步时丢弃最早的一步。
+    """
+
+    def __init__(self, limit=UNDO_LIMIT):
+        self.undo_stack = deque(maxlen=limit)
+        self.redo_stack = []
+
+    def apply(self, store, change, label):
+        """执行一次修改并记录到撤销栈"""
+        inverse = apply_change(store, change)
+        self.undo_stack.append((label, inverse))
+        self.redo_stack.clear()
+
+    def undo(self, store):
+        """撤销最近一步，返回 (说明, 执行的逆操作)，没有可撤销的步骤时返回None
+
+        预设在此期间被其他途径（如命令行工具、批量导入）修改而无法撤销时，
+        丢弃这一步并抛出 KeyError 或 ValueError。
+        """
+        if not self.undo_stack:
+            return None
+        label, change = self.undo_stack.pop()
+        self.redo_stack.append((label, apply_change(store, change)))
+        return label, change
+
+    def redo(self, store):
+        """重做最近撤销的一步，返回 (说明, 执行的修改)，没有可重做的步骤时返回None"""
+        if not self.redo_stack:
+            return None
+        label, change = self.redo_stack.pop()
+        self.undo_stack.append((label, apply_change(store, change)))
+        return label, change
+
+    def clear(self):
+        """清空撤销和重做栈"""
+        self.undo_stack.clear()
+        self.redo_stack.clear()
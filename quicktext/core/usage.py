@@ -0,0 +1,224 @@
+# -*- coding: utf-8 -*-
+"""
+预设使用记录和常用度排序
+
+每次复制预设记录一条 [分组, 名称, 时间] 事件，先保存在内存中，由调用者定期
+调用 flush() 一次追加到日志文件。常用度（frecency）按指数衰减计算：每次使用
+计1分，每经过 half_life 秒减半。所有预设以相同速度衰减，相对顺序只在记录新的
+使用时改变，因此分数保存为与当前时间无关的对数形式
+rank = log2(分数) + 时间 / half_life，最常用的预设可以预先排好并增量更新。
+"""
+
+import heapq
+import itertools
+import json
+import math
+import os
+import time
+
+# 常用度减半所需的时间（秒）
+HALF_LIFE = 7 * 24 * 3600
+
+# 预先排好的最常用预设数量
+HOT_SET_SIZE = 20
+
+# 日志中的事件行数超过此值且超过条目数的两倍时，下次写入改为整体重写
+COMPACT_THRESHOLD = 1000
+
+# 重写日志时丢弃分数低于此值的条目（只用过一次的预设约10个半衰期后丢弃）
+MIN_SCORE = 0.001
+
+
+def log2_add(a, b):
+    """log2(2**a + 2**b)，避免指数溢出"""
+    if a < b:
+        a, b = b, a
+    return a + math.log2(1 + 2 ** (b - a))
+
+
+class UsageLog:
+    """预设使用记录
+
+    日志文件每行一个JSON数组：[分组, 名称, 时间] 为一次使用，
+    [分组, 名称, 次数, rank] 为重写日志时合并后的记录。
+    """
+
+    def __init__(self, path, half_life=HALF_LIFE, hot_size=HOT_SET_SIZE):
+        self.path = path
+        self.half_life = half_life
+        self.hot_size = hot_size
+        # (分组, 名称) -> [使用次数, rank]
+        self.entries = {}
+        # 尚未写入文件的事件
+        self.pending = []
+        # 日志文件中的事件行数
+        self.logged_events = 0
+        # 重命名后需要整体重写日志
+        self.needs_compact = False
+        # 按 rank 从高到低排列的最常用预设，多保留一倍以便跳过已删除的预设
+        self.hot = []
+        # 每次变化递增，用于判断界面是否需要刷新
+        self.version = 0
+
+    def bump(self, key, when):
+        """累加一次使用"""
+        rank = when / self.half_life
+        entry = self.entries.get(key)
+        if entry is None:
+            self.entries[key] = [1, rank]
+        else:
+            entry[0] += 1
+            entry[1] = log2_add(entry[1], rank)
+
+    def record(self, group, name, when=None):
+        """记录一次使用，只修改内存，需要调用 flush() 写入文件"""
+        when = time.time() if when is None else when
+        key = (group, name)
+        self.bump(key, when)
+        self.pending.append([group, name, round(when, 1)])
+        self.update_hot(key)
+        self.version += 1
+
+    def rank(self, key):
+        """与时间无关的常用度，没有使用过时为负无穷"""
+        entry = self.entries.get(key)
+        return entry[1] if entry is not None else -math.inf
+
+    def score(self, key, now=None):
+        """当前的常用度分数"""
+        entry = self.entries.get(key)
+        if entry is None:
+            return 0.0
+        now = time.time() if now is None else now
+        return 2 ** min(entry[1] - now / self.half_life, 64)
+
+    def count(self, key):
+        """累计使用次数"""
+        entry = self.entries.get(key)
+        return entry[0] if entry is not None else 0
+
+    def update_hot(self, key):
+        """一个预设的常用度提高后调整最常用列表"""
+        hot = self.hot
+        if key in hot:
+            hot.remove(key)
+        rank = self.entries[key][1]
+        index = 0
+        while index < len(hot) and self.entries[hot[index]][1] >= rank:
+            index += 1
+        hot.insert(index, key)
+        del hot[self.hot_size * 2:]
+
+    def rebuild_hot(self):
+        """重新计算最常用列表"""
+        self.hot = heapq.nlargest(self.hot_size * 2, self.entries,
+                                  key=lambda key: self.entries[key][1])
+
+    def top(self, limit=None, exists=None):
+        """按常用度从高到低返回最多 limit 个 (分组, 名称)
+
+        exists(分组, 名称) 用于跳过已删除的预设。通常直接使用预先排好的列表，
+        其中的预设被删除太多或 limit 超过列表长度时才对全部记录排序。
+        """
+        limit = limit or self.hot_size
+        keys = [key for key in self.hot if exists is None or exists(*key)][:limit]
+        if len(keys) < limit and len(self.entries) > len(self.hot):
+            ranked = sorted(self.entries, key=self.rank, reverse=True)
+            keys = [key for key in ranked if exists is None or exists(*key)][:limit]
+        return keys
+
+    def sort_by_usage(self, keys, limit=None):
+        """把使用过的预设按常用度排在前面，其余保持原有顺序，最多返回 limit 个"""
+        entries = self.entries
+        used = [key for key in keys if key in entries] if entries else []
+        used.sort(key=self.rank, reverse=True)
+        rest = (key for key in keys if key not in entries)
+        if limit is None:
+            return used + list(rest)
+        return used[:limit] + list(itertools.islice(rest, max(limit - len(used), 0)))
+
+    def rename_preset(self, group, old_name, new_name):
+        """预设重命名后更新记录"""
+        self.replace_keys(lambda key: (group, new_name)
+                          if key == (group, old_name) else key)
+
+    def rename_group(self, old_group, new_group):
+        """分组重命名后更新记录"""
+        self.replace_keys(lambda key: (new_group, key[1])
+                          if key[0] == old_group else key)
+
+    def replace_keys(self, mapping):
+        """按映射函数替换记录的键，下次写入时整体重写日志"""
+        entries = {}
+        for key, entry in self.entries.items():
+            new_key = mapping(key)
+            if new_key in entries:
+                # 重命名为已被删除的预设留下的名称时合并记录
+                count, rank = entries[new_key]
+                entry = [count + entry[0], log2_add(rank, entry[1])]
+            entries[new_key] = entry
+        if entries.keys() == self.entries.keys():
+            return
+        self.entries = entries
+        self.pending = [[*mapping((group, name)), when]
+                        for group, name, when in self.pending]
+        self.needs_compact = True
+        self.rebuild_hot()
+        self.version += 1
+
+    def load(self):
+        """从日志文件恢复记录，文件不存在时不做处理"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        item = json.loads(line)
+                        key = (str(item[0]), str(item[1]))
+                        if len(item) == 3:
+                            self.bump(key, float(item[2]))
+                            self.logged_events += 1
+                        else:
+                            self.entries[key] = [int(item[2]), float(item[3])]
+                    except (ValueError, TypeError, IndexError, KeyError):
+                        # 忽略写入中断造成的残缺记录
+                        continue
+        except FileNotFoundError:
+            pass
+        self.rebuild_hot()
+        self.version += 1
+
+    def flush(self, exists=None):
+        """把尚未写入的事件追加到日志，日志过长或有重命名时整体重写
+
+        exists(分组, 名称) 用于在重写时丢弃已删除预设的记录。
+        """
+        if (self.needs_compact or self.logged_events > max(
+                COMPACT_THRESHOLD, len(self.entries) * 2)):
+            self.compact(exists)
+            return
+        if not self.pending:
+            return
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write("".join(json.dumps(event, ensure_ascii=False) + "\n"
+                            for event in self.pending))
+        self.logged_events += len(self.pending)
+        self.pending = []
+
+    def compact(self, exists=None):
+        """把所有记录合并后重写日志，丢弃已删除和很久没有使用的预设"""
+        now = time.time()
+        entries = {key: entry for key, entry in self.entries.items()
+                   if (exists is None or exists(*key)) and
+                   self.score(key, now) >= MIN_SCORE}
+        temp_file = self.path + ".tmp"
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            for (group, name), (count, rank) in entries.items():
+                f.write(json.dumps([group, name, count, round(rank, 6)],
+                                   ensure_ascii=False) + "\n")
+        os.replace(temp_file, self.path)
+        self.entries = entries
+        self.pending = []
+        self.logged_events = 0
+        self.needs_compact = False
+        self.rebuild_hot()
+        self.version += 1
@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+"""
+单实例服务：运行中的QuickText通过Unix域套接字接收请求
+
+每个连接上传输以换行分隔的JSON，一行请求对应一行结果：
+
+    {"cmd": "search", "query": "ping", "limit": 10}
+    {"ok": true, "result": [...], "server_ms": 0.08}
+
+实例锁使用套接字旁边的锁文件（flock），进程退出时由系统自动释放，
+因此崩溃后留下的套接字文件不会阻止下次启动。
+"""
+
+import hashlib
+import json
+import os
+import socket
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# 不支持Unix域套接字的平台（Windows）上不启用单实例服务
+SUPPORTED = hasattr(socket, "AF_UNIX") and fcntl is not None
+
+# 客户端等待结果的默认时间（秒），命令型预设可能需要执行一段时间
+REQUEST_TIMEOUT = 30
+
+
+def socket_path(data_file):
+    """根据预设文件计算套接字路径，不同数据目录的实例互不影响"""
+    digest = hashlib.blake2b(os.path.abspath(data_file).encode('utf-8'),
+                             digest_size=8).hexdigest()
+    base = (os.environ.get("XDG_RUNTIME_DIR") or
+            os.environ.get("TMPDIR") or "/tmp")
+    uid = os.getuid() if hasattr(os, "getuid") else 0
+    return os.path.join(base, f"quicktext-{uid}-{digest}.sock")
+
+
+class InstanceServer:
+    """单实例锁和请求服务
+
+    acquire() 成功的进程是唯一实例，之后调用 start(handler) 开始接收请求。
+    handler 在服务线程中被调用，参数为请求字典，返回结果字典。
+    """
+
+    def __init__(self, data_file):
+        self.path = socket_path(data_file)
+        self.lock_file = None
+        self.sock = None
+        self.handler = None
+
+    def acquire(self):
+        """尝试获得实例锁，已有实例运行时返回False"""
+        lock_file = open(self.path + ".lock", 'w')
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self.lock_file = lock_file
+        return True
+
+    def start(self, handler):
+        """开始在后台线程中接收请求"""
+        # 持有实例锁说明已存在的套接字文件是上次异常退出留下的
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.bind(self.path)
+        os.chmod(self.path, 0o600)
+        sock.listen(8)
+
+        self.sock = sock
+        self.handler = handler
+        threading.Thread(target=self._accept_loop, daemon=True,
+                         name="quicktext-server").start()
+
+    def _accept_loop(self):
+        """接受连接，每个连接由单独的线程处理"""
+        while True:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                # 套接字已关闭
+                return
+            threading.Thread(target=self._serve, args=(conn,),
+                             daemon=True).start()
+
+    def _serve(self, conn):
+        """处理一个连接上的所有请求"""
+        with conn, conn.makefile('rwb') as stream:
+            try:
+                for line in stream:
+                    try:
+                        request = json.loads(line)
+                        if not isinstance(request, dict):
+                            raise ValueError("请求必须是JSON对象")
+                        response = self.handler(request)
+                    except ValueError as e:
+                        response = {"ok": False,
+                                    "error": f"无效的请求: {str(e)}"}
+
+                    stream.write(json.dumps(response, ensure_ascii=False)
+                                 .encode('utf-8') + b"\n")
+                    stream.flush()
+            except OSError:
+                # 客户端已断开
+                pass
+
+    def close(self):
+        """停止服务并释放实例锁"""
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
+            try:
+                os.unlink(self.path)
+            except OSError:
+                pass
+        if self.lock_file is not None:
+            self.lock_file.close()
+            self.lock_file = None
+
+
+def request(data_file, message, timeout=REQUEST_TIMEOUT):
+    """向正在运行的实例发送一个请求，没有实例在运行时返回None"""
+    if not SUPPORTED:
+        return None
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(socket_path(data_file))
+    except (FileNotFoundError, ConnectionRefusedError):
+        sock.close()
+        return None
+
+    with sock, sock.makefile('rwb') as stream:
+        stream.write(json.dumps(message, ensure_ascii=False)
+                     .encode('utf-8') + b"\n")
+        stream.flush()
+        line = stream.readline()
+    if not line:
+        raise OSError("QuickText实例没有返回结果")
+    return json.loads(line)
+
+
+def show_running_instance(data_file, attempts=30):
+    """让已运行的实例显示窗口，实例可能仍在启动中，因此会重试几秒"""
+    for _ in range(attempts):
+        try:
+            response = request(data_file, {"cmd": "show"}, timeout=5)
+        except (OSError, ValueError):
+            response = None
+        if response is not None:
+            return response.get("ok", False)
+        time.sleep(0.1)
+    return False
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""
+按需性能分析：在运行中的程序里开启和停止 cProfile 与 tracemalloc，生成报告文件
+
+报告为纯文本，包含按累计耗时和自身耗时排序的函数统计、分配内存最多的代码行，
+以及调用者提供的附加信息（如预设数量、控件数量峰值）。
+同时保存 .prof 原始数据，可以用 snakeviz 等工具查看。
+"""
+
+import cProfile
+import io
+import os
+import pstats
+import time
+import tracemalloc
+
+# 报告中列出的函数数量
+STATS_LIMIT = 60
+
+# 报告中列出的内存分配位置数量
+ALLOCATION_LIMIT = 30
+
+# tracemalloc 保存的调用栈深度
+TRACEMALLOC_FRAMES = 10
+
+
+class ProfileSession:
+    """一次性能分析
+
+    cProfile 只记录调用 start() 的线程，应在主线程（Tk主循环）中开始和停止。
+    """
+
+    def __init__(self):
+        self.profiler = None
+        self.started_at = None
+        # 开始前 tracemalloc 是否已在运行（如使用了 python -X tracemalloc）
+        self._tracemalloc_was_running = False
+
+    @property
+    def active(self):
+        """是否正在分析"""
+        return self.profiler is not None
+
+    def start(self):
+        """开始分析"""
+        if self.active:
+            return
+        self._tracemalloc_was_running = tracemalloc.is_tracing()
+        if not self._tracemalloc_was_running:
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+        elif hasattr(tracemalloc, "reset_peak"):
+            tracemalloc.reset_peak()
+        self.started_at = time.time()
+        self.profiler = cProfile.Profile()
+        self.profiler.enable()
+
+    def stop(self, output_dir, info=None):
+        """停止分析并写入报告，返回 (报告路径, 原始数据路径)
+
+        info 为写入报告开头的附加信息 {名称: 值}。
+        """
+        if not self.active:
+            return None
+        self.profiler.disable()
+        profiler, self.profiler = self.profiler, None
+
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        if not self._tracemalloc_was_running:
+            tracemalloc.stop()
+
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(self.started_at))
+        report_file = os.path.join(output_dir, f"profile-{stamp}.txt")
+        stats_file = os.path.join(output_dir, f"profile-{stamp}.prof")
+        profiler.dump_stats(stats_file)
+
+        lines = [
+            f"QuickText性能分析 {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(self.started_at))}",
+            f"持续时间: {time.time() - self.started_at:.1f} 秒",
+            f"跟踪的内存: 当前 {current / 1024:.0f} KB，峰值 {peak / 1024:.0f} KB",
+        ]
+        lines += [f"{name}: {value}" for name, value in (info or {}).items()]
+        lines += ["", format_stats(profiler, "cumulative"),
+                  format_stats(profiler, "tottime"),
+                  format_allocations(snapshot)]
+
+        with open(report_file, 'w', encoding='utf-8') as f:
+            f.write("\n".join(lines))
+        return report_file, stats_file
+
+
+def format_stats(profiler, sort_key, limit=STATS_LIMIT):
+    """按指定方式排序的函数统计"""
+    stream = io.StringIO()
+    stream.write(f"===== 函数统计（按 {sort_key} 排序）=====\n")
+    stats = pstats.Stats(profiler, stream=stream)
+    stats.strip_dirs().sort_stats(sort_key).print_stats(limit)
+    return stream.getvalue()
+
+
+def format_allocations(snapshot, limit=ALLOCATION_LIMIT):
+    """分配内存最多的代码行"""
+    # 排除 tracemalloc 自身和导入机制的分配
+    snapshot = snapshot.filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    ])
+    lines = ["===== 内存分配（按代码行）====="]
+    for index, stat in enumerate(snapshot.statistics("lineno")[:limit], 1):
+        frame = stat.traceback[0]
+        lines.append(f"{index:>3}. {stat.size / 1024:>10.1f} KB "
+                     f"{stat.count:>8} 次  {frame.filename}:{frame.lineno}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+"""
+主循环卡顿检测：主循环定时更新心跳，后台线程发现心跳超时后对主线程的调用栈采样
+
+采样结果以折叠堆栈格式（每行 "帧;帧;帧 次数"）追加到日志文件，
+可以直接交给 flamegraph.pl、speedscope 等工具生成火焰图。
+本模块不导入tkinter，只要求传入的对象提供 after/after_cancel 方法。
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+from .core.perf import perf
+
+# 卡顿期间的采样间隔（秒）
+SAMPLE_INTERVAL = 0.01
+
+# 日志文件超过此大小后轮换
+MAX_LOG_BYTES = 1024 * 1024
+
+# 保留的旧日志数量
+LOG_BACKUP_COUNT = 3
+
+
+def format_frame(frame):
+    """折叠堆栈中的一帧：函数名 (文件名:行号)"""
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+
+
+def collapse_stack(frame):
+    """把调用栈折叠为一行，最外层的帧在前"""
+    frames = []
+    while frame is not None:
+        frames.append(format_frame(frame))
+        frame = frame.f_back
+    return ";".join(reversed(frames))
+
+
+def rotate_log(path, max_bytes=MAX_LOG_BYTES, backup_count=LOG_BACKUP_COUNT):
+    """日志文件超过大小上限时依次改名为 .1、.2 ……，删除最旧的一个"""
+    try:
+        if os.path.getsize(path) < max_bytes:
+            return
+    except OSError:
+        return
+
+    for index in range(backup_count - 1, 0, -1):
+        source = f"{path}.{index}"
+        if os.path.exists(source):
+            os.replace(source, f"{path}.{index + 1}")
+    os.replace(path, f"{path}.1")
+
+
+class StallWatchdog:
+    """主循环卡顿检测器
+
+    start() 必须在主线程中调用：之后每隔 interval 秒（默认为阈值的一半）由主循环
+    更新一次心跳，后台线程发现心跳超过 threshold 秒没有更新时，每隔 sample_interval 秒
+    对主线程采样一次，直到心跳恢复，再把这次卡顿的折叠堆栈写入日志。
+    窗口隐藏时可以调用 pause() 暂停心跳和检测，避免空闲时定时唤醒。
+    """
+
+    def __init__(self, log_file, threshold=0.5, interval=None,
+                 sample_interval=SAMPLE_INTERVAL):
+        self.log_file = log_file
+        self.interval = threshold / 2 if interval is None else interval
+        self.threshold = max(threshold, self.interval * 2)
+        self.sample_interval = sample_interval
+        self.stall_count = 0
+        self.root = None
+        self.main_thread = None
+        self.last_beat = None
+        self._job = None
+        self._stop = threading.Event()
+        # 未暂停时置位，暂停期间检测线程在此等待，不会定时唤醒
+        self._active = threading.Event()
+        self._thread = None
+
+    def start(self, root):
+        """开始检测，root 为提供 after/after_cancel 的主循环对象"""
+        self.root = root
+        self.main_thread = threading.get_ident()
+        self.resume()
+        self._thread = threading.Thread(
+            target=self._run, name="stall-watchdog", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """停止检测"""
+        self._stop.set()
+        self._active.set()
+        if self._job is not None:
+            self.root.after_cancel(self._job)
+            self._job = None
+
+    def pause(self):
+        """暂停检测（在主线程中调用）"""
+        if self._job is not None:
+            self.root.after_cancel(self._job)
+            self._job = None
+        # 更新心跳，使正在进行的采样结束
+        self.last_beat = time.perf_counter()
+        self._active.clear()
+
+    def resume(self):
+        """恢复检测（在主线程中调用）"""
+        if self._job is None and not self._stop.is_set():
+            self._beat()
+            self._active.set()
+
+    def _beat(self):
+        """主循环中的心跳"""
+        self.last_beat = time.perf_counter()
+        self._job = self.root.after(int(self.interval * 1000), self._beat)
+
+    def _run(self):
+        """后台检测线程"""
+        # perf_counter 在系统休眠期间不计时，休眠不会被误判为卡顿
+        while True:
+            self._active.wait()
+            if self._stop.wait(self.interval):
+                return
+            if (self._active.is_set() and
+                    time.perf_counter() - self.last_beat > self.threshold):
+                self._record_stall(self.last_beat)
+
+    def sample(self):
+        """对主线程采样一次，返回折叠后的调用栈"""
+        frame = sys._current_frames().get(self.main_thread)
+        return collapse_stack(frame) if frame is not None else None
+
+    def _record_stall(self, beat):
+        """心跳恢复前持续采样，然后写入日志"""
+        stacks = Counter()
+        while not self._stop.is_set() and self.last_beat == beat:
+            stack = self.sample()
+            if stack:
+                stacks[stack] += 1
+            time.sleep(self.sample_interval)
+
+        end = self.last_beat if self.last_beat != beat else time.perf_counter()
+        # 正常情况下两次心跳之间本来就间隔 interval 秒
+        duration = max(end - beat - self.interval, 0)
+        self.stall_count += 1
+        if perf.enabled:
+            perf.record("mainloop.stall", beat, duration)
+        if not stacks:
+            return
+
+        try:
+            rotate_log(self.log_file)
+            with open(self.log_file, 'a', encoding='utf-8') as f:
+                for stack, count in stacks.most_common():
+                    f.write(f"{stack} {count}\n")
+            print(f"主循环卡顿 {duration:.2f} 秒，已记录 "
+                  f"{sum(stacks.values())} 个堆栈样本到: {self.log_file}")
+        except OSError as e:
+            print(f"无法写入卡顿日志: {str(e)}")
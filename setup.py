@@ -1,49 +1,138 @@
 """
 QuickText打包脚本
 使用PyInstaller将QuickText打包成可执行文件
+
+    python setup.py                 # 目录版本（默认，启动最快）
+    python setup.py --mode onefile  # 单文件版本
+
+单文件版本每次启动都要把整个程序解压到临时目录，目录版本直接从安装目录运行，
+启动时不需要解压。两种版本都会排除用不到的标准库模块并预先优化字节码，
+目录版本还会删除Tcl/Tk中用不到的时区、翻译和示例文件。
 """
 
+import argparse
 import os
+import shutil
 import sys
 
-# 如果运行此脚本，则使用PyInstaller打包
-if __name__ == "__main__":
-    try:
-        import PyInstaller.__main__
-    except ImportError:
-        print("PyInstaller未安装，正在安装...")
-        os.system(f"{sys.executable} -m pip install pyinstaller")
-        import PyInstaller.__main__
+# 程序用不到的标准库模块，排除后可以减小体积并减少启动时扫描的文件
+EXCLUDED_MODULES = [
+    "unittest", "doctest", "pydoc", "pdb", "test", "lib2to3", "distutils",
+    "setuptools", "pkg_resources", "idlelib", "turtle", "turtledemo",
+    "tkinter.tix", "sqlite3", "xmlrpc", "multiprocessing", "pydoc_data",
+]
 
-    print("开始打包QuickText...")
+# Tcl/Tk运行时数据中可以删除的子目录：时区数据、界面翻译、示例和示例图片
+TCL_TK_STRIP_DIRS = ["tzdata", "msgs", "demos", "images"]
 
-    # 获取当前脚本所在目录
-    script_dir = os.path.dirname(os.path.abspath(__file__)) or "."
+# 保留的Tcl编码文件，中文Windows的系统编码为cp936，其余编码文件可以删除
+TCL_KEEP_ENCODINGS = {"cp936.enc", "gb2312.enc", "euc-cn.enc",
+                      "cp1252.enc", "iso8859-1.enc"}
+
+# PyInstaller不同版本中Tcl/Tk数据目录的名称
+TCL_TK_DATA_DIRS = ("_tcl_data", "_tk_data", "tcl", "tk", "tcl8.6", "tk8.6")
 
+
+def pyinstaller_args(mode, script_dir):
+    """生成PyInstaller参数"""
     # 图标路径
     icon_path = os.path.join(script_dir, "tool.png")
 
     # 主脚本路径
     main_script = os.path.join(script_dir, "quick_text.py")
 
-    # PyInstaller参数
-    pyinstaller_args = [
+    args = [
         '--name=QuickText',
-        '--onefile',
+        f'--{mode}',
         f'--icon={icon_path}',
         '--windowed',
+        '--noconfirm',
+        f'--distpath={os.path.join(script_dir, "dist", mode)}',
+        # 打包时按 python -O 优化字节码
+        '--optimize=1',
+        # UPX压缩的文件每次启动都要解压，反而拖慢启动
+        '--noupx',
         '--add-data=presets.json;.',
         '--add-data=tool.png;.',
-        main_script
     ]
+    args += [f'--exclude-module={name}' for name in EXCLUDED_MODULES]
+    args.append(main_script)
+
+    # 在Windows以外的平台上，--add-data 使用冒号分隔
+    return [arg.replace(';', os.pathsep) if arg.startswith('--add-data')
+            else arg for arg in args]
+
+
+def strip_tcl_tk(bundle_dir):
+    """删除目录版本中用不到的Tcl/Tk数据，返回删除的字节数"""
+    removed = 0
+    for root, dirs, files in os.walk(bundle_dir):
+        if os.path.basename(root) not in TCL_TK_DATA_DIRS:
+            continue
+
+        for name in TCL_TK_STRIP_DIRS:
+            if name in dirs:
+                path = os.path.join(root, name)
+                removed += directory_size(path)
+                shutil.rmtree(path)
+                dirs.remove(name)
+
+        encoding_dir = os.path.join(root, "encoding")
+        if os.path.isdir(encoding_dir):
+            for name in os.listdir(encoding_dir):
+                if name.endswith(".enc") and name not in TCL_KEEP_ENCODINGS:
+                    path = os.path.join(encoding_dir, name)
+                    removed += os.path.getsize(path)
+                    os.remove(path)
+    return removed
 
-    # 在Windows上
-    if sys.platform.startswith('win'):
-        pyinstaller_args = [arg.replace(';', os.pathsep)
-                            for arg in pyinstaller_args]
+
+def directory_size(path):
+    """计算目录中所有文件的总大小"""
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            total += os.path.getsize(os.path.join(root, name))
+    return total
+
+
+def executable_path(mode, script_dir):
+    """打包结果中可执行文件的路径"""
+    exe_name = "QuickText.exe" if sys.platform.startswith('win') else "QuickText"
+    dist_dir = os.path.join(script_dir, "dist", mode)
+    if mode == "onedir":
+        return os.path.join(dist_dir, "QuickText", exe_name)
+    return os.path.join(dist_dir, exe_name)
+
+
+# 如果运行此脚本，则使用PyInstaller打包
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="使用PyInstaller打包QuickText")
+    parser.add_argument("--mode", choices=["onedir", "onefile"],
+                        default="onedir", help="打包方式，默认为启动更快的目录版本")
+    parser.add_argument("--keep-tcl-data", action="store_true",
+                        help="目录版本不删除Tcl/Tk的时区、翻译和示例文件")
+    options = parser.parse_args()
+
+    try:
+        import PyInstaller.__main__
+    except ImportError:
+        print("PyInstaller未安装，正在安装...")
+        os.system(f"{sys.executable} -m pip install pyinstaller")
+        import PyInstaller.__main__
+
+    print(f"开始打包QuickText（{options.mode}）...")
+
+    # 获取当前脚本所在目录
+    script_dir = os.path.dirname(os.path.abspath(__file__)) or "."
 
     # 运行PyInstaller
-    PyInstaller.__main__.run(pyinstaller_args)
+    PyInstaller.__main__.run(pyinstaller_args(options.mode, script_dir))
+
+    if options.mode == "onedir" and not options.keep_tcl_data:
+        bundle_dir = os.path.join(script_dir, "dist", "onedir", "QuickText")
+        removed = strip_tcl_tk(bundle_dir)
+        print(f"已删除用不到的Tcl/Tk数据: {removed / 1024:.0f} KB")
 
     print("\nQuickText打包完成！")
-    print(f"可执行文件位于: {os.path.join(script_dir, 'dist', 'QuickText.exe')}")
+    print(f"可执行文件位于: {executable_path(options.mode, script_dir)}")
@@ -0,0 +1,7 @@
+# -*- coding: utf-8 -*-
+"""测试配置：直接运行 pytest 时也能导入仓库中的 quicktext 包"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+"""quicktext.core.history 的测试"""
+
+from quicktext.core import ClipboardHistory
+
+
+def test_oversized_text_is_not_recorded():
+    history = ClipboardHistory(max_items=10, max_bytes=100)
+    history.push_text("小")
+    assert history.push_text("x" * 101) is False
+    assert history.items() == [("text", "小")]
+    assert history.total_bytes <= history.max_bytes
+
+
+def test_byte_cap_always_holds():
+    history = ClipboardHistory(max_items=100, max_bytes=100)
+    for i in range(50):
+        history.push_text(str(i) * (i % 7 * 10 + 1))
+        assert history.total_bytes <= history.max_bytes
+        assert history.total_bytes == sum(history.entries.values())
+    assert history.items()[0] == ("text", "49")
+
+
+def test_item_cap_and_move_to_front():
+    history = ClipboardHistory(max_items=3)
+    for name in "abcd":
+        history.push_preset("g", name)
+    history.push_preset("g", "b")
+    assert history.items() == [("preset", "g", "b"), ("preset", "g", "d"),
+                               ("preset", "g", "c")]
+
+
+def test_rename_and_round_trip(tmp_path):
+    history = ClipboardHistory()
+    history.push_preset("g", "a")
+    history.push_text("文本")
+    history.rename_preset("g", "a", "b")
+    history.rename_group("g", "h")
+    path = str(tmp_path / "history.json")
+    history.save(path)
+
+    loaded = ClipboardHistory()
+    loaded.load(path)
+    assert loaded.items() == [("text", "文本"), ("preset", "h", "b")]
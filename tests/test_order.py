@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+"""quicktext.core.order 的测试"""
+
+import random
+
+from quicktext.core import RankOrder
+
+
+def test_random_operations_match_list():
+    rng = random.Random(0)
+    keys = [f"k{i}" for i in range(100)]
+    order = RankOrder(keys)
+    expected = list(keys)
+
+    for step in range(5000):
+        choice = rng.random()
+        if choice < 0.6 and expected:
+            key = rng.choice(expected)
+            index = rng.randrange(len(expected) + 1)
+            order.move(key, index)
+            expected.remove(key)
+            expected.insert(min(index, len(expected)), key)
+        elif choice < 0.7 and expected:
+            key = rng.choice(expected)
+            order.remove(key)
+            expected.remove(key)
+        elif choice < 0.8 and expected:
+            key = rng.choice(expected)
+            new_key = f"r{step}"
+            order.rename(key, new_key)
+            expected[expected.index(key)] = new_key
+        else:
+            key = f"a{step}"
+            order.append(key)
+            expected.append(key)
+        assert order.keys() == expected
+
+
+def test_move_rebalances_when_gap_runs_out():
+    order = RankOrder("abcde")
+    rebalanced = False
+    for _ in range(100):
+        rebalanced |= order.move("e", 1)[1]
+        rebalanced |= order.move("d", 1)[1]
+    assert rebalanced
+    assert len(order) == 5
+    assert order.keys() == sorted(order.keys(), key=order.ranks.__getitem__)
+
+
+def test_set_rank_resorts():
+    order = RankOrder("abc")
+    order.set_rank("a", order.ranks["c"] + 1)
+    assert order.keys() == ["b", "c", "a"]
+    order.move("a", 0)
+    assert order.keys() == ["a", "b", "c"]
@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+"""核心库与界面分离的测试：导入 quicktext.core 和命令行工具不应加载tkinter等界面库"""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+import quicktext.core
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.mark.parametrize("module", ["quicktext.core", "quicktext.cli"])
+def test_headless_import(module):
+    code = (f"import sys, {module}\n"
+            "loaded = [m for m in ('tkinter', 'keyboard', 'pyperclip') if m in sys.modules]\n"
+            "assert not loaded, loaded\n")
+    subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True)
+
+
+def test_public_names():
+    for name in quicktext.core.__all__:
+        assert hasattr(quicktext.core, name), name
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""quicktext.core.revisions 的测试"""
+
+import os
+
+from quicktext.core import RevisionStore
+
+
+def make_versions(count):
+    """生成一组逐步修改的多行内容"""
+    lines = [f"第 {i} 行\n" for i in range(50)]
+    versions = ["".join(lines)]
+    for i in range(count):
+        lines[(i * 7) % len(lines)] = f"修改 {i}\n"
+        if i % 3 == 0:
+            lines.insert(i % len(lines), f"插入 {i}\n")
+        versions.append("".join(lines))
+    return versions
+
+
+def record_all(store, versions, group="分组", name="预设"):
+    for old, new in zip(versions, versions[1:]):
+        store.record(group, name, old, new)
+    store.flush()
+
+
+def test_every_revision_reconstructs(tmp_path):
+    store = RevisionStore(str(tmp_path), keyframe_interval=4)
+    versions = make_versions(20)
+    record_all(store, versions)
+
+    assert [length for _, length in store.revisions("分组", "预设")] == \
+        [len(version) for version in versions]
+    assert [store.get("分组", "预设", i) for i in range(len(versions))] == versions
+    assert store.get("分组", "预设", -1) == versions[-1]
+    store.close()
+
+
+def test_unchanged_content_is_not_recorded(tmp_path):
+    store = RevisionStore(str(tmp_path))
+    store.record("g", "n", "a", "b")
+    store.record("g", "n", "b", "b")
+    store.record("g", "n", None, "b")
+    store.flush()
+    assert len(store.revisions("g", "n")) == 2
+    store.close()
+
+
+def test_outside_edit_records_previous_content(tmp_path):
+    store = RevisionStore(str(tmp_path))
+    store.record("g", "n", "a", "b")
+    # 预设在其他地方被改成了 "c"
+    store.record("g", "n", "c", "d")
+    store.flush()
+    assert [store.get("g", "n", i) for i in range(4)] == ["a", "b", "c", "d"]
+    store.close()
+
+
+def test_append_after_truncated_record(tmp_path):
+    versions = make_versions(6)
+    store = RevisionStore(str(tmp_path))
+    record_all(store, versions[:4])
+    store.close()
+
+    # 模拟写入中断：最后一条记录只写入了一部分
+    path = store.path("分组", "预设")
+    size = os.path.getsize(path)
+    with open(path, 'r+b') as f:
+        f.truncate(size - 5)
+
+    # 新的实例从文件读取最新版本，追加前应截掉残缺记录
+    store = RevisionStore(str(tmp_path))
+    assert len(store.revisions("分组", "预设")) == 3
+    store.record("分组", "预设", versions[2], versions[4])
+    store.record("分组", "预设", versions[4], versions[5])
+    store.flush()
+
+    expected = versions[:3] + versions[4:6]
+    assert len(store.revisions("分组", "预设")) == len(expected)
+    assert [store.get("分组", "预设", i) for i in range(len(expected))] == expected
+    store.close()
+
+
+def test_rename_moves_history(tmp_path):
+    store = RevisionStore(str(tmp_path))
+    store.record("g", "a", "1", "2")
+    store.record("g", "b", "x", "y")
+    store.rename("g", "a", "c")
+    store.rename_group("g", "h", ["b", "c"])
+    store.flush()
+
+    assert store.revisions("g", "a") == []
+    assert [store.get("h", "c", i) for i in range(2)] == ["1", "2"]
+    assert store.get("h", "b", -1) == "y"
+
+    # 移动后继续追加
+    store.record("h", "c", "2", "3")
+    store.flush()
+    assert store.get("h", "c", -1) == "3"
+    store.close()
+
+
+def test_run_after_pending_writes(tmp_path):
+    store = RevisionStore(str(tmp_path))
+    results = []
+    store.record("g", "n", "a", "b")
+    store.run(lambda: store.get("g", "n", -1),
+              lambda result, error: results.append((result, error)))
+    store.flush()
+    assert results == [("b", None)]
+    store.close()
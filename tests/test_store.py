@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+"""quicktext.core.store 的测试"""
+
+import json
+import os
+
+import pytest
+
+from quicktext.core import PresetStore, make_preset
+
+
+@pytest.fixture
+def store(tmp_path):
+    data = {
+        "分组A": {"a1": "内容1", "a2": "共享", "a3": {"content": "共享", "hotkey": "ctrl+1"}},
+        "分组B": {"b1": "共享", "b2": "内容2"},
+        "分组C": {},
+    }
+    path = tmp_path / "presets.json"
+    path.write_text(json.dumps(data, ensure_ascii=False), encoding='utf-8')
+    store = PresetStore(str(path))
+    store.load()
+    return store
+
+
+def reload(store):
+    fresh = PresetStore(store.data_file)
+    fresh.load()
+    return fresh
+
+
+def snapshot(store):
+    return [(group, store.ordered_items(group)) for group in store.ordered_groups()]
+
+
+def test_write_file_matches_json_dump(store, tmp_path):
+    path = tmp_path / "out.json"
+    store.write_file(str(path))
+    expected = json.dumps(store.ordered_data(), ensure_ascii=False, indent=2)
+    assert path.read_text(encoding='utf-8') == expected
+
+
+def test_moves_are_journaled_and_replayed(store):
+    store.move_preset("分组A", "a3", 0)
+    store.move_group("分组C", 0)
+    store.move_preset("分组B", "b2", 0)
+    assert os.path.exists(store.get_order_file())
+
+    fresh = reload(store)
+    assert fresh.ordered_groups() == ["分组C", "分组A", "分组B"]
+    assert fresh.ordered_names("分组A") == ["a3", "a1", "a2"]
+    assert fresh.ordered_names("分组B") == ["b2", "b1"]
+
+
+def test_truncated_journal_line_is_ignored(store):
+    store.move_preset("分组A", "a3", 0)
+    with open(store.get_order_file(), 'a', encoding='utf-8') as f:
+        f.write('{"group": "分组A", "name": "a2", "ra')
+
+    fresh = reload(store)
+    assert fresh.ordered_names("分组A") == ["a3", "a1", "a2"]
+
+
+def test_save_merges_journal(store):
+    store.move_group("分组B", 0)
+    assert store.save()
+    assert not os.path.exists(store.get_order_file())
+    assert reload(store).ordered_groups() == ["分组B", "分组A", "分组C"]
+
+
+def test_crud_round_trip(store):
+    store.add_group("新分组", 1)
+    store.add_preset("新分组", "n1", make_preset("新内容", {"command": True}))
+    store.add_preset("分组A", "a0", "插入", 0)
+    store.rename_preset("分组A", "a1", "a1改")
+    store.set_preset("分组B", "b2", "修改后")
+    store.delete_preset("分组B", "b1")
+    store.rename_group("分组C", "分组C改")
+    store.delete_group("分组B")
+    assert store.save()
+
+    assert snapshot(reload(store)) == snapshot(store)
+    assert store.ordered_groups() == ["分组A", "新分组", "分组C改"]
+    assert store.ordered_names("分组A") == ["a0", "a1改", "a2", "a3"]
+
+
+def test_identical_bodies_are_shared(store):
+    a2 = store.get("分组A", "a2")
+    assert store.get("分组B", "b1") is a2
+    assert store.get("分组A", "a3")["content"] is a2
+    assert store.bodies.stats()["unique"] == 3
+
+    store.delete_preset("分组B", "b1")
+    store.set_preset("分组A", "a2", "其他")
+    assert "共享" in store.bodies.bodies
+    store.delete_preset("分组A", "a3")
+    assert "共享" not in store.bodies.bodies
+
+
+def test_search(store):
+    store.add_preset("分组C", "查找目标", "abc")
+    assert ("分组C", "查找目标") in [tuple(item[:2]) for item in store.search("查找")]
+    assert ("分组B", "b2") in [tuple(item[:2]) for item in store.search("内容2")]
@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+"""quicktext.core.template 的测试"""
+
+import pytest
+
+from quicktext.core import builtin_values, compile_template
+
+
+@pytest.mark.parametrize("content, variables", [
+    ("会议：[会议名称] 于 [日期]", ("会议名称", "日期")),
+    ("Hello [user_name], [name2]", ("user_name", "name2")),
+    ("[名称] 和 [名称]", ("名称",)),
+])
+def test_variables(content, variables):
+    assert compile_template(content).variables == variables
+
+
+@pytest.mark.parametrize("content", [
+    'if [ -f x ]; then echo ok; fi',
+    '[[ -n "$HOME" ]] && echo yes',
+    'value = a[i] + b[0] + f(x)[key]',
+    'items = [1, 2]',
+    '["a", "b"]',
+    '[1abc]',
+    '[a-b] [a+b] [ name ]',
+    '参见 [文档](https://example.com)',
+])
+def test_code_brackets_are_not_variables(content):
+    template = compile_template(content)
+    assert template.variables == ()
+    assert template.render({}) == content
+
+
+def test_render_keeps_missing_variables():
+    template = compile_template("[问候]，[名字]！")
+    assert template.render({"问候": "你好"}) == "你好，[名字]！"
+
+
+def test_builtin_values():
+    template = compile_template("[date] [剪贴板] [其他]")
+    values = builtin_values(template, read_clipboard=lambda: "clip")
+    assert set(values) == {"date", "剪贴板"}
+    assert values["剪贴板"] == "clip"
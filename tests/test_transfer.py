@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""quicktext.core.transfer 的测试"""
+
+import json
+
+from quicktext.core import ImportResult, PresetStore, import_presets, read_records
+
+
+def write_json(path, data):
+    path.write_text(json.dumps(data, ensure_ascii=False), encoding='utf-8')
+    return str(path)
+
+
+def test_presets_json_rejects_invalid_values(tmp_path):
+    path = write_json(tmp_path / "in.json", {
+        "分组": {
+            "文本": "内容",
+            "对象": {"content": "命令", "command": True},
+            "数字": 5,
+            "列表": [1],
+            "缺少内容": {"hotkey": "ctrl+1"},
+            "内容不是字符串": {"content": 3},
+        },
+    })
+    result = ImportResult()
+    records = list(read_records(path, errors=result.errors))
+
+    assert [name for _, name, _ in records] == ["文本", "对象"]
+    assert result.errors.count == 4
+    assert all(error.startswith("分组/") for error in result.errors)
+
+
+def test_imported_presets_are_searchable(tmp_path):
+    path = write_json(tmp_path / "in.json", {"分组": {"a": "hello", "b": 5}})
+    store = PresetStore(str(tmp_path / "presets.json"))
+    result = ImportResult()
+    import_presets(store, read_records(path, errors=result.errors), result=result)
+
+    assert result.added == 1
+    assert [(group, name) for group, name, *_ in store.search("hello")] == [("分组", "a")]
+
+
+def snapshot(store):
+    return [(group, store.ordered_items(group)) for group in store.ordered_groups()]
+
+
+def test_failed_import_rolls_back(tmp_path):
+    store = PresetStore(str(tmp_path / "presets.json"))
+    store.load()
+    group = store.ordered_groups()[0]
+    name = store.ordered_names(group)[0]
+    before = snapshot(store)
+    stats = store.bodies.stats()
+
+    def records():
+        yield "新分组", "a", "新内容"
+        yield group, name, "覆盖的内容"
+        yield group, name, "重命名的内容"
+        raise ValueError("读取失败")
+
+    try:
+        import_presets(store, records(), policy="overwrite")
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("应当抛出异常")
+
+    assert snapshot(store) == before
+    assert store.bodies.stats() == stats
+    assert store.search("新内容") == []
+
+
+def test_conflict_policies(tmp_path):
+    store = PresetStore(str(tmp_path / "presets.json"))
+    store.add_group("g")
+    store.add_preset("g", "a", "原内容")
+
+    result = import_presets(store, [("g", "a", "新内容")], policy="skip")
+    assert (result.skipped, store.get("g", "a")) == (1, "原内容")
+
+    result = import_presets(store, [("g", "a", "新内容")], policy="rename")
+    assert result.renamed == 1
+    assert store.get("g", "a (2)") == "新内容"
+
+    result = import_presets(store, [("g", "a", "覆盖")], policy="overwrite")
+    assert (result.overwritten, store.get("g", "a")) == (1, "覆盖")
+
+
+def test_presets_json_normalises_options(tmp_path):
+    path = write_json(tmp_path / "in.json", {
+        "分组": {
+            "字符串缓存时间": {"content": "date", "command": True, "ttl": "60"},
+            "数字热键": {"content": "x", "hotkey": 5, "autotype": "yes"},
+            "超时": {"content": "sleep 1", "command": "true", "timeout": "2.5"},
+            "缓存时间错误": {"content": "date", "command": True, "ttl": "abc"},
+            "缓存时间类型错误": {"content": "date", "ttl": [60]},
+        },
+    })
+    result = ImportResult()
+    records = {name: value for _, name, value in read_records(path, errors=result.errors)}
+
+    assert records["字符串缓存时间"] == {"content": "date", "command": True, "ttl": 60}
+    assert records["数字热键"] == {"content": "x", "hotkey": "5", "autotype": True}
+    assert records["超时"] == {"content": "sleep 1", "command": True, "timeout": 2.5}
+    assert result.errors.count == 2
+    assert all(error.startswith("分组/缓存时间") for error in result.errors)
@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""quicktext.core.undo 的测试"""
+
+import random
+
+import pytest
+
+from quicktext.core import PresetStore, UndoHistory
+from quicktext.core.undo import UNDO_LIMIT
+
+
+def snapshot(store):
+    return [(group, store.ordered_items(group)) for group in store.ordered_groups()]
+
+
+def random_change(rng, store, step):
+    """生成一个对当前数据有效的随机修改"""
+    groups = list(store.ordered_groups())
+    group = rng.choice(groups)
+    names = list(store.ordered_names(group))
+    kind = rng.choice(["set", "add", "delete", "rename", "move",
+                       "add_group", "delete_group", "rename_group", "move_group"])
+    if kind in ("set", "delete", "rename", "move") and not names:
+        kind = "add"
+    if kind == "delete_group" and len(groups) == 1:
+        kind = "add_group"
+
+    if kind == "set":
+        return ("set", group, rng.choice(names), f"内容 {step}")
+    if kind == "add":
+        return ("add", group, f"预设 {step}", f"内容 {step}", rng.randrange(len(names) + 1))
+    if kind == "delete":
+        return ("delete", group, rng.choice(names))
+    if kind == "rename":
+        return ("rename", group, rng.choice(names), f"改名 {step}")
+    if kind == "move":
+        return ("move", group, rng.choice(names), rng.randrange(len(names)))
+    if kind == "add_group":
+        return ("add_group", f"分组 {step}", [(f"新 {step}", "x")], rng.randrange(len(groups) + 1))
+    if kind == "delete_group":
+        return ("delete_group", group)
+    if kind == "rename_group":
+        return ("rename_group", group, f"分组改名 {step}")
+    return ("move_group", group, rng.randrange(len(groups)))
+
+
+def test_undo_redo_round_trip(tmp_path):
+    store = PresetStore(str(tmp_path / "presets.json"))
+    store.load()
+    history = UndoHistory()
+    rng = random.Random(0)
+
+    snapshots = [snapshot(store)]
+    for step in range(UNDO_LIMIT):
+        history.apply(store, random_change(rng, store, step), f"第{step}步")
+        snapshots.append(snapshot(store))
+
+    # 全部撤销，每一步都回到修改前的状态
+    for expected in reversed(snapshots[:-1]):
+        assert history.undo(store) is not None
+        assert snapshot(store) == expected
+    assert history.undo(store) is None
+
+    # 全部重做
+    for expected in snapshots[1:]:
+        assert history.redo(store) is not None
+        assert snapshot(store) == expected
+    assert history.redo(store) is None
+
+
+def test_new_change_clears_redo(tmp_path):
+    store = PresetStore(str(tmp_path / "presets.json"))
+    store.load()
+    history = UndoHistory()
+    group = store.ordered_groups()[0]
+    history.apply(store, ("add", group, "a", "1", None), "添加")
+    history.undo(store)
+    history.apply(store, ("add", group, "b", "2", None), "添加")
+    assert history.redo(store) is None
+
+
+def test_undo_after_outside_change_raises(tmp_path):
+    store = PresetStore(str(tmp_path / "presets.json"))
+    store.load()
+    history = UndoHistory()
+    group = store.ordered_groups()[0]
+    history.apply(store, ("add", group, "a", "1", None), "添加")
+    # 预设被其他途径删除
+    store.delete_preset(group, "a")
+    with pytest.raises(KeyError):
+        history.undo(store)
+    assert history.undo(store) is None
+
+
+def test_limit(tmp_path):
+    store = PresetStore(str(tmp_path / "presets.json"))
+    store.load()
+    history = UndoHistory(limit=3)
+    group = store.ordered_groups()[0]
+    for i in range(5):
+        history.apply(store, ("add", group, f"p{i}", "x", None), "添加")
+    assert sum(1 for _ in iter(lambda: history.undo(store), None)) == 3
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+"""quicktext.core.usage 的测试"""
+
+from quicktext.core import UsageLog
+
+DAY = 24 * 3600
+
+
+def test_recent_use_outranks_old_use(tmp_path):
+    usage = UsageLog(str(tmp_path / "usage.jsonl"), half_life=DAY)
+    now = 100 * DAY
+    for _ in range(3):
+        usage.record("g", "old", now - 10 * DAY)
+    usage.record("g", "new", now)
+    assert usage.top() == [("g", "new"), ("g", "old")]
+    assert usage.count(("g", "old")) == 3
+    assert usage.sort_by_usage([("g", "x"), ("g", "old"), ("g", "new")]) == \
+        [("g", "new"), ("g", "old"), ("g", "x")]
+
+
+def test_flush_and_load(tmp_path):
+    path = str(tmp_path / "usage.jsonl")
+    usage = UsageLog(path)
+    usage.record("g", "a", 1000.0)
+    usage.record("g", "b", 2000.0)
+    usage.record("g", "b", 3000.0)
+    usage.flush()
+
+    loaded = UsageLog(path)
+    loaded.load()
+    assert loaded.top() == usage.top()
+    assert loaded.count(("g", "b")) == 2
+
+
+def test_rename_is_persisted(tmp_path):
+    path = str(tmp_path / "usage.jsonl")
+    usage = UsageLog(path)
+    usage.record("g", "a")
+    usage.record("g", "b")
+    usage.flush()
+    usage.rename_preset("g", "a", "c")
+    usage.rename_group("g", "h")
+    usage.flush()
+
+    loaded = UsageLog(path)
+    loaded.load()
+    assert set(loaded.entries) == {("h", "b"), ("h", "c")}
+
+
+def test_compact_drops_deleted_presets(tmp_path):
+    path = str(tmp_path / "usage.jsonl")
+    usage = UsageLog(path)
+    usage.record("g", "a")
+    usage.record("g", "b")
+    usage.compact(exists=lambda group, name: name == "a")
+
+    loaded = UsageLog(path)
+    loaded.load()
+    assert list(loaded.entries) == [("g", "a")]